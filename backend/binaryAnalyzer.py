@@ -0,0 +1,388 @@
+import json
+import math
+import mmap
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+BINARY_EXTENSIONS = {".wasm", ".node", ".so", ".dll", ".dylib", ".exe", ".a", ".o", ".bin"}
+# ELF, PE, Mach-O (32/64, both byte orders, universal) and WebAssembly.
+BINARY_MAGICS = (
+    b"\x7fELF", b"MZ", b"\0asm",
+    b"\xfe\xed\xfa\xce", b"\xfe\xed\xfa\xcf", b"\xce\xfa\xed\xfe", b"\xcf\xfa\xed\xfe", b"\xca\xfe\xba\xbe",
+)
+MIN_BINARY_BYTES = 64
+MAX_BINARY_BYTES = 1024 * 1024 * 1024
+
+# How much of each table is searched for: long enough to be unique, short
+# enough to survive implementations that only embed part of it.
+TABLE_PREFIX_BYTES = 32
+ANCHOR_BYTES = 8
+
+# Files (or inventory entries) in flight per worker while earlier binaries are scanned.
+WINDOW_PER_WORKER = 64
+
+
+def _first_primes(count: int) -> List[int]:
+    primes: List[int] = []
+    candidate = 2
+    while len(primes) < count:
+        if all(candidate % p for p in primes if p * p <= candidate):
+            primes.append(candidate)
+        candidate += 1
+    return primes
+
+
+def _icbrt(n: int) -> int:
+    x = 1 << ((n.bit_length() + 2) // 3)
+    while True:
+        y = (2 * x + n // (x * x)) // 3
+        if y >= x:
+            return x
+        x = y
+
+
+def _fraction_words(root: int, primes: List[int], bits: int) -> List[int]:
+    """
+    First `bits` bits of the fractional part of the square (root=2) or cube
+    (root=3) root of each prime: the SHA-2 initial values and round constants.
+    """
+    mask = (1 << bits) - 1
+    if root == 2:
+        return [math.isqrt(p << (2 * bits)) & mask for p in primes]
+    return [_icbrt(p << (3 * bits)) & mask for p in primes]
+
+
+def _aes_sboxes() -> Tuple[bytes, bytes]:
+    """
+    The AES S-box and its inverse, from the GF(2^8) inverse and affine map.
+    """
+    def multiply(a: int, b: int) -> int:
+        product = 0
+        while b:
+            if b & 1:
+                product ^= a
+            a = ((a << 1) ^ 0x11B) if a & 0x80 else a << 1
+            b >>= 1
+        return product
+
+    inverse = [0] * 256
+    for a in range(1, 256):
+        for b in range(1, 256):
+            if multiply(a, b) == 1:
+                inverse[a] = b
+                break
+
+    sbox = bytearray(256)
+    for a in range(256):
+        x = inverse[a]
+        sbox[a] = x ^ (((x << 1) | (x >> 7)) & 0xFF) ^ (((x << 2) | (x >> 6)) & 0xFF) \
+            ^ (((x << 3) | (x >> 5)) & 0xFF) ^ (((x << 4) | (x >> 4)) & 0xFF) ^ 0x63
+
+    inverse_sbox = bytearray(256)
+    for a, s in enumerate(sbox):
+        inverse_sbox[s] = a
+    return bytes(sbox), bytes(inverse_sbox)
+
+
+def _aes_te0(sbox: bytes) -> List[int]:
+    # First encryption T-table: (2s, s, s, 3s) per S-box entry.
+    def xtime(v: int) -> int:
+        return ((v << 1) ^ 0x11B) & 0xFF if v & 0x80 else v << 1
+    return [(xtime(s) << 24) | (s << 16) | (s << 8) | (xtime(s) ^ s) for s in sbox]
+
+
+def _words(values: Iterable[int], size: int, byteorder: str) -> bytes:
+    return b"".join(v.to_bytes(size, byteorder) for v in values)
+
+
+def build_constants() -> List[Tuple[str, str, str, bytes]]:
+    """
+    Returns (name, algorithm, encoding, pattern) for every constant searched
+    for. Word tables are searched in both byte orders, since the table layout
+    follows the target's endianness.
+    """
+    sbox, inverse_sbox = _aes_sboxes()
+    primes = _first_primes(80)
+    md5_t = [int(abs(math.sin(i + 1)) * 2 ** 32) & 0xFFFFFFFF for i in range(64)]
+
+    word_tables = [
+        ("AES T-table", "AES", _aes_te0(sbox), 4),
+        ("SHA-256 round constants", "SHA-256", _fraction_words(3, primes[:64], 32), 4),
+        ("SHA-512 round constants", "SHA-512", _fraction_words(3, primes, 64), 8),
+        ("MD5 sine table", "MD5", md5_t, 4),
+        ("SHA-1 IV", "SHA-1", [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0], 4),
+        ("MD5 IV", "MD5", [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476], 4),
+    ]
+    big_numbers = [
+        ("P-256 prime", "ECDSA P-256", 0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFF, 32),
+        ("P-384 prime", "ECDSA P-384",
+         0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFFFF0000000000000000FFFFFFFF, 48),
+        ("secp256k1 prime", "ECDSA secp256k1", 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F, 32),
+        ("Curve25519 prime", "X25519", (1 << 255) - 19, 32),
+    ]
+
+    constants = [
+        ("AES S-box", "AES", "bytes", sbox[:TABLE_PREFIX_BYTES]),
+        ("AES inverse S-box", "AES", "bytes", inverse_sbox[:TABLE_PREFIX_BYTES]),
+        ("ChaCha20 sigma", "ChaCha20", "ascii", b"expand 32-byte k"),
+        ("ChaCha20 tau", "ChaCha20", "ascii", b"expand 16-byte k"),
+    ]
+    for name, algorithm, values, size in word_tables:
+        count = len(values) if name.endswith("IV") else TABLE_PREFIX_BYTES // size
+        for byteorder, encoding in (("big", f"be{size * 8}"), ("little", f"le{size * 8}")):
+            constants.append((name, algorithm, encoding, _words(values[:count], size, byteorder)))
+    for name, algorithm, value, size in big_numbers:
+        # Little endian also covers little-endian 32/64-bit limb arrays.
+        constants.append((name, algorithm, "be", value.to_bytes(size, "big")))
+        constants.append((name, algorithm, "le", value.to_bytes(size, "little")))
+
+    return constants
+
+
+def _anchor_offset(pattern: bytes) -> int:
+    # Binaries are full of 0x00 and 0xFF padding; an anchor starting with
+    # either (or made of runs of them, like the curve primes) would make the
+    # search stop at most bytes. Prefer a varied window starting elsewhere.
+    windows = range(len(pattern) - ANCHOR_BYTES + 1)
+    return max(windows, key=lambda i: (
+        pattern[i] not in (0x00, 0xFF),
+        len(set(pattern[i:i + ANCHOR_BYTES])),
+        -i,
+    ))
+
+
+CONSTANTS = build_constants()
+
+# One alternation over a short anchor from each constant; each hit is then
+# checked against the full constant. anchor -> [(constant index, offset in constant)]
+ANCHORS: Dict[bytes, List[Tuple[int, int]]] = {}
+for _index, (_, _, _, _pattern) in enumerate(CONSTANTS):
+    _offset = _anchor_offset(_pattern)
+    ANCHORS.setdefault(_pattern[_offset:_offset + ANCHOR_BYTES], []).append((_index, _offset))
+CONSTANTS_RE = re.compile(b"|".join(re.escape(anchor) for anchor in ANCHORS))
+
+# The SHA-1 IV starts with the MD5 one: a shorter constant is not reported
+# where a longer one that starts with it matches.
+LONGER_MATCHES: Dict[int, List[bytes]] = {}
+for _index, (_, _, _, _pattern) in enumerate(CONSTANTS):
+    _longer = [other for _, _, _, other in CONSTANTS if len(other) > len(_pattern) and other.startswith(_pattern)]
+    if _longer:
+        LONGER_MATCHES[_index] = _longer
+
+
+def is_binary_candidate(path: str | Path, size: Optional[int] = None, executable: bool = False) -> bool:
+    """
+    True for native code, addons and wasm: by extension, or for executables
+    by magic number (so shell scripts with +x are skipped).
+    """
+    path = Path(path)
+    if size is not None and not MIN_BINARY_BYTES <= size <= MAX_BINARY_BYTES:
+        return False
+    if path.suffix.lower() in BINARY_EXTENSIONS or ".so." in path.name:
+        return True
+    if not executable:
+        return False
+
+    try:
+        with open(path, "rb") as f:
+            return f.read(4).startswith(BINARY_MAGICS)
+    except OSError:
+        return False
+
+
+def scan_binary(path: str | Path) -> List[Dict]:
+    """
+    Memory-maps path and finds every known constant in one pass.
+
+    Returns [ { "name", "algorithm", "encoding", "offset", "count" } ] with the
+    first offset and number of occurrences of each constant.
+    """
+    found: Dict[int, Dict] = {}
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < MIN_BINARY_BYTES:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    data.madvise(mmap.MADV_SEQUENTIAL)
+                for match in CONSTANTS_RE.finditer(data):
+                    for index, anchor_offset in ANCHORS[match.group()]:
+                        name, algorithm, encoding, pattern = CONSTANTS[index]
+                        start = match.start() - anchor_offset
+                        if start < 0 or data[start:start + len(pattern)] != pattern:
+                            continue
+                        if any(data[start:start + len(other)] == other for other in LONGER_MATCHES.get(index, ())):
+                            continue
+                        if index in found:
+                            found[index]["count"] += 1
+                            continue
+                        found[index] = {
+                            "name": name,
+                            "algorithm": algorithm,
+                            "encoding": encoding,
+                            "offset": start,
+                            "count": 1,
+                        }
+    except (OSError, ValueError):
+        return []
+
+    return list(found.values())
+
+
+def _scan_one(path: str) -> Tuple[str, List[Dict]]:
+    return path, scan_binary(path)
+
+
+def iter_binary_files(roots: Iterable[str | Path]) -> Iterator[str]:
+    for root in roots:
+        root = Path(root)
+        if root.is_file():
+            yield str(root)
+            continue
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                path = Path(dirpath) / name
+                try:
+                    st = path.lstat()
+                except OSError:
+                    continue
+                if not path.is_symlink() and is_binary_candidate(path, st.st_size, bool(st.st_mode & 0o111)):
+                    yield str(path)
+
+
+def scan_binaries(paths: Iterable[str], max_workers: Optional[int] = None) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Scans files in a process pool (the regex holds the GIL), yielding
+    (path, findings) in walk order as they finish. Paths are submitted as the
+    walk produces them, with at most WINDOW_PER_WORKER scans in flight per worker, so
+    neither the paths nor the results of a whole-host walk pile up in memory.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1:
+        for path in paths:
+            yield _scan_one(path)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    window = max_workers * WINDOW_PER_WORKER
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for path in paths:
+            pending.append(pool.submit(_scan_one, path))
+            while pending and (len(pending) > window or pending[0].done()):
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def annotate_entries(entries: Iterable[Dict], max_workers: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Passes filesystem inventory entries through in order, adding
+    "crypto_constants" to every binary candidate. Candidates are scanned in a
+    process pool while the walk continues; at most WINDOW_PER_WORKER entries
+    per worker wait on their scan, so a whole-host walk never piles up in memory.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1:
+        for entry in entries:
+            if _inventory_candidate(entry):
+                entry["crypto_constants"] = scan_binary(entry["path"])
+            yield entry
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    window = max_workers * WINDOW_PER_WORKER
+    pending: Deque[Tuple[Dict, Optional[Future]]] = deque()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for entry in entries:
+            future = pool.submit(scan_binary, entry["path"]) if _inventory_candidate(entry) else None
+            pending.append((entry, future))
+            while pending and (len(pending) > window or pending[0][1] is None or pending[0][1].done()):
+                yield _finish(*pending.popleft())
+        while pending:
+            yield _finish(*pending.popleft())
+
+
+def _inventory_candidate(entry: Dict) -> bool:
+    return entry.get("type") == "file" and is_binary_candidate(
+        entry["path"], entry["size_bytes"], entry["permissions"]["is_executable"]
+    )
+
+
+def _finish(entry: Dict, future: Optional[Future]) -> Dict:
+    if future is not None:
+        entry["crypto_constants"] = future.result()
+    return entry
+
+
+def cbom_rows(path: str, findings: List[Dict]) -> List[Dict]:
+    """
+    Flat CBOM entries for one binary, one per algorithm found.
+    """
+    by_algorithm: Dict[str, List[Dict]] = {}
+    for finding in findings:
+        by_algorithm.setdefault(finding["algorithm"], []).append(finding)
+
+    return [
+        {
+            "file_name": path,
+            "line_number": None,
+            "api_call": None,
+            "algorithm": algorithm,
+            "cryptographic_function": None,
+            "mode": None,
+            "key_size": None,
+            "purpose": "embedded " + ", ".join(sorted({f["name"] for f in matches})),
+            "multiple_uses": len(by_algorithm) > 1,
+            "binary": {"constants": matches},
+        }
+        for algorithm, matches in by_algorithm.items()
+    ]
+
+
+def write_binary_cbom(roots: List[str | Path], output_path: str | Path, max_workers: Optional[int] = None) -> dict:
+    """
+    Scans every binary under roots and writes their CBOM rows to output_path
+    as each file finishes.
+
+    Returns { "files": <int>, "files_with_crypto": <int>, "rows": <int> }
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    counts = {"files": 0, "files_with_crypto": 0, "rows": 0}
+
+    with output_path.open("w", encoding="utf-8") as out:
+        out.write("[")
+        for path, findings in scan_binaries(iter_binary_files(roots), max_workers):
+            counts["files"] += 1
+            if not findings:
+                continue
+            counts["files_with_crypto"] += 1
+            for row in cbom_rows(path, findings):
+                out.write(("," if counts["rows"] else "") + "\n" + json.dumps(row))
+                counts["rows"] += 1
+        out.write("\n]\n")
+
+    return counts
+
+
+def main():
+    roots = sys.argv[1:] or ["."]
+
+    start = time.time()
+    counts = write_binary_cbom(roots, "results/binary_cbom.json")
+
+    print(f"Binary scan complete: {counts['files']} files, {counts['files_with_crypto']} with crypto constants in {time.time() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
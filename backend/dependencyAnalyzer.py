@@ -0,0 +1,269 @@
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MANIFEST_FILES = {"package.json", "package-lock.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml"}
+IGNORE_FOLDERS = {"node_modules", ".git"}
+
+# Known crypto libraries and the algorithms they expose.
+CRYPTO_LIBRARY_INDEX: Dict[str, Dict] = {
+    "node-forge": {"algorithms": ["RSA", "AES", "3DES", "RC2", "SHA-1", "SHA-256", "SHA-512", "MD5", "HMAC", "PBKDF2", "X.509"], "purpose": "general purpose crypto and PKI toolkit"},
+    "crypto-js": {"algorithms": ["AES", "3DES", "RC4", "Rabbit", "SHA-1", "SHA-256", "SHA-512", "SHA-3", "MD5", "RIPEMD-160", "HMAC", "PBKDF2"], "purpose": "symmetric ciphers and hashes"},
+    "jsonwebtoken": {"algorithms": ["HMAC-SHA256", "RSA", "ECDSA"], "purpose": "JWT signing and verification"},
+    "jose": {"algorithms": ["RSA", "ECDSA", "EdDSA", "HMAC", "AES-GCM", "AES-KW", "ECDH-ES", "RSA-OAEP"], "purpose": "JOSE (JWS/JWE/JWT) signing and encryption"},
+    "node-jose": {"algorithms": ["RSA", "ECDSA", "HMAC", "AES-GCM", "AES-KW", "ECDH-ES", "RSA-OAEP"], "purpose": "JOSE (JWS/JWE) signing and encryption"},
+    "jws": {"algorithms": ["HMAC-SHA256", "RSA", "ECDSA"], "purpose": "JWS signing"},
+    "jwa": {"algorithms": ["HMAC-SHA256", "RSA", "ECDSA"], "purpose": "JWA signature algorithms"},
+    "jwk-to-pem": {"algorithms": ["RSA", "ECDSA"], "purpose": "JWK to PEM key conversion"},
+    "bcrypt": {"algorithms": ["bcrypt"], "purpose": "password hashing"},
+    "bcryptjs": {"algorithms": ["bcrypt"], "purpose": "password hashing"},
+    "argon2": {"algorithms": ["Argon2"], "purpose": "password hashing"},
+    "scrypt-js": {"algorithms": ["scrypt"], "purpose": "key derivation"},
+    "pbkdf2": {"algorithms": ["PBKDF2"], "purpose": "key derivation"},
+    "tweetnacl": {"algorithms": ["X25519", "Ed25519", "XSalsa20-Poly1305", "SHA-512"], "purpose": "NaCl box/secretbox/sign"},
+    "libsodium-wrappers": {"algorithms": ["X25519", "Ed25519", "XChaCha20-Poly1305", "BLAKE2b", "Argon2"], "purpose": "libsodium bindings"},
+    "sodium-native": {"algorithms": ["X25519", "Ed25519", "XChaCha20-Poly1305", "BLAKE2b", "Argon2"], "purpose": "libsodium bindings"},
+    "elliptic": {"algorithms": ["ECDSA", "ECDH", "EdDSA"], "purpose": "elliptic curve cryptography"},
+    "secp256k1": {"algorithms": ["ECDSA", "ECDH"], "purpose": "secp256k1 curve operations"},
+    "jsrsasign": {"algorithms": ["RSA", "ECDSA", "HMAC", "X.509"], "purpose": "signatures, JWS and certificates"},
+    "node-rsa": {"algorithms": ["RSA", "RSA-OAEP"], "purpose": "RSA encryption and signing"},
+    "openpgp": {"algorithms": ["RSA", "ECDH", "EdDSA", "AES", "SHA-256"], "purpose": "OpenPGP encryption and signing"},
+    "@noble/curves": {"algorithms": ["ECDSA", "EdDSA", "ECDH", "X25519"], "purpose": "elliptic curve cryptography"},
+    "@noble/hashes": {"algorithms": ["SHA-256", "SHA-512", "SHA-3", "BLAKE2", "RIPEMD-160", "HMAC", "PBKDF2", "scrypt"], "purpose": "hash functions and KDFs"},
+    "@noble/ciphers": {"algorithms": ["AES", "ChaCha20-Poly1305", "XSalsa20-Poly1305"], "purpose": "symmetric ciphers"},
+    "@noble/post-quantum": {"algorithms": ["ML-KEM", "ML-DSA", "SLH-DSA"], "purpose": "post-quantum KEM and signatures"},
+    "crystals-kyber": {"algorithms": ["ML-KEM"], "purpose": "post-quantum key encapsulation"},
+    "@peculiar/webcrypto": {"algorithms": ["RSA", "ECDSA", "ECDH", "AES", "HMAC", "SHA-256"], "purpose": "WebCrypto implementation"},
+    "@peculiar/x509": {"algorithms": ["RSA", "ECDSA", "X.509"], "purpose": "X.509 certificates"},
+    "pkijs": {"algorithms": ["RSA", "ECDSA", "X.509"], "purpose": "PKI, CMS and X.509"},
+    "selfsigned": {"algorithms": ["RSA", "X.509"], "purpose": "self-signed certificate generation"},
+    "ssh2": {"algorithms": ["RSA", "ECDSA", "Ed25519", "AES", "ChaCha20-Poly1305", "DH"], "purpose": "SSH protocol"},
+    "crypto-browserify": {"algorithms": ["AES", "RSA", "ECDH", "SHA-256", "HMAC", "PBKDF2"], "purpose": "Node crypto polyfill"},
+    "browserify-aes": {"algorithms": ["AES"], "purpose": "AES polyfill"},
+    "browserify-sign": {"algorithms": ["RSA", "ECDSA"], "purpose": "signature polyfill"},
+    "create-hash": {"algorithms": ["SHA-256", "MD5", "RIPEMD-160"], "purpose": "hash polyfill"},
+    "create-hmac": {"algorithms": ["HMAC"], "purpose": "HMAC polyfill"},
+    "hash.js": {"algorithms": ["SHA-1", "SHA-256", "SHA-512", "RIPEMD-160", "HMAC"], "purpose": "hash functions"},
+    "sha.js": {"algorithms": ["SHA-1", "SHA-256", "SHA-512"], "purpose": "hash functions"},
+    "js-sha256": {"algorithms": ["SHA-256"], "purpose": "hash function"},
+    "js-sha3": {"algorithms": ["SHA-3", "Keccak"], "purpose": "hash function"},
+    "md5": {"algorithms": ["MD5"], "purpose": "hash function"},
+    "aes-js": {"algorithms": ["AES"], "purpose": "AES cipher"},
+}
+
+YARN_VERSION_RE = re.compile(r'^\s+version:?\s+"?([^"\s]+)"?')
+PNPM_PACKAGE_RE = re.compile(r"^  '?/?((?:@[^/@\s]+/)?[^/@\s(']+)[@/]([^(_:'\s]+)")
+
+
+def _name_from_spec(spec: str) -> str:
+    """
+    "@scope/pkg@^1.0.0" -> "@scope/pkg", "pkg@npm:^2" -> "pkg"
+    """
+    spec = spec.strip().strip('"')
+    at = spec.find("@", 1)
+    return spec if at == -1 else spec[:at]
+
+
+def iter_package_json(path: Path) -> Iterator[Tuple[str, Optional[str], bool, Optional[int]]]:
+    """
+    Yields (name, version_range, direct, line_number) for declared dependencies.
+    """
+    data = json.loads(path.read_text(encoding="utf-8", errors="ignore"))
+    for section in ("dependencies", "devDependencies", "optionalDependencies", "peerDependencies"):
+        for name, version in (data.get(section) or {}).items():
+            yield name, version, True, None
+
+
+def iter_package_lock(path: Path) -> Iterator[Tuple[str, Optional[str], bool, Optional[int]]]:
+    """
+    Handles lockfileVersion 1 ("dependencies" tree) and 2/3 ("packages" map).
+    """
+    data = json.loads(path.read_text(encoding="utf-8", errors="ignore"))
+
+    packages = data.get("packages")
+    if packages:
+        root = packages.get("", {})
+        root_deps = {
+            name
+            for section in ("dependencies", "devDependencies", "optionalDependencies", "peerDependencies")
+            for name in (root.get(section) or {})
+        }
+        for key, info in packages.items():
+            if "node_modules/" not in key:
+                continue
+            name = info.get("name") or key.rsplit("node_modules/", 1)[1]
+            direct = name in root_deps and key.count("node_modules/") == 1
+            yield name, info.get("version"), direct, None
+        return
+
+    # lockfileVersion 1 does not record which packages are direct.
+    stack = [data.get("dependencies") or {}]
+    while stack:
+        deps = stack.pop()
+        for name, info in deps.items():
+            yield name, info.get("version"), False, None
+            if info.get("dependencies"):
+                stack.append(info["dependencies"])
+
+
+def iter_yarn_lock(path: Path) -> Iterator[Tuple[str, Optional[str], bool, Optional[int]]]:
+    """
+    Streams yarn.lock (classic and berry) entries.
+    """
+    names: List[str] = []
+    header_line = None
+
+    with path.open(encoding="utf-8", errors="ignore") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip() or line.startswith("#"):
+                continue
+
+            if not line[0].isspace():
+                if line.startswith("__metadata"):
+                    names = []
+                    continue
+                specs = line.rstrip().rstrip(":").split(",")
+                names = sorted({_name_from_spec(spec) for spec in specs if spec.strip()})
+                header_line = line_number
+                continue
+
+            match = YARN_VERSION_RE.match(line)
+            if match and names:
+                for name in names:
+                    yield name, match.group(1), False, header_line
+                names = []
+
+
+def iter_pnpm_lock(path: Path) -> Iterator[Tuple[str, Optional[str], bool, Optional[int]]]:
+    """
+    Streams the "packages:" section of pnpm-lock.yaml (lockfile v5 through v9).
+    """
+    in_packages = False
+
+    with path.open(encoding="utf-8", errors="ignore") as f:
+        for line_number, line in enumerate(f, start=1):
+            if line and not line[0].isspace() and line.strip():
+                in_packages = line.startswith("packages:")
+                continue
+
+            if not in_packages:
+                continue
+
+            match = PNPM_PACKAGE_RE.match(line)
+            if match:
+                yield match.group(1), match.group(2), False, line_number
+
+
+PARSERS = {
+    "package.json": iter_package_json,
+    "package-lock.json": iter_package_lock,
+    "npm-shrinkwrap.json": iter_package_lock,
+    "yarn.lock": iter_yarn_lock,
+    "pnpm-lock.yaml": iter_pnpm_lock,
+}
+
+
+def find_manifests(repo_path: str | Path) -> List[Path]:
+    manifests = []
+
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d not in IGNORE_FOLDERS]
+        for filename in files:
+            if filename in MANIFEST_FILES:
+                manifests.append(Path(root) / filename)
+
+    return manifests
+
+
+def analyze_dependencies(repo_path: str | Path) -> List[Dict]:
+    """
+    Parses every manifest and lockfile once and returns CBOM entries for
+    dependencies found in CRYPTO_LIBRARY_INDEX. Locked versions win over
+    package.json ranges.
+    """
+    found: Dict[Tuple[str, str, Optional[str]], Dict] = {}
+    ranges: Dict[Tuple[str, str], Dict] = {}
+    direct_names: set[str] = set()
+
+    for manifest in find_manifests(repo_path):
+        try:
+            rows = list(PARSERS[manifest.name](manifest))
+        except Exception as e:
+            print(f"Warning: Failed to parse {manifest}: {e}")
+            continue
+
+        for name, version, direct, line_number in rows:
+            if name not in CRYPTO_LIBRARY_INDEX:
+                continue
+
+            if direct:
+                direct_names.add(name)
+
+            info = {
+                "name": name,
+                "version": version,
+                "source": str(manifest),
+                "line_number": line_number,
+            }
+            if manifest.name == "package.json":
+                ranges[(str(manifest.parent), name)] = info
+            else:
+                found.setdefault((str(manifest.parent), name, version), info)
+
+    # package.json ranges only count for packages no lockfile pinned.
+    locked_names = {name for _, name, _ in found}
+    for (manifest_dir, name), info in ranges.items():
+        if name not in locked_names:
+            found[(manifest_dir, name, info["version"])] = info
+
+    entries = []
+    for _, info in sorted(found.items(), key=lambda item: (item[0][0], item[0][1], str(item[0][2]))):
+        library = CRYPTO_LIBRARY_INDEX[info["name"]]
+        for algorithm in library["algorithms"]:
+            entries.append({
+                "file_name": info["source"],
+                "line_number": info["line_number"],
+                "api_call": None,
+                "algorithm": algorithm,
+                "cryptographic_function": None,
+                "mode": None,
+                "key_size": None,
+                "purpose": f"{library['purpose']} (via {info['name']}@{info['version']})",
+                "multiple_uses": len(library["algorithms"]) > 1,
+                "dependency": {
+                    "name": info["name"],
+                    "version": info["version"],
+                    "direct": info["name"] in direct_names,
+                },
+            })
+
+    return entries
+
+
+def write_dependency_cbom(repo_path: str | Path, output_path: str | Path) -> List[Dict]:
+    entries = analyze_dependencies(repo_path)
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(entries, indent=4), encoding="utf-8")
+
+    return entries
+
+
+def main():
+    root = sys.argv[1] if len(sys.argv) > 1 else "."
+    output_file = "results/dependency_cbom.json"
+
+    start = time.time()
+    entries = write_dependency_cbom(root, output_file)
+    packages = {(e["dependency"]["name"], e["dependency"]["version"]) for e in entries}
+
+    print(f"Dependency scan complete: {len(packages)} crypto packages, {len(entries)} entries in {time.time() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
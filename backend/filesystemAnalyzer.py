@@ -3,7 +3,7 @@ import stat
 import json
 import time
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Set
 
 def safe_stat(path: Path):
     try:
@@ -54,46 +54,83 @@ def file_metadata(path: Path) -> Dict:
     return metadata
 
 
-def scan_filesystem(
+def iter_filesystem(
     root: str,
-    follow_symlinks: bool = False
-) -> List[Dict]:
-    results = []
+    follow_symlinks: bool = False,
+    ignore_dirs: Optional[Set[str]] = None,
+) -> Iterator[Dict]:
     root_path = Path(root)
 
     for dirpath, dirnames, filenames in os.walk(
         root_path,
         followlinks=follow_symlinks
     ):
+        if ignore_dirs:
+            dirnames[:] = [d for d in dirnames if d not in ignore_dirs]
         dirpath = Path(dirpath)
 
         dir_meta = file_metadata(dirpath)
         if dir_meta:
-            results.append(dir_meta)
+            yield dir_meta
 
         for name in filenames:
             file_path = dirpath / name
             meta = file_metadata(file_path)
             if meta:
-                results.append(meta)
-
-    return results
+                yield meta
 
 
-def main():
-    root = "."
-    output_file = "results/filesystem_inventory.json"
-
-    inventory = {
+def scan_filesystem(
+    root: str,
+    follow_symlinks: bool = False
+) -> List[Dict]:
+    return list(iter_filesystem(root, follow_symlinks))
+
+
+def write_inventory(
+    root: str = ".",
+    output_file: str = "results/filesystem_inventory.json",
+    scan_binaries: bool = False,
+    max_workers: Optional[int] = None,
+) -> dict:
+    """
+    Walks root and writes each entry to output_file as it is found, so the
+    inventory of a whole host is never held in memory. With scan_binaries,
+    native binaries and wasm also get a "crypto_constants" list of the
+    crypto constant tables embedded in them (see backend/binaryAnalyzer.py).
+
+    Returns:
+        { "scan_root": <str>, "scan_time": <float>, "entries": <int>, "binaries_with_crypto": <int> }
+    """
+    summary = {
         "scan_root": root,
         "scan_time": time.time(),
-        "entries": scan_filesystem(root)
+        "entries": 0,
+        "binaries_with_crypto": 0,
     }
 
+    entries = iter_filesystem(root)
+    if scan_binaries:
+        from backend.binaryAnalyzer import annotate_entries
+
+        entries = annotate_entries(entries, max_workers)
+
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
     with open(output_file, "w") as f:
-        json.dump(inventory, f, indent=2)
+        f.write(f'{{\n  "scan_root": {json.dumps(root)},\n  "scan_time": {json.dumps(summary["scan_time"])},\n  "entries": [')
+        for entry in entries:
+            f.write(("," if summary["entries"] else "") + "\n    " + json.dumps(entry))
+            summary["entries"] += 1
+            if entry.get("crypto_constants"):
+                summary["binaries_with_crypto"] += 1
+        f.write("\n  ]\n}\n")
 
-    print(f"Scan complete: {len(inventory['entries'])} entries")
+    return summary
+
+
+def main():
+    summary = write_inventory()
+    print(f"Scan complete: {summary['entries']} entries")
 
 
 if __name__ == "__main__":
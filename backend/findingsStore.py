@@ -0,0 +1,244 @@
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from backend.queries import connect
+from cbomWriter import QUANTUM_VULNERABLE, iter_cbom_entries, iter_usages, normalize_algorithm
+
+# Result files of one repository scan and the finding source each is recorded
+# as. Network and binary CBOMs come from separate commands that record them
+# under their own project key (see record_result_file).
+RESULT_SOURCES = [
+    ("python_cbom.json", "python"),
+    ("dependency_cbom.json", "dependency"),
+]
+
+
+def _finding_row(project_key: str, source: str, usage: Dict[str, Any]) -> Optional[tuple]:
+    algorithm = normalize_algorithm(usage)
+    if algorithm is None:
+        return None
+
+    line = usage.get("line_number")
+    return (
+        project_key,
+        source,
+        usage.get("file_name"),
+        line if isinstance(line, int) else None,
+        algorithm["family"],
+        algorithm["primitive"],
+        algorithm["mode"],
+        algorithm["key_size"] or 0,
+        usage.get("cryptographic_function"),
+        str(usage["api_call"])[:200] if usage.get("api_call") else None,
+        int(algorithm["family"] in QUANTUM_VULNERABLE),
+    )
+
+
+def record_findings(
+    project_key: str,
+    usages: Iterable[Dict[str, Any]],
+    source: str = "code",
+    project_name: Optional[str] = None,
+) -> int:
+    """
+    Replaces the findings of project_key from source with usages (flat CBOM
+    entries) in one transaction. Summary tables follow via triggers.
+
+    Returns the number of findings recorded.
+    """
+    conn = connect()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        """
+        INSERT INTO findingProject (projectKey, projectName, lastScannedAt)
+        VALUES (?, ?, ?)
+        ON CONFLICT (projectKey) DO UPDATE SET lastScannedAt = excluded.lastScannedAt
+        """,
+        (project_key, project_name or project_key, time.time())
+    )
+    cursor.execute("DELETE FROM finding WHERE projectKey = ? AND source = ?", (project_key, source))
+
+    rows = (_finding_row(project_key, source, usage) for usage in usages)
+    cursor.executemany(
+        """
+        INSERT INTO finding (
+            projectKey, source, filePath, line, algorithm, primitive,
+            mode, keySize, function, apiCall, quantumVulnerable
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (row for row in rows if row is not None)
+    )
+    cursor.execute(
+        "SELECT COUNT(*) FROM finding WHERE projectKey = ? AND source = ?",
+        (project_key, source)
+    )
+    recorded = cursor.fetchone()[0]
+
+    conn.commit()
+    conn.close()
+
+    return recorded
+
+
+def record_scan_results(project_key: str, results_dir: str | Path, project_name: Optional[str] = None) -> Dict[str, int]:
+    """
+    Records the CBOM, Python and dependency findings a scan left in results_dir.
+
+    Returns { source: <findings recorded> }
+    """
+    results_dir = Path(results_dir)
+    counts: Dict[str, int] = {}
+
+    # `run --stream` writes .jsonl, the `cbom` stage writes .json; use the newer.
+    outputs = [p for p in (results_dir / "cbom_output.jsonl", results_dir / "cbom_output.json") if p.exists()]
+    if outputs:
+        latest = max(outputs, key=lambda p: p.stat().st_mtime)
+        usages = (
+            usage
+            for entry in iter_cbom_entries(latest)
+            for usage in iter_usages(entry, from_matches=True)
+        )
+        counts["code"] = record_findings(project_key, usages, "code", project_name)
+
+    for filename, source in RESULT_SOURCES:
+        path = results_dir / filename
+        if path.exists():
+            counts[source] = record_result_file(project_key, path, source, project_name)
+
+    return counts
+
+
+def record_result_file(project_key: str, path: str | Path, source: str, project_name: Optional[str] = None) -> int:
+    """
+    Records one flat CBOM file (e.g. network_cbom.json) as source.
+
+    Returns the number of findings recorded.
+    """
+    return record_findings(project_key, json.loads(Path(path).read_text()), source, project_name)
+
+
+def _family(algorithm: str) -> str:
+    normalized = normalize_algorithm({"algorithm": algorithm})
+    return normalized["family"] if normalized else algorithm
+
+
+def projects_using(algorithm: str, max_key_size: Optional[int] = None) -> list[tuple]:
+    """
+    Returns (projectKey, keySize, usages) rows for projects using algorithm,
+    optionally only with known key sizes up to max_key_size.
+    """
+    conn = connect()
+    cursor = conn.cursor()
+
+    if max_key_size is None:
+        cursor.execute(
+            """
+            SELECT projectKey, keySize, usages FROM projectAlgorithmSummary
+            WHERE algorithm = ?
+            ORDER BY usages DESC
+            """,
+            (_family(algorithm),)
+        )
+    else:
+        cursor.execute(
+            """
+            SELECT projectKey, keySize, usages FROM projectAlgorithmSummary
+            WHERE algorithm = ? AND keySize BETWEEN 1 AND ?
+            ORDER BY usages DESC
+            """,
+            (_family(algorithm), max_key_size)
+        )
+
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def find_findings(algorithm: str, max_key_size: Optional[int] = None, limit: int = 100) -> list[tuple]:
+    """
+    Returns (projectKey, filePath, line, algorithm, keySize, mode, function)
+    rows for individual usages of algorithm.
+    """
+    conn = connect()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        """
+        SELECT projectKey, filePath, line, algorithm, keySize, mode, function
+        FROM finding
+        WHERE algorithm = ? AND (? IS NULL OR keySize BETWEEN 1 AND ?)
+        LIMIT ?
+        """,
+        (_family(algorithm), max_key_size, max_key_size, limit)
+    )
+
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def algorithm_summary() -> list[tuple]:
+    """
+    Returns (algorithm, keySize, usages, projects) rows across all projects.
+    """
+    conn = connect()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        "SELECT algorithm, keySize, usages, projects FROM algorithmSummary ORDER BY projects DESC, usages DESC"
+    )
+
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def readiness_report() -> list[tuple]:
+    """
+    Returns (projectKey, findings, quantumVulnerable, lastScannedAt) rows,
+    projects with the most quantum-vulnerable usages first.
+    """
+    conn = connect()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        """
+        SELECT projectKey, findings, quantumVulnerable, lastScannedAt FROM findingProject
+        ORDER BY quantumVulnerable DESC, findings DESC
+        """
+    )
+
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def delete_findings(project_key: str) -> None:
+    """
+    Deletes a project's findings; summaries are updated by the triggers.
+    """
+    conn = connect()
+    cursor = conn.cursor()
+
+    cursor.execute("DELETE FROM findingProject WHERE projectKey = ?", (project_key,))
+
+    conn.commit()
+    conn.close()
+
+
+def main():
+    if len(sys.argv) > 1:
+        for row in projects_using(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else None):
+            print(*row, sep="\t")
+        return
+
+    for row in algorithm_summary():
+        print(*row, sep="\t")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+DB_PATH = Path(__file__).resolve().parent.parent / "pqc.db"
+
+# (version, description, sql). Append new migrations; never edit applied ones.
+# The applied version is tracked in SQLite's PRAGMA user_version.
+MIGRATIONS = [
+    (1, "initial schema", """
+        CREATE TABLE IF NOT EXISTS project (
+            projectId TEXT PRIMARY KEY,
+            projectName TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS projectFile (
+            fileId TEXT PRIMARY KEY,
+            fileName TEXT NOT NULL,
+            projectId TEXT NOT NULL,
+            FOREIGN KEY (projectId) REFERENCES project(projectId) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS fileAST (
+            astId TEXT PRIMARY KEY,
+            fileId TEXT NOT NULL,
+            ast TEXT NOT NULL, -- stores JSON
+            FOREIGN KEY (fileId) REFERENCES projectFile(fileId) ON DELETE CASCADE
+        );
+    """),
+    (2, "index foreign keys", """
+        CREATE INDEX IF NOT EXISTS idx_projectFile_projectId ON projectFile(projectId);
+        CREATE INDEX IF NOT EXISTS idx_fileAST_fileId ON fileAST(fileId);
+    """),
+    (3, "cross-project findings and summaries", """
+        -- Unlike project, these tables survive clear_database(): one row per
+        -- scanned repository (projectKey is its URL or path), replaced on rescan.
+        CREATE TABLE IF NOT EXISTS findingProject (
+            projectKey TEXT PRIMARY KEY,
+            projectName TEXT NOT NULL,
+            lastScannedAt REAL NOT NULL,
+            findings INTEGER NOT NULL DEFAULT 0,
+            quantumVulnerable INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS finding (
+            findingId INTEGER PRIMARY KEY,
+            projectKey TEXT NOT NULL,
+            source TEXT NOT NULL, -- code, python, dependency
+            filePath TEXT,
+            line INTEGER,
+            algorithm TEXT NOT NULL, -- normalized family, e.g. RSA, AES, SHA-1
+            primitive TEXT,
+            mode TEXT,
+            keySize INTEGER NOT NULL DEFAULT 0, -- 0 when unknown
+            function TEXT,
+            apiCall TEXT,
+            quantumVulnerable INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (projectKey) REFERENCES findingProject(projectKey) ON DELETE CASCADE
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_finding_algorithm_keySize ON finding(algorithm, keySize);
+        CREATE INDEX IF NOT EXISTS idx_finding_keySize ON finding(keySize);
+        CREATE INDEX IF NOT EXISTS idx_finding_projectKey_source ON finding(projectKey, source);
+
+        CREATE TABLE IF NOT EXISTS projectAlgorithmSummary (
+            projectKey TEXT NOT NULL,
+            algorithm TEXT NOT NULL,
+            keySize INTEGER NOT NULL,
+            usages INTEGER NOT NULL,
+            PRIMARY KEY (projectKey, algorithm, keySize)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS algorithmSummary (
+            algorithm TEXT NOT NULL,
+            keySize INTEGER NOT NULL,
+            usages INTEGER NOT NULL,
+            projects INTEGER NOT NULL,
+            PRIMARY KEY (algorithm, keySize)
+        ) WITHOUT ROWID;
+
+        -- Summaries are maintained row by row, so they are always current
+        -- without re-aggregating finding.
+        CREATE TRIGGER IF NOT EXISTS trg_finding_insert AFTER INSERT ON finding
+        BEGIN
+            INSERT INTO algorithmSummary (algorithm, keySize, usages, projects)
+            VALUES (
+                NEW.algorithm, NEW.keySize, 1,
+                NOT EXISTS (
+                    SELECT 1 FROM projectAlgorithmSummary
+                    WHERE projectKey = NEW.projectKey AND algorithm = NEW.algorithm AND keySize = NEW.keySize
+                )
+            )
+            ON CONFLICT (algorithm, keySize) DO UPDATE
+            SET usages = usages + 1, projects = projects + excluded.projects;
+
+            INSERT INTO projectAlgorithmSummary (projectKey, algorithm, keySize, usages)
+            VALUES (NEW.projectKey, NEW.algorithm, NEW.keySize, 1)
+            ON CONFLICT (projectKey, algorithm, keySize) DO UPDATE SET usages = usages + 1;
+
+            UPDATE findingProject
+            SET findings = findings + 1, quantumVulnerable = quantumVulnerable + NEW.quantumVulnerable
+            WHERE projectKey = NEW.projectKey;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_finding_delete AFTER DELETE ON finding
+        BEGIN
+            UPDATE projectAlgorithmSummary SET usages = usages - 1
+            WHERE projectKey = OLD.projectKey AND algorithm = OLD.algorithm AND keySize = OLD.keySize;
+
+            UPDATE algorithmSummary
+            SET usages = usages - 1,
+                projects = projects - (
+                    SELECT usages = 0 FROM projectAlgorithmSummary
+                    WHERE projectKey = OLD.projectKey AND algorithm = OLD.algorithm AND keySize = OLD.keySize
+                )
+            WHERE algorithm = OLD.algorithm AND keySize = OLD.keySize;
+
+            DELETE FROM projectAlgorithmSummary
+            WHERE projectKey = OLD.projectKey AND algorithm = OLD.algorithm AND keySize = OLD.keySize AND usages <= 0;
+
+            DELETE FROM algorithmSummary
+            WHERE algorithm = OLD.algorithm AND keySize = OLD.keySize AND usages <= 0;
+
+            UPDATE findingProject
+            SET findings = findings - 1, quantumVulnerable = quantumVulnerable - OLD.quantumVulnerable
+            WHERE projectKey = OLD.projectKey;
+        END;
+    """),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, target: int = LATEST_VERSION) -> int:
+    """
+    Applies pending migrations up to target, each in its own transaction.
+    Returns the resulting schema version.
+    """
+    version = current_version(conn)
+
+    for number, description, sql in MIGRATIONS:
+        if number <= version or number > target:
+            continue
+
+        try:
+            conn.executescript(f"BEGIN;\n{sql}\nPRAGMA user_version = {number};\nCOMMIT;")
+        except sqlite3.Error as e:
+            conn.rollback()
+            raise RuntimeError(f"Migration {number} ({description}) failed: {e}") from e
+
+        version = number
+
+    return version
+
+
+def main():
+    db_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DB_PATH
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    before = current_version(conn)
+    after = migrate(conn)
+    conn.close()
+
+    print(f"Schema at {db_path}: version {before} -> {after}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,705 @@
+import json
+import struct
+import sys
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+# Captures are read in large sequential chunks; only one packet is held at a time.
+READ_BUFFER = 1024 * 1024
+
+# Reassembly limits: at most MAX_FLOWS half-connections are tracked (least
+# recently used evicted), each buffering at most MAX_HANDSHAKE_BYTES and
+# MAX_PENDING out-of-order segments, and only until its hello is parsed.
+MAX_FLOWS = 16384
+MAX_HANDSHAKE_BYTES = 32 * 1024
+MAX_PENDING = 8
+# Distinct server endpoints reported individually; the rest are pooled.
+MAX_SERVICES = 10000
+OTHER_SERVICES = "other"
+
+PCAP_HEADERS = {
+    b"\xd4\xc3\xb2\xa1": "<",
+    b"\xa1\xb2\xc3\xd4": ">",
+    b"\x4d\x3c\xb2\xa1": "<",  # nanosecond timestamps
+    b"\xa1\xb2\x3c\x4d": ">",
+}
+PCAPNG_SECTION = b"\x0a\x0d\x0d\x0a"
+PCAPNG_BYTE_ORDER = {b"\x4d\x3c\x2b\x1a": "<", b"\x1a\x2b\x3c\x4d": ">"}
+
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = {12, 14, 101}
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_LINUX_SLL2 = 276
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+ETHERTYPE_VLAN = {0x8100, 0x88A8, 0x9100}
+IPV6_EXTENSION_HEADERS = {0, 43, 60}
+IPPROTO_TCP = 6
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_FIN = 0x01
+
+TLS_HANDSHAKE = 22
+HANDSHAKE_CLIENT_HELLO = 1
+HANDSHAKE_SERVER_HELLO = 2
+HANDSHAKE_SERVER_KEY_EXCHANGE = 12
+HANDSHAKE_SERVER_HELLO_DONE = 14
+EXT_SUPPORTED_GROUPS = 10
+EXT_SIGNATURE_ALGORITHMS = 13
+EXT_SUPPORTED_VERSIONS = 43
+EXT_KEY_SHARE = 51
+# ServerHello.random of a HelloRetryRequest (RFC 8446 4.1.3).
+HELLO_RETRY_RANDOM = bytes.fromhex("cf21ad74e59a6111be1d8c021e65b891c2a211167abb8c5e079e09e2c8a8339c")
+
+TLS_VERSIONS = {
+    0x0300: "SSL 3.0",
+    0x0301: "TLS 1.0",
+    0x0302: "TLS 1.1",
+    0x0303: "TLS 1.2",
+    0x0304: "TLS 1.3",
+}
+
+CIPHER_SUITES = {
+    0x1301: "TLS_AES_128_GCM_SHA256",
+    0x1302: "TLS_AES_256_GCM_SHA384",
+    0x1303: "TLS_CHACHA20_POLY1305_SHA256",
+    0x1304: "TLS_AES_128_CCM_SHA256",
+    0x1305: "TLS_AES_128_CCM_8_SHA256",
+    0xC02B: "TLS_ECDHE_ECDSA_WITH_AES_128_GCM_SHA256",
+    0xC02C: "TLS_ECDHE_ECDSA_WITH_AES_256_GCM_SHA384",
+    0xC02F: "TLS_ECDHE_RSA_WITH_AES_128_GCM_SHA256",
+    0xC030: "TLS_ECDHE_RSA_WITH_AES_256_GCM_SHA384",
+    0xCCA8: "TLS_ECDHE_RSA_WITH_CHACHA20_POLY1305_SHA256",
+    0xCCA9: "TLS_ECDHE_ECDSA_WITH_CHACHA20_POLY1305_SHA256",
+    0xCCAA: "TLS_DHE_RSA_WITH_CHACHA20_POLY1305_SHA256",
+    0xC0AC: "TLS_ECDHE_ECDSA_WITH_AES_128_CCM",
+    0xC0AD: "TLS_ECDHE_ECDSA_WITH_AES_256_CCM",
+    0xC009: "TLS_ECDHE_ECDSA_WITH_AES_128_CBC_SHA",
+    0xC00A: "TLS_ECDHE_ECDSA_WITH_AES_256_CBC_SHA",
+    0xC013: "TLS_ECDHE_RSA_WITH_AES_128_CBC_SHA",
+    0xC014: "TLS_ECDHE_RSA_WITH_AES_256_CBC_SHA",
+    0xC023: "TLS_ECDHE_ECDSA_WITH_AES_128_CBC_SHA256",
+    0xC024: "TLS_ECDHE_ECDSA_WITH_AES_256_CBC_SHA384",
+    0xC027: "TLS_ECDHE_RSA_WITH_AES_128_CBC_SHA256",
+    0xC028: "TLS_ECDHE_RSA_WITH_AES_256_CBC_SHA384",
+    0xC008: "TLS_ECDHE_ECDSA_WITH_3DES_EDE_CBC_SHA",
+    0xC012: "TLS_ECDHE_RSA_WITH_3DES_EDE_CBC_SHA",
+    0xC007: "TLS_ECDHE_ECDSA_WITH_RC4_128_SHA",
+    0xC011: "TLS_ECDHE_RSA_WITH_RC4_128_SHA",
+    0x009E: "TLS_DHE_RSA_WITH_AES_128_GCM_SHA256",
+    0x009F: "TLS_DHE_RSA_WITH_AES_256_GCM_SHA384",
+    0x0033: "TLS_DHE_RSA_WITH_AES_128_CBC_SHA",
+    0x0039: "TLS_DHE_RSA_WITH_AES_256_CBC_SHA",
+    0x0067: "TLS_DHE_RSA_WITH_AES_128_CBC_SHA256",
+    0x006B: "TLS_DHE_RSA_WITH_AES_256_CBC_SHA256",
+    0x0016: "TLS_DHE_RSA_WITH_3DES_EDE_CBC_SHA",
+    0x009C: "TLS_RSA_WITH_AES_128_GCM_SHA256",
+    0x009D: "TLS_RSA_WITH_AES_256_GCM_SHA384",
+    0x002F: "TLS_RSA_WITH_AES_128_CBC_SHA",
+    0x0035: "TLS_RSA_WITH_AES_256_CBC_SHA",
+    0x003C: "TLS_RSA_WITH_AES_128_CBC_SHA256",
+    0x003D: "TLS_RSA_WITH_AES_256_CBC_SHA256",
+    0x000A: "TLS_RSA_WITH_3DES_EDE_CBC_SHA",
+    0x0005: "TLS_RSA_WITH_RC4_128_SHA",
+    0x0004: "TLS_RSA_WITH_RC4_128_MD5",
+    0x00FF: "TLS_EMPTY_RENEGOTIATION_INFO_SCSV",
+    0x5600: "TLS_FALLBACK_SCSV",
+}
+
+# Named groups and the algorithm each stands for in CBOM rows.
+GROUPS = {
+    23: ("secp256r1", "ECDH P-256"),
+    24: ("secp384r1", "ECDH P-384"),
+    25: ("secp521r1", "ECDH P-521"),
+    29: ("x25519", "X25519"),
+    30: ("x448", "X448"),
+    256: ("ffdhe2048", "DH 2048"),
+    257: ("ffdhe3072", "DH 3072"),
+    258: ("ffdhe4096", "DH 4096"),
+    259: ("ffdhe6144", "DH 6144"),
+    260: ("ffdhe8192", "DH 8192"),
+    0x0200: ("MLKEM512", "ML-KEM-512"),
+    0x0201: ("MLKEM768", "ML-KEM-768"),
+    0x0202: ("MLKEM1024", "ML-KEM-1024"),
+    0x11EB: ("SecP256r1MLKEM768", "ML-KEM-768 (hybrid with ECDH P-256)"),
+    0x11EC: ("X25519MLKEM768", "ML-KEM-768 (hybrid with X25519)"),
+    0x11ED: ("SecP384r1MLKEM1024", "ML-KEM-1024 (hybrid with ECDH P-384)"),
+    0x6399: ("X25519Kyber768Draft00", "Kyber-768 draft (hybrid with X25519)"),
+    0x639A: ("SecP256r1Kyber768Draft00", "Kyber-768 draft (hybrid with ECDH P-256)"),
+}
+PQC_GROUPS = {name for code, (name, _) in GROUPS.items() if code >= 0x0200}
+
+# Signature schemes and the algorithm each stands for in CBOM rows.
+SIGNATURE_SCHEMES = {
+    0x0201: ("rsa_pkcs1_sha1", "RSA PKCS#1 v1.5"),
+    0x0203: ("ecdsa_sha1", "ECDSA"),
+    0x0401: ("rsa_pkcs1_sha256", "RSA PKCS#1 v1.5"),
+    0x0501: ("rsa_pkcs1_sha384", "RSA PKCS#1 v1.5"),
+    0x0601: ("rsa_pkcs1_sha512", "RSA PKCS#1 v1.5"),
+    0x0403: ("ecdsa_secp256r1_sha256", "ECDSA P-256"),
+    0x0503: ("ecdsa_secp384r1_sha384", "ECDSA P-384"),
+    0x0603: ("ecdsa_secp521r1_sha512", "ECDSA P-521"),
+    0x0804: ("rsa_pss_rsae_sha256", "RSA-PSS"),
+    0x0805: ("rsa_pss_rsae_sha384", "RSA-PSS"),
+    0x0806: ("rsa_pss_rsae_sha512", "RSA-PSS"),
+    0x0807: ("ed25519", "Ed25519"),
+    0x0808: ("ed448", "Ed448"),
+    0x0809: ("rsa_pss_pss_sha256", "RSA-PSS"),
+    0x080A: ("rsa_pss_pss_sha384", "RSA-PSS"),
+    0x080B: ("rsa_pss_pss_sha512", "RSA-PSS"),
+    0x0904: ("mldsa44", "ML-DSA-44"),
+    0x0905: ("mldsa65", "ML-DSA-65"),
+    0x0906: ("mldsa87", "ML-DSA-87"),
+}
+
+U16 = struct.Struct(">H")
+TCP_HEADER = struct.Struct(">HHI")
+
+
+def _is_grease(value: int) -> bool:
+    return (value & 0x0F0F) == 0x0A0A and (value >> 8) == (value & 0xFF)
+
+
+def _name(table: dict, value: int) -> str:
+    name = table.get(value)
+    if isinstance(name, tuple):
+        name = name[0]
+    return name or f"0x{value:04X}"
+
+
+def _u16_list(data: bytes) -> List[int]:
+    return [v for (v,) in struct.iter_unpack(">H", data[: len(data) - len(data) % 2]) if not _is_grease(v)]
+
+
+def _iter_pcap(f: BinaryIO, endian: str) -> Iterator[Tuple[int, bytes]]:
+    header = f.read(20)
+    if len(header) < 20:
+        return
+    linktype = struct.unpack(endian + "I", header[16:20])[0] & 0xFFFF
+
+    record = struct.Struct(endian + "IIII")
+    read = f.read
+    while True:
+        head = read(16)
+        if len(head) < 16:
+            return
+        _, _, captured, _ = record.unpack(head)
+        data = read(captured)
+        if len(data) < captured:
+            return
+        yield linktype, data
+
+
+def _iter_pcapng(f: BinaryIO, first: bytes) -> Iterator[Tuple[int, bytes]]:
+    endian = "<"
+    linktypes: List[int] = []
+    head = first + f.read(8)
+
+    while len(head) == 12:
+        if head[:4] == PCAPNG_SECTION:
+            # Section header: byte order is only known from its body.
+            endian = PCAPNG_BYTE_ORDER.get(head[8:12], endian)
+            linktypes = []
+            length = struct.unpack(endian + "I", head[4:8])[0]
+            f.read(length - 12)
+        else:
+            block_type, length = struct.unpack(endian + "II", head[:8])
+            body = head[8:12] + f.read(length - 12)
+            if len(body) < length - 8:
+                return
+
+            if block_type == 1:
+                linktypes.append(struct.unpack(endian + "H", body[:2])[0])
+            elif block_type == 6:
+                interface, _, _, captured, _ = struct.unpack(endian + "IIIII", body[:20])
+                if interface < len(linktypes):
+                    yield linktypes[interface], body[20:20 + captured]
+            elif block_type == 3 and linktypes:
+                original = struct.unpack(endian + "I", body[:4])[0]
+                yield linktypes[0], body[4:min(4 + original, len(body) - 4)]
+            elif block_type == 2:
+                interface = struct.unpack(endian + "H", body[:2])[0]
+                captured = struct.unpack(endian + "I", body[12:16])[0]
+                if interface < len(linktypes):
+                    yield linktypes[interface], body[20:20 + captured]
+
+        head = f.read(12)
+
+
+def iter_packets(capture_path: str | Path) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yields (linktype, frame) for each packet of a pcap or pcapng file, reading
+    it front to back without holding more than one packet.
+    """
+    with open(capture_path, "rb", buffering=READ_BUFFER) as f:
+        magic = f.read(4)
+        if magic in PCAP_HEADERS:
+            yield from _iter_pcap(f, PCAP_HEADERS[magic])
+        elif magic == PCAPNG_SECTION:
+            yield from _iter_pcapng(f, magic)
+        else:
+            raise ValueError(f"Not a pcap or pcapng file: {capture_path}")
+
+
+def tcp_segment(linktype: int, frame: bytes) -> Optional[tuple]:
+    """
+    Returns (src, sport, dst, dport, seq, flags, payload) for a TCP segment
+    over IPv4 or IPv6, or None for anything else (including IP fragments).
+    """
+    if linktype == LINKTYPE_ETHERNET:
+        offset, ethertype = 14, U16.unpack_from(frame, 12)[0] if len(frame) >= 14 else 0
+        while ethertype in ETHERTYPE_VLAN and len(frame) >= offset + 4:
+            ethertype = U16.unpack_from(frame, offset + 2)[0]
+            offset += 4
+    elif linktype == LINKTYPE_LINUX_SLL:
+        offset, ethertype = 16, U16.unpack_from(frame, 14)[0] if len(frame) >= 16 else 0
+    elif linktype == LINKTYPE_LINUX_SLL2:
+        offset, ethertype = 20, U16.unpack_from(frame, 0)[0] if len(frame) >= 20 else 0
+    elif linktype == LINKTYPE_NULL or linktype in LINKTYPE_RAW:
+        offset = 4 if linktype == LINKTYPE_NULL else 0
+        version = frame[offset] >> 4 if len(frame) > offset else 0
+        ethertype = ETHERTYPE_IPV4 if version == 4 else ETHERTYPE_IPV6 if version == 6 else 0
+    else:
+        return None
+
+    if ethertype == ETHERTYPE_IPV4:
+        if len(frame) < offset + 20 or frame[offset + 9] != IPPROTO_TCP:
+            return None
+        if U16.unpack_from(frame, offset + 6)[0] & 0x3FFF:
+            return None
+        total = U16.unpack_from(frame, offset + 2)[0]
+        end = offset + total if total else len(frame)
+        src, dst = frame[offset + 12:offset + 16], frame[offset + 16:offset + 20]
+        offset += (frame[offset] & 0x0F) * 4
+    elif ethertype == ETHERTYPE_IPV6:
+        if len(frame) < offset + 40:
+            return None
+        next_header = frame[offset + 6]
+        payload_length = U16.unpack_from(frame, offset + 4)[0]
+        end = offset + 40 + payload_length if payload_length else len(frame)
+        src, dst = frame[offset + 8:offset + 24], frame[offset + 24:offset + 40]
+        offset += 40
+        while next_header in IPV6_EXTENSION_HEADERS and len(frame) >= offset + 2:
+            next_header = frame[offset]
+            offset += (frame[offset + 1] + 1) * 8
+        if next_header != IPPROTO_TCP:
+            return None
+    else:
+        return None
+
+    if len(frame) < offset + 20:
+        return None
+    sport, dport, seq = TCP_HEADER.unpack_from(frame, offset)
+    flags = frame[offset + 13]
+    payload = frame[offset + (frame[offset + 12] >> 4) * 4:min(end, len(frame))]
+    return src, sport, dst, dport, seq, flags, payload
+
+
+def _extensions(data: bytes, offset: int) -> Dict[int, bytes]:
+    extensions: Dict[int, bytes] = {}
+    if offset + 2 > len(data):
+        return extensions
+    end = min(len(data), offset + 2 + U16.unpack_from(data, offset)[0])
+    offset += 2
+    while offset + 4 <= end:
+        ext_type, length = struct.unpack_from(">HH", data, offset)
+        extensions[ext_type] = data[offset + 4:offset + 4 + length]
+        offset += 4 + length
+    return extensions
+
+
+def parse_client_hello(body: bytes) -> dict:
+    offset = 2 + 32
+    offset += 1 + body[offset]                                  # session id
+    suites_length = U16.unpack_from(body, offset)[0]
+    suites = _u16_list(body[offset + 2:offset + 2 + suites_length])
+    offset += 2 + suites_length
+    offset += 1 + body[offset]                                  # compression methods
+    extensions = _extensions(body, offset)
+
+    versions = [U16.unpack_from(body, 0)[0]]
+    if EXT_SUPPORTED_VERSIONS in extensions:
+        versions = _u16_list(extensions[EXT_SUPPORTED_VERSIONS][1:])
+
+    key_shares = []
+    shares = extensions.get(EXT_KEY_SHARE, b"")[2:]
+    while len(shares) >= 4:
+        group, length = struct.unpack_from(">HH", shares)
+        if not _is_grease(group):
+            key_shares.append(group)
+        shares = shares[4 + length:]
+
+    return {
+        "versions": versions,
+        "cipher_suites": suites,
+        "groups": _u16_list(extensions.get(EXT_SUPPORTED_GROUPS, b"")[2:]),
+        "key_shares": key_shares,
+        "signature_algorithms": _u16_list(extensions.get(EXT_SIGNATURE_ALGORITHMS, b"")[2:]),
+    }
+
+
+def parse_server_hello(body: bytes) -> dict:
+    retry = body[2:34] == HELLO_RETRY_RANDOM
+    offset = 2 + 32
+    offset += 1 + body[offset]
+    suite = U16.unpack_from(body, offset)[0]
+    extensions = _extensions(body, offset + 3)
+
+    version = U16.unpack_from(body, 0)[0]
+    if len(extensions.get(EXT_SUPPORTED_VERSIONS, b"")) == 2:
+        version = U16.unpack_from(extensions[EXT_SUPPORTED_VERSIONS])[0]
+
+    group = None
+    if len(extensions.get(EXT_KEY_SHARE, b"")) >= 2:
+        group = U16.unpack_from(extensions[EXT_KEY_SHARE])[0]
+
+    return {"version": version, "cipher_suite": suite, "group": group, "hello_retry": retry}
+
+
+def parse_server_key_exchange(body: bytes) -> dict:
+    """
+    Group and signature scheme of a TLS 1.2 ECDHE ServerKeyExchange.
+    """
+    if not body or body[0] != 3:                               # named_curve
+        return {}
+    group = U16.unpack_from(body, 1)[0]
+    offset = 4 + body[3]
+    if offset + 2 > len(body):
+        return {"group": group}
+    return {"group": group, "signature_algorithm": U16.unpack_from(body, offset)[0]}
+
+
+class _HalfStream:
+    """
+    One direction of a TCP connection, reassembled until its hello is parsed.
+    """
+
+    __slots__ = ("next_seq", "data", "pending", "server_hello")
+
+    def __init__(self, seq: int):
+        self.next_seq = seq
+        self.data = bytearray()
+        self.pending: Dict[int, bytes] = {}
+        self.server_hello: Optional[dict] = None
+
+    def add(self, seq: int, payload: bytes):
+        ahead = (seq - self.next_seq) & 0xFFFFFFFF
+        if ahead == 0:
+            self.data += payload
+            self.next_seq = (self.next_seq + len(payload)) & 0xFFFFFFFF
+            while self.next_seq in self.pending:
+                segment = self.pending.pop(self.next_seq)
+                self.data += segment
+                self.next_seq = (self.next_seq + len(segment)) & 0xFFFFFFFF
+        elif ahead < 0x80000000:
+            if len(self.pending) < MAX_PENDING:
+                self.pending[seq] = payload
+        else:
+            # Retransmission overlapping what we already have.
+            overlap = (self.next_seq - seq) & 0xFFFFFFFF
+            if overlap < len(payload):
+                self.add(self.next_seq, payload[overlap:])
+
+    def handshake_messages(self) -> Iterator[Tuple[int, bytes]]:
+        """
+        Yields complete handshake messages at the start of the stream; stops
+        at the first incomplete one or at any non-handshake record.
+        """
+        handshake = bytearray()
+        offset = 0
+        data = self.data
+        while offset + 5 <= len(data) and data[offset] == TLS_HANDSHAKE:
+            length = U16.unpack_from(data, offset + 3)[0]
+            if offset + 5 + length > len(data):
+                break
+            handshake += data[offset + 5:offset + 5 + length]
+            offset += 5 + length
+
+        offset = 0
+        while offset + 4 <= len(handshake):
+            length = int.from_bytes(handshake[offset + 1:offset + 4], "big")
+            if offset + 4 + length > len(handshake):
+                return
+            yield handshake[offset], bytes(handshake[offset + 4:offset + 4 + length])
+            offset += 4 + length
+
+
+def _endpoint(address: bytes, port: int) -> str:
+    if len(address) == 4:
+        return f"{'.'.join(map(str, address))}:{port}"
+    groups = [f"{v:x}" for (v,) in struct.iter_unpack(">H", address)]
+    return f"[{':'.join(groups)}]:{port}"
+
+
+class TlsInventory:
+    """
+    Aggregated TLS parameters seen in captures: what clients offer and what
+    each server negotiates. Memory is bounded by the flow table and the
+    number of distinct parameter combinations, not by capture size.
+    """
+
+    def __init__(self, max_flows: int = MAX_FLOWS):
+        self.max_flows = max_flows
+        self.flows: "OrderedDict[tuple, _HalfStream]" = OrderedDict()
+
+        self.offered: Dict[str, Counter] = {
+            "versions": Counter(),
+            "cipher_suites": Counter(),
+            "groups": Counter(),
+            "key_shares": Counter(),
+            "signature_algorithms": Counter(),
+        }
+        # service -> Counter of (version, cipher_suite, group, signature_algorithm)
+        self.negotiated: Dict[str, Counter] = {}
+        self.stats = Counter()
+
+    def add_capture(self, capture_path: str | Path):
+        for linktype, frame in iter_packets(capture_path):
+            self.stats["packets"] += 1
+            segment = tcp_segment(linktype, frame)
+            if segment is not None:
+                self.add_segment(*segment)
+
+    def add_segment(self, src: bytes, sport: int, dst: bytes, dport: int, seq: int, flags: int, payload: bytes):
+        key = (src, sport, dst, dport)
+        stream = self.flows.get(key)
+
+        if stream is None:
+            # A flow opens on a SYN (so segments that overtake the first one
+            # can wait in pending) or on a segment that starts a TLS hello.
+            # Plain traffic and established TLS sessions cost one lookup.
+            if flags & TCP_SYN:
+                seq = (seq + 1) & 0xFFFFFFFF
+            elif len(payload) < 6 or payload[0] != TLS_HANDSHAKE or payload[1] != 3:
+                return
+            elif payload[5] not in (HANDSHAKE_CLIENT_HELLO, HANDSHAKE_SERVER_HELLO):
+                return
+            stream = self.flows[key] = _HalfStream(seq)
+            self.stats["flows"] += 1
+            if len(self.flows) > self.max_flows:
+                self.flows.popitem(last=False)
+                self.stats["flows_evicted"] += 1
+        else:
+            self.flows.move_to_end(key)
+
+        if flags & (TCP_RST | TCP_FIN) and not payload:
+            self.flows.pop(key, None)
+            return
+        if not payload:
+            return
+
+        stream.add(seq, payload)
+        if stream.data and stream.data[0] != TLS_HANDSHAKE:
+            # Opened on a SYN but not TLS.
+            self.flows.pop(key, None)
+            return
+
+        try:
+            finished = self._parse(key, stream)
+        except (IndexError, struct.error):
+            self.stats["parse_errors"] += 1
+            finished = True
+
+        if finished or len(stream.data) > MAX_HANDSHAKE_BYTES:
+            self.flows.pop(key, None)
+
+    def _parse(self, key: tuple, stream: _HalfStream) -> bool:
+        """
+        Records any hello now complete in stream. Returns True once nothing
+        more is needed from this direction.
+        """
+        for msg_type, body in stream.handshake_messages():
+            if msg_type == HANDSHAKE_CLIENT_HELLO:
+                self._add_client_hello(parse_client_hello(body))
+                return True
+
+            if msg_type == HANDSHAKE_SERVER_HELLO and stream.server_hello is None:
+                stream.server_hello = parse_server_hello(body)
+                suite = _name(CIPHER_SUITES, stream.server_hello["cipher_suite"])
+                if stream.server_hello["version"] == 0x0304 or "_DHE_" not in suite and "_ECDHE_" not in suite:
+                    self._add_server_hello(key, stream.server_hello)
+                    return True
+
+            elif msg_type == HANDSHAKE_SERVER_KEY_EXCHANGE and stream.server_hello is not None:
+                # TLS 1.2 (EC)DHE: the group and signature come in the key exchange.
+                stream.server_hello.update(parse_server_key_exchange(body))
+                self._add_server_hello(key, stream.server_hello)
+                return True
+
+            elif msg_type == HANDSHAKE_SERVER_HELLO_DONE and stream.server_hello is not None:
+                self._add_server_hello(key, stream.server_hello)
+                return True
+
+        return False
+
+    def _add_client_hello(self, hello: dict):
+        self.stats["client_hellos"] += 1
+        self.offered["versions"].update(_name(TLS_VERSIONS, v) for v in hello["versions"])
+        self.offered["cipher_suites"].update(_name(CIPHER_SUITES, v) for v in hello["cipher_suites"])
+        self.offered["groups"].update(_name(GROUPS, v) for v in hello["groups"])
+        self.offered["key_shares"].update(_name(GROUPS, v) for v in hello["key_shares"])
+        self.offered["signature_algorithms"].update(_name(SIGNATURE_SCHEMES, v) for v in hello["signature_algorithms"])
+        if PQC_GROUPS & {_name(GROUPS, v) for v in hello["groups"]}:
+            self.stats["client_hellos_offering_pqc"] += 1
+
+    def _add_server_hello(self, key: tuple, hello: dict):
+        if hello["hello_retry"]:
+            self.stats["hello_retry_requests"] += 1
+            return
+
+        self.stats["server_hellos"] += 1
+        group = _name(GROUPS, hello["group"]) if hello.get("group") is not None else None
+        if group in PQC_GROUPS:
+            self.stats["server_hellos_pqc"] += 1
+        signature = hello.get("signature_algorithm")
+
+        service = _endpoint(key[0], key[1])
+        if service not in self.negotiated and len(self.negotiated) >= MAX_SERVICES:
+            service = OTHER_SERVICES
+        self.negotiated.setdefault(service, Counter())[(
+            _name(TLS_VERSIONS, hello["version"]),
+            _name(CIPHER_SUITES, hello["cipher_suite"]),
+            group,
+            _name(SIGNATURE_SCHEMES, signature) if signature is not None else None,
+        )] += 1
+
+    def summary(self) -> dict:
+        negotiated_totals = {field: Counter() for field in ("versions", "cipher_suites", "groups", "signature_algorithms")}
+        for combinations in self.negotiated.values():
+            for (version, suite, group, signature), count in combinations.items():
+                negotiated_totals["versions"][version] += count
+                negotiated_totals["cipher_suites"][suite] += count
+                if group:
+                    negotiated_totals["groups"][group] += count
+                if signature:
+                    negotiated_totals["signature_algorithms"][signature] += count
+
+        return {
+            "stats": dict(self.stats),
+            "offered": {field: dict(counter.most_common()) for field, counter in self.offered.items()},
+            "negotiated": {field: dict(counter.most_common()) for field, counter in negotiated_totals.items()},
+            "services": {
+                service: [
+                    {"version": v, "cipher_suite": s, "group": g, "signature_algorithm": sig, "connections": n}
+                    for (v, s, g, sig), n in combinations.most_common()
+                ]
+                for service, combinations in self.negotiated.items()
+            },
+        }
+
+
+def suite_algorithms(suite: str) -> Dict[str, Optional[str]]:
+    """
+    "TLS_ECDHE_RSA_WITH_AES_128_GCM_SHA256" ->
+        {"key_exchange": "ECDHE", "authentication": "RSA", "cipher": "AES-128-GCM"}
+    TLS 1.3 suites name only the cipher.
+    """
+    if not suite.startswith("TLS_") or "SCSV" in suite:
+        return {"key_exchange": None, "authentication": None, "cipher": None}
+
+    exchange, _, cipher = suite[4:].rpartition("_WITH_")
+    cipher_parts = cipher.split("_")
+    if cipher_parts[-1] in {"SHA", "SHA256", "SHA384", "MD5"}:
+        cipher_parts = cipher_parts[:-1]
+    if cipher_parts[:2] == ["3DES", "EDE"]:
+        cipher_parts = ["3DES"] + cipher_parts[2:]
+
+    key_exchange, authentication = (exchange.split("_", 1) + [None])[:2] if exchange else (None, None)
+    if key_exchange == "RSA" and authentication is None:
+        authentication = "RSA"
+
+    return {"key_exchange": key_exchange, "authentication": authentication, "cipher": "-".join(cipher_parts)}
+
+
+def _algorithm(table: dict, name: str) -> str:
+    for known, algorithm in table.values():
+        if known == name:
+            return algorithm
+    return name
+
+
+def cbom_rows(inventory: TlsInventory, source: str) -> List[dict]:
+    """
+    One flat CBOM entry (the shape LLM and dependency findings use) per
+    service and negotiated algorithm, so captures can be recorded with
+    findingsStore alongside code findings.
+    """
+    rows: Dict[tuple, dict] = {}
+
+    def add(service, algorithm, function, version, suite, count):
+        if not algorithm:
+            return
+        key = (service, algorithm, function)
+        if key in rows:
+            rows[key]["network"]["connections"] += count
+            return
+        rows[key] = {
+            "file_name": source,
+            "line_number": None,
+            "api_call": suite,
+            "algorithm": algorithm,
+            "cryptographic_function": function,
+            "mode": None,
+            "key_size": None,
+            "purpose": f"{version} {function} negotiated by {service}",
+            "multiple_uses": True,
+            "network": {"service": service, "tls_version": version, "connections": count},
+        }
+
+    for service, combinations in inventory.negotiated.items():
+        for (version, suite, group, signature), count in combinations.items():
+            parts = suite_algorithms(suite)
+            key_exchange = _algorithm(GROUPS, group) if group else parts["key_exchange"]
+            authentication = _algorithm(SIGNATURE_SCHEMES, signature) if signature else parts["authentication"]
+
+            add(service, key_exchange, "key exchange", version, suite, count)
+            add(service, authentication, "sign", version, suite, count)
+            add(service, parts["cipher"], "encrypt", version, suite, count)
+
+    return list(rows.values())
+
+
+def analyze_captures(capture_paths: List[str | Path], max_flows: int = MAX_FLOWS) -> Tuple[dict, List[dict]]:
+    """
+    Returns (summary, cbom_rows) for one or more pcap/pcapng files.
+    """
+    inventory = TlsInventory(max_flows)
+    for capture_path in capture_paths:
+        inventory.add_capture(capture_path)
+
+    source = ", ".join(str(p) for p in capture_paths)
+    return inventory.summary(), cbom_rows(inventory, source)
+
+
+def write_network_cbom(capture_paths: List[str | Path], output_path: str | Path, summary_path: str | Path) -> dict:
+    summary, rows = analyze_captures(capture_paths)
+
+    for path, data in ((output_path, rows), (summary_path, summary)):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, indent=4), encoding="utf-8")
+
+    return summary
+
+
+def main():
+    captures = sys.argv[1:]
+    if not captures:
+        sys.exit("usage: networkAnalyzer.py <capture.pcap> [...]")
+
+    start = time.time()
+    summary = write_network_cbom(captures, "results/network_cbom.json", "results/network_summary.json")
+    stats = summary["stats"]
+
+    print(
+        f"Network scan complete: {stats.get('packets', 0)} packets, {stats.get('client_hellos', 0)} ClientHellos, "
+        f"{stats.get('server_hellos', 0)} ServerHellos in {time.time() - start:.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,74 @@
 import sqlite3
+import threading
 from uuid import uuid4
 from pathlib import Path
+from typing import Iterator, Optional
+from backend.migrations import DB_PATH, migrate
 
-DB_PATH = Path(__file__).resolve().parent.parent / "pqc.db"
+_migrated: set[str] = set()
+_keep_alive = False
+_local = threading.local()
+_open_connections: list[sqlite3.Connection] = []
+_open_lock = threading.Lock()
+
+
+class _PersistentConnection(sqlite3.Connection):
+    """
+    Connection reused by one thread in keep-alive mode; close() is a no-op so
+    the query helpers below work unchanged.
+    """
+
+    def close(self):
+        pass
+
+    def really_close(self):
+        super().close()
+
+
+def keep_connections_alive(enabled: bool = True) -> None:
+    """
+    Keeps one connection open per thread instead of reconnecting on every
+    query. Meant for long-running processes such as the scan daemon.
+    """
+    global _keep_alive
+    _keep_alive = enabled
+
+    if not enabled:
+        with _open_lock:
+            for conn in _open_connections:
+                conn.really_close()
+            _open_connections.clear()
+        _local.__dict__.clear()
+
+
+def _open(factory=sqlite3.Connection) -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, factory=factory)
+    conn.execute("PRAGMA foreign_keys = ON")
+
+    if str(DB_PATH) not in _migrated:
+        migrate(conn)
+        _migrated.add(str(DB_PATH))
+
+    return conn
+
+
+def connect() -> sqlite3.Connection:
+    """
+    Opens a connection with foreign keys enforced, migrating the schema on
+    first use in this process.
+    """
+    if not _keep_alive:
+        return _open()
+
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _open(_PersistentConnection)
+        conn.execute("PRAGMA busy_timeout = 5000")
+        _local.conn = conn
+        with _open_lock:
+            _open_connections.append(conn)
+
+    return conn
 
 
 def insert_project(project_name: str) -> str:
@@ -11,7 +77,7 @@ def insert_project(project_name: str) -> str:
     """
     project_id = str(uuid4())
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
     cursor.execute(
@@ -31,7 +97,7 @@ def insert_file(project_id: str, file_name: str) -> str:
     """
     file_id = str(uuid4())
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
     cursor.execute(
@@ -51,7 +117,7 @@ def insert_ast(file_id: str, ast_json_string: str) -> str:
     """
     ast_id = str(uuid4())
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
     cursor.execute(
@@ -69,7 +135,7 @@ def get_project_files(project_id: str) -> list[tuple]:
     """
     Returns (fileId, fileName) rows linked to a project.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
     cursor.execute(
@@ -86,7 +152,7 @@ def get_project_asts(project_id: str) -> list[tuple]:
     """
     Returns ASTs for a project with filename included.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
     cursor.execute(
@@ -107,11 +173,83 @@ def get_project_asts(project_id: str) -> list[tuple]:
     return rows
 
 
+def iter_project_files(project_id: str, batch_size: int = 500) -> Iterator[tuple]:
+    """
+    Yields (fileId, fileName) rows linked to a project without loading them all.
+    """
+    conn = connect()
+    try:
+        cursor = conn.execute(
+            "SELECT fileId, fileName FROM projectFile WHERE projectId = ?",
+            (project_id,)
+        )
+        while rows := cursor.fetchmany(batch_size):
+            yield from rows
+    finally:
+        conn.close()
+
+
+def iter_project_asts(project_id: str, batch_size: int = 50) -> Iterator[tuple]:
+    """
+    Yields (astId, ast, fileName) rows for a project, batch_size at a time.
+    """
+    conn = connect()
+    try:
+        cursor = conn.execute(
+            """
+            SELECT
+                fileAST.astId,
+                fileAST.ast,
+                projectFile.fileName
+            FROM projectFile
+            JOIN fileAST ON fileAST.fileId = projectFile.fileId
+            WHERE projectFile.projectId = ?
+            """,
+            (project_id,)
+        )
+        while rows := cursor.fetchmany(batch_size):
+            yield from rows
+    finally:
+        conn.close()
+
+
+def get_project_asts_page(
+    project_id: str,
+    limit: int = 50,
+    after_ast_id: Optional[str] = None,
+) -> list[tuple]:
+    """
+    Returns up to limit (astId, ast, fileName) rows ordered by astId, starting
+    after after_ast_id. Pass the last astId of a page to get the next one.
+    """
+    conn = connect()
+    cursor = conn.cursor()
+
+    cursor.execute(
+        """
+        SELECT
+            fileAST.astId,
+            fileAST.ast,
+            projectFile.fileName
+        FROM projectFile
+        JOIN fileAST ON fileAST.fileId = projectFile.fileId
+        WHERE projectFile.projectId = ? AND fileAST.astId > ?
+        ORDER BY fileAST.astId
+        LIMIT ?
+        """,
+        (project_id, after_ast_id or "", limit)
+    )
+
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
 def delete_project(project_id: str) -> None:
     """
     Deletes a project and cascades deletes files + ASTs.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM project WHERE projectId = ?", (project_id,))
@@ -122,8 +260,9 @@ def delete_project(project_id: str) -> None:
 def clear_database() -> None:
     """
     Deletes all rows from project, projectFile, and fileAST tables.
+    Cross-project findings (see findingsStore) are kept.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect()
     cursor = conn.cursor()
 
     cursor.execute("PRAGMA foreign_keys = OFF;")
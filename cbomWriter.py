@@ -0,0 +1,365 @@
+import json
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from convert import parse_cbom_entry
+
+TEMP_ROOT = Path(__file__).resolve().parent / "results"
+
+INPUT_PATH = TEMP_ROOT / "cbom_output.jsonl"
+OUTPUT_PATH = TEMP_ROOT / "cbom_cyclonedx.json"
+
+SPEC_VERSION = "1.6"
+TOOL_NAME = "pqc-discovery-prototype"
+
+# Canonical family name -> CycloneDX algorithmProperties.primitive.
+ALGORITHM_FAMILIES: List[Tuple[str, re.Pattern, str]] = [
+    ("ML-KEM", re.compile(r"ml-?kem|kyber", re.IGNORECASE), "kem"),
+    ("ML-DSA", re.compile(r"ml-?dsa|dilithium", re.IGNORECASE), "signature"),
+    ("SLH-DSA", re.compile(r"slh-?dsa|sphincs", re.IGNORECASE), "signature"),
+    ("X25519", re.compile(r"x25519|curve25519", re.IGNORECASE), "key-agree"),
+    ("Ed25519", re.compile(r"ed25519", re.IGNORECASE), "signature"),
+    ("X448", re.compile(r"x448|curve448", re.IGNORECASE), "key-agree"),
+    ("Ed448", re.compile(r"ed448", re.IGNORECASE), "signature"),
+    # Generic EdDSA (jose, elliptic, openpgp) when the curve is not named.
+    ("EdDSA", re.compile(r"eddsa", re.IGNORECASE), "signature"),
+    ("ECDSA", re.compile(r"ecdsa", re.IGNORECASE), "signature"),
+    ("ECDH", re.compile(r"ecdhe?", re.IGNORECASE), "key-agree"),
+    ("DH", re.compile(r"\bdhe?\b|diffie", re.IGNORECASE), "key-agree"),
+    # Elliptic-curve keys whose scheme is not known (ec.generate_private_key).
+    ("EC", re.compile(r"^ecc?$|elliptic.?curve", re.IGNORECASE), "other"),
+    ("DSA", re.compile(r"\bdsa\b", re.IGNORECASE), "signature"),
+    ("RSA", re.compile(r"rsa", re.IGNORECASE), "pke"),
+    ("3DES", re.compile(r"3des|des-?ede3?|triple.?des", re.IGNORECASE), "block-cipher"),
+    ("DES", re.compile(r"\bdes\b", re.IGNORECASE), "block-cipher"),
+    ("AES", re.compile(r"aes|rijndael", re.IGNORECASE), "block-cipher"),
+    ("ChaCha20-Poly1305", re.compile(r"chacha20.?poly1305", re.IGNORECASE), "ae"),
+    ("ChaCha20", re.compile(r"chacha", re.IGNORECASE), "stream-cipher"),
+    ("RC4", re.compile(r"rc4|arcfour", re.IGNORECASE), "stream-cipher"),
+    ("Blowfish", re.compile(r"blowfish", re.IGNORECASE), "block-cipher"),
+    # KDFs before HMAC: "PBKDF2-HMAC-SHA256" is a KDF, not a MAC.
+    ("HKDF", re.compile(r"hkdf", re.IGNORECASE), "kdf"),
+    ("PBKDF2", re.compile(r"pbkdf2?", re.IGNORECASE), "kdf"),
+    ("bcrypt", re.compile(r"bcrypt", re.IGNORECASE), "kdf"),
+    ("scrypt", re.compile(r"scrypt", re.IGNORECASE), "kdf"),
+    ("Argon2", re.compile(r"argon2", re.IGNORECASE), "kdf"),
+    ("HMAC", re.compile(r"hmac", re.IGNORECASE), "mac"),
+    ("SHA-3", re.compile(r"sha-?3(?!\d)", re.IGNORECASE), "hash"),
+    ("SHA-1", re.compile(r"sha-?1\b", re.IGNORECASE), "hash"),
+    ("SHA-2", re.compile(r"sha-?(?:2|224|256|384|512)", re.IGNORECASE), "hash"),
+    ("MD5", re.compile(r"md5", re.IGNORECASE), "hash"),
+]
+
+# Families broken by a cryptographically relevant quantum computer.
+QUANTUM_VULNERABLE = {"RSA", "DSA", "ECDSA", "ECDH", "DH", "X25519", "Ed25519", "X448", "Ed448", "EdDSA", "EC"}
+
+# Digits in these names are not key sizes (X25519, ChaCha20-Poly1305).
+NAMED_SIZE_FAMILIES = {"X25519", "Ed25519", "X448", "Ed448", "ChaCha20-Poly1305", "ChaCha20"}
+
+MODES = {"cbc", "ecb", "ctr", "cfb", "ofb", "gcm", "ccm", "xts", "siv"}
+AEAD_MODES = {"gcm", "ccm", "siv"}
+# algorithmProperties.mode values CycloneDX 1.6 allows; other modes are "other".
+CYCLONEDX_MODES = {"cbc", "ecb", "ccm", "gcm", "cfb", "ofb", "ctr"}
+
+# A key size directly follows the family name ("AES-256", "rsa2048"); digits
+# after anything else belong to a digest or curve ("RSA-SHA256", "P-256").
+SIZE_RE = re.compile(r"[-_ /]?(\d{3,5})(?!\d)")
+MODE_RE = re.compile(r"\b(" + "|".join(sorted(MODES)) + r")\b", re.IGNORECASE)
+
+# cryptographic_function values the prompt asks for -> CycloneDX cryptoFunctions.
+CRYPTO_FUNCTIONS = {
+    "keygen": "keygen",
+    "key generation": "keygen",
+    "generate": "generate",
+    "encrypt": "encrypt",
+    "encryption": "encrypt",
+    "decrypt": "decrypt",
+    "decryption": "decrypt",
+    "digest": "digest",
+    "hash": "digest",
+    "hashing": "digest",
+    "sign": "sign",
+    "signing": "sign",
+    "verify": "verify",
+    "verification": "verify",
+    "mac": "tag",
+    "tag": "tag",
+    "key derivation": "keyderive",
+    "keyderive": "keyderive",
+    "key exchange": "keyderive",
+    "encapsulate": "encapsulate",
+    "decapsulate": "decapsulate",
+}
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def normalize_algorithm(usage: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Returns the identity of the algorithm a CBOM usage refers to:
+    {family, primitive, key_size, mode, name}, or None if it names none.
+
+    Usages that differ only in spelling ("AES-256-CBC", "aes256 cbc",
+    algorithm "AES" with key_size 256 and mode "CBC") normalize identically.
+    """
+    algorithm = str(usage.get("algorithm") or "").strip()
+    if not algorithm or algorithm.lower() in {"none", "null", "unknown", "n/a"}:
+        return None
+
+    family, primitive, family_end = None, "other", None
+    for name, regex, kind in ALGORITHM_FAMILIES:
+        family_match = regex.search(algorithm)
+        if family_match:
+            family, primitive, family_end = name, kind, family_match.end()
+            break
+    if family is None:
+        family = algorithm.upper()
+
+    key_size, mode = None, None
+
+    if primitive == "hash":
+        # The digest size is part of the name, not a key size.
+        digest = re.search(r"(224|256|384|512)", algorithm)
+        if family == "SHA-2":
+            family = f"SHA-{digest.group(1)}" if digest else "SHA-256"
+        elif family == "SHA-3" and digest:
+            family = f"SHA3-{digest.group(1)}"
+    else:
+        key_size = usage.get("key_size")
+        if not isinstance(key_size, int):
+            size_match = None
+            if family_end is not None and family not in NAMED_SIZE_FAMILIES:
+                size_match = SIZE_RE.match(algorithm, family_end)
+            key_size = int(size_match.group(1)) if size_match else None
+
+        mode = usage.get("mode")
+        if not isinstance(mode, str) or mode.lower() not in MODES:
+            mode_match = MODE_RE.search(algorithm)
+            mode = mode_match.group(1) if mode_match else None
+        mode = mode.lower() if mode else None
+
+    if family == "AES" and mode in AEAD_MODES:
+        primitive = "ae"
+
+    parts = [family]
+    if key_size:
+        parts.append(str(key_size))
+    if mode:
+        parts.append(mode.upper())
+
+    return {
+        "family": family,
+        "primitive": primitive,
+        "key_size": key_size,
+        "mode": mode,
+        "name": "-".join(parts),
+    }
+
+
+def algorithm_component(algorithm: Dict[str, Any], functions: set[str]) -> Dict[str, Any]:
+    properties: Dict[str, Any] = {
+        "primitive": algorithm["primitive"],
+        "cryptoFunctions": sorted(functions) or ["unknown"],
+    }
+    if algorithm["key_size"]:
+        properties["parameterSetIdentifier"] = str(algorithm["key_size"])
+    if algorithm["mode"]:
+        properties["mode"] = algorithm["mode"] if algorithm["mode"] in CYCLONEDX_MODES else "other"
+    if algorithm["family"] in QUANTUM_VULNERABLE:
+        properties["nistQuantumSecurityLevel"] = 0
+
+    return {
+        "type": "cryptographic-asset",
+        "bom-ref": algorithm["bom-ref"],
+        "name": algorithm["name"],
+        "cryptoProperties": {
+            "assetType": "algorithm",
+            "algorithmProperties": properties,
+        },
+    }
+
+
+def iter_cbom_entries(input_path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Yields output entries from a JSON-lines file one line at a time, or from
+    a JSON array (which has to be loaded whole).
+    """
+    input_path = Path(input_path)
+
+    if input_path.suffix == ".jsonl":
+        with input_path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    yield from json.loads(input_path.read_text())
+
+
+def iter_usages(entry: Dict[str, Any], from_matches: bool) -> Iterator[Dict[str, Any]]:
+    parsed = parse_cbom_entry(entry, from_matches)
+    usages = parsed if isinstance(parsed, list) else [parsed]
+
+    for usage in usages:
+        if isinstance(usage, dict):
+            if not usage.get("file_name") and entry.get("file_path"):
+                usage["file_name"] = entry["file_path"]
+            yield usage
+
+
+class CycloneDxWriter:
+    """
+    Writes a CycloneDX 1.6 CBOM to out as usages arrive.
+
+    File components (with their line occurrences as evidence) are written
+    immediately. Only one entry per distinct algorithm and the file -> algorithm
+    refs are kept until close(), which appends the algorithm components and
+    the dependency graph and finishes the document.
+    """
+
+    def __init__(self, out: TextIO, project_name: Optional[str] = None):
+        self.out = out
+        self.algorithms: Dict[str, Dict[str, Any]] = {}
+        self.functions: Dict[str, set[str]] = {}
+        self.dependencies: Dict[str, set[str]] = {}
+        self.components_written = 0
+        self.unanalyzed = 0
+
+        metadata: Dict[str, Any] = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "tools": {"components": [{"type": "application", "name": TOOL_NAME}]},
+        }
+        if project_name:
+            metadata["component"] = {"type": "application", "name": project_name, "bom-ref": f"project:{project_name}"}
+
+        header = {
+            "bomFormat": "CycloneDX",
+            "specVersion": SPEC_VERSION,
+            "serialNumber": f"urn:uuid:{uuid.uuid4()}",
+            "version": 1,
+            "metadata": metadata,
+        }
+        self.out.write(json.dumps(header, indent=2)[:-2] + ',\n  "components": [')
+
+    def _write_component(self, component: Dict[str, Any]):
+        self.out.write(("," if self.components_written else "") + "\n    " + json.dumps(component))
+        self.components_written += 1
+
+    def _algorithm_ref(self, usage: Dict[str, Any]) -> Optional[str]:
+        algorithm = normalize_algorithm(usage)
+        if algorithm is None:
+            return None
+
+        ref = f"crypto/algorithm/{_slug(algorithm['name'])}"
+        if ref not in self.algorithms:
+            algorithm["bom-ref"] = ref
+            self.algorithms[ref] = algorithm
+            self.functions[ref] = set()
+
+        function = str(usage.get("cryptographic_function") or "").strip().lower()
+        if function in CRYPTO_FUNCTIONS:
+            self.functions[ref].add(CRYPTO_FUNCTIONS[function])
+
+        return ref
+
+    def add_file(self, file_name: str, usages: List[Dict[str, Any]]):
+        """
+        Writes one file component with an occurrence per usage.
+        """
+        file_ref = f"file:{file_name}"
+        if file_ref in self.dependencies:
+            # Same file seen again: bom-refs must stay unique.
+            file_ref = f"{file_ref}#{self.components_written}"
+
+        refs: set[str] = set()
+        occurrences = []
+
+        for usage in usages:
+            algorithm_ref = self._algorithm_ref(usage)
+            if algorithm_ref is None:
+                continue
+            refs.add(algorithm_ref)
+
+            occurrence: Dict[str, Any] = {"location": file_name, "additionalContext": algorithm_ref}
+            if isinstance(usage.get("line_number"), int):
+                occurrence["line"] = usage["line_number"]
+            if usage.get("api_call"):
+                occurrence["symbol"] = str(usage["api_call"])[:200]
+            occurrences.append(occurrence)
+
+        if not occurrences:
+            return
+
+        self.dependencies[file_ref] = refs
+        self._write_component({
+            "type": "file",
+            "bom-ref": file_ref,
+            "name": file_name,
+            "evidence": {"occurrences": occurrences},
+        })
+
+    def add_unanalyzed(self, file_name: str, reason: str):
+        """
+        Writes a file component for a file the run had no budget left for.
+        """
+        self.unanalyzed += 1
+        self._write_component({
+            "type": "file",
+            "bom-ref": f"file:{file_name}#unanalyzed",
+            "name": file_name,
+            "properties": [{"name": "pqc:unanalyzed", "value": reason}],
+        })
+
+    def close(self):
+        for ref, algorithm in self.algorithms.items():
+            self._write_component(algorithm_component(algorithm, self.functions[ref]))
+
+        self.out.write('\n  ],\n  "dependencies": [')
+        for index, (ref, depends_on) in enumerate(self.dependencies.items()):
+            dependency = {"ref": ref, "dependsOn": sorted(depends_on)}
+            self.out.write(("," if index else "") + "\n    " + json.dumps(dependency))
+        self.out.write("\n  ]")
+
+        if self.unanalyzed:
+            # A partial CBOM says so at the top level, not only per file.
+            properties = [{"name": "pqc:unanalyzedFiles", "value": str(self.unanalyzed)}]
+            self.out.write(',\n  "properties": ' + json.dumps(properties))
+        self.out.write("\n}\n")
+
+
+def write_cyclonedx_cbom(
+    input_path: Path = INPUT_PATH,
+    output_path: Path = OUTPUT_PATH,
+    from_matches: bool = True,
+    project_name: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Converts LLM CBOM output (cbom_output.jsonl or cbom_output.json) into a
+    CycloneDX 1.6 CBOM, streaming entries from input to output.
+
+    Returns { "files": <int>, "algorithms": <int>, "unanalyzed": <int> }
+    """
+    input_path, output_path = Path(input_path), Path(output_path)
+    if not input_path.exists() and input_path.suffix == ".jsonl":
+        input_path = input_path.with_suffix(".json")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", encoding="utf-8") as out:
+        writer = CycloneDxWriter(out, project_name)
+        for entry in iter_cbom_entries(input_path):
+            if entry.get("unanalyzed"):
+                writer.add_unanalyzed(entry.get("file_path") or "unknown", entry["unanalyzed"])
+                continue
+            usages = list(iter_usages(entry, from_matches))
+            if usages:
+                writer.add_file(usages[0]["file_name"] or entry.get("file_path") or "unknown", usages)
+        writer.close()
+
+    summary = {"files": len(writer.dependencies), "algorithms": len(writer.algorithms), "unanalyzed": writer.unanalyzed}
+    print(f"CycloneDX CBOM: {summary['files']} files, {summary['algorithms']} distinct algorithms → {output_path}")
+    return summary
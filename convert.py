@@ -1,6 +1,7 @@
 import json
 import re
 from pathlib import Path
+from typing import Any, Optional
 TEMP_ROOT = Path(__file__).resolve().parent / "results"
 
 INPUT_PATH = TEMP_ROOT / "cbom_output.json"
@@ -16,24 +17,35 @@ def clean_output_string(raw: str) -> str:
     return raw
 
 
+def parse_cbom_entry(entry: dict, from_matches: bool = False) -> Optional[Any]:
+    """
+    Returns the CBOM object the LLM produced for one output entry, or None
+    when it is missing or not valid JSON.
+    """
+    if (from_matches):
+        entry = entry.get("cbom")
+    if not isinstance(entry, dict):
+        return None
+    output_text = (entry.get("output") or "").strip()
+    if not output_text:
+        return None
+
+    cleaned = clean_output_string(output_text)
+
+    try:
+        return json.loads(cleaned)
+    except json.JSONDecodeError:
+        print("Skipping invalid JSON:", output_text[:80], "...")
+        return None
+
+
 def extract_cbom_objects(data: list, from_matches: bool = False) -> list:
     results = []
 
     for entry in data:
-        if (from_matches):
-            entry = entry.get("cbom")
-        output_text = entry.get("output", "").strip()
-        if not output_text:
-            continue
-
-        cleaned = clean_output_string(output_text)
-
-        try:
-            parsed = json.loads(cleaned)
+        parsed = parse_cbom_entry(entry, from_matches)
+        if parsed is not None:
             results.append(parsed)
-        except json.JSONDecodeError:
-            print("Skipping invalid JSON:", output_text[:80], "...")
-            continue
 
     return results
 
@@ -0,0 +1,249 @@
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+import traceback
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+JOBS_ROOT = Path(__file__).resolve().parent / "results" / "jobs"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CONCURRENCY = 2
+
+
+class ScanDaemon:
+    """
+    Keeps the expensive parts of a scan warm between jobs: imports, the LLM
+    client pool, node parser workers and per-thread SQLite connections.
+
+    Jobs are queued and run by `concurrency` worker threads. Each job writes
+    its outputs under results/jobs/<job_id>/.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, parser_workers: Optional[int] = None):
+        # Imported here so `import daemon` stays cheap for clients.
+        from backend.queries import connect, keep_connections_alive
+        from frontend.llmBackend import get_backend
+        from frontend.parserPool import JsParserPool
+        import frontend.utils  # noqa: F401  (pays the pipeline import cost once)
+
+        keep_connections_alive()
+        connect()
+
+        try:
+            get_backend()
+        except Exception as e:
+            print(f"Warning: LLM backend not ready: {e}")
+
+        self.concurrency = concurrency
+        self.parser_pool = JsParserPool(parser_workers)
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.queue: queue.Queue[Optional[str]] = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"scan-worker-{i}", daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, url: str) -> Dict[str, Any]:
+        job_id = str(uuid.uuid4())
+        job = {
+            "job_id": job_id,
+            "url": url,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "output_dir": str(JOBS_ROOT / job_id),
+        }
+
+        with self._lock:
+            self.jobs[job_id] = job
+        self.queue.put(job_id)
+
+        return dict(job)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self) -> list:
+        with self._lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def cbom_path(self, job_id: str) -> Path:
+        return JOBS_ROOT / job_id / "cbom_iso_output.json"
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self.jobs[job_id].update(fields)
+
+    def _worker(self):
+        while True:
+            job_id = self.queue.get()
+            if job_id is None:
+                return
+
+            self._update(job_id, status="running", started_at=time.time())
+            try:
+                self._run(job_id)
+                self._update(job_id, status="done", finished_at=time.time())
+            except Exception as e:
+                traceback.print_exc()
+                self._update(job_id, status="failed", finished_at=time.time(), error=str(e))
+
+    def _run(self, job_id: str):
+        from backend.findingsStore import record_scan_results
+        from convert import convert_cbom_output_to_iso
+        from frontend.repoParser import remove_repo_path
+        from frontend.utils import generate_cboms_from_matches, parse_github_repo, prune_ast
+
+        job = self.status(job_id)
+        output_dir = Path(job["output_dir"])
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        matches_path = output_dir / "matches.json"
+        cbom_path = output_dir / "cbom_output.json"
+
+        # Other jobs share the database, so it must not be cleared here.
+        _, project_id, repo_path = parse_github_repo(
+            job["url"],
+            str(matches_path),
+            clear_db=False,
+            results_dir=output_dir,
+            parser_pool=self.parser_pool,
+        )
+        self._update(job_id, project_id=project_id)
+
+        try:
+            prune_ast(project_id, output_dir)
+            generate_cboms_from_matches(matches_path, cbom_path)
+            convert_cbom_output_to_iso(True, cbom_path, self.cbom_path(job_id))
+            record_scan_results(job["url"], output_dir)
+        finally:
+            remove_repo_path(repo_path.parent)
+
+    def shutdown(self):
+        from backend.queries import keep_connections_alive
+
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self.parser_pool.close()
+        keep_connections_alive(False)
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs {"url": ...}   submit a scan
+    GET  /jobs                list jobs
+    GET  /jobs/<id>           job status
+    GET  /jobs/<id>/cbom      CBOM of a finished job
+    GET  /health              liveness
+    """
+    scan_daemon: ScanDaemon
+
+    def address_string(self) -> str:
+        # Unix sockets have no client address.
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _send_json(self, status: int, body: Any):
+        payload = json.dumps(body, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("/") if p]
+
+        if parts == ["health"]:
+            return self._send_json(200, {"status": "ok", "queued": self.scan_daemon.queue.qsize()})
+
+        if parts == ["jobs"]:
+            return self._send_json(200, self.scan_daemon.list_jobs())
+
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.scan_daemon.status(parts[1])
+            if job is None:
+                return self._send_json(404, {"error": "Unknown job"})
+
+            if len(parts) == 2:
+                return self._send_json(200, job)
+
+            if parts[2] == "cbom":
+                if job["status"] != "done":
+                    return self._send_json(409, {"error": f"Job is {job['status']}"})
+                return self._send_json(200, json.loads(self.scan_daemon.cbom_path(parts[1]).read_text()))
+
+        self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {"error": "Not found"})
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            url = body["url"]
+        except (ValueError, KeyError):
+            return self._send_json(400, {"error": 'Expected JSON body {"url": ...}'})
+
+        self._send_json(202, self.scan_daemon.submit(url))
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+):
+    """
+    Runs the daemon until interrupted, on a Unix socket if socket_path is
+    given, otherwise on host:port.
+    """
+    scan_daemon = ScanDaemon(concurrency=concurrency)
+    handler = type("BoundJobRequestHandler", (JobRequestHandler,), {"scan_daemon": scan_daemon})
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, handler)
+        print(f"Scan daemon listening on unix:{socket_path} (concurrency {concurrency})")
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        print(f"Scan daemon listening on http://{host}:{port} (concurrency {concurrency})")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        scan_daemon.shutdown()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+if __name__ == "__main__":
+    serve(
+        host=os.getenv("PQC_DAEMON_HOST", DEFAULT_HOST),
+        port=int(os.getenv("PQC_DAEMON_PORT", DEFAULT_PORT)),
+        socket_path=os.getenv("PQC_DAEMON_SOCKET"),
+        concurrency=int(os.getenv("PQC_DAEMON_CONCURRENCY", DEFAULT_CONCURRENCY)),
+    )
@@ -0,0 +1,280 @@
+import io
+import json
+import tarfile
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+from backend.queries import insert_ast, insert_file, insert_project
+from frontend.cryptoScoring import DEFAULT_THRESHOLD, RuleReport, score_source
+from frontend.minifiedDetector import MINIFIED_POLICY, GeneratedFileReport, classify_source
+from frontend.parserPool import JsParserPool, ParserWorkerError
+from frontend.pyParser import parse_python_source
+from frontend.usageScanner import CRYPTO_PATTERNS, IGNORE_FOLDERS, KEEP_EXTENSIONS, PYTHON_EXTENSIONS
+
+# Members larger than this are skipped without being read.
+MAX_MEMBER_BYTES = 1024 * 1024
+# A zip inside a tar stream cannot be read without seeking, so it is
+# buffered in memory, up to this size.
+MAX_NESTED_ZIP_BYTES = 64 * 1024 * 1024
+# Archives inside archives (container layers in an image tarball) are
+# followed this many levels deep.
+MAX_NESTING = 3
+
+TAR_SUFFIXES = (".tar", ".tgz", ".tar.gz", ".tar.bz2", ".tar.xz", ".tbz2", ".txz", ".crate", ".gem")
+ZIP_SUFFIXES = (".zip", ".jar", ".whl", ".war", ".egg", ".nupkg", ".vsix")
+
+# Separates an archive from a path inside it: "image.tar!/layer.tar!/app/index.js".
+MEMBER_SEPARATOR = "!/"
+
+GZIP_MAGIC = b"\x1f\x8b"
+BZIP2_MAGIC = b"BZh"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+ZIP_MAGIC = b"PK\x03\x04"
+TAR_MAGIC_OFFSET = 257
+
+
+class _PrefixedStream:
+    """
+    A read-only stream that returns already-consumed head bytes first, so
+    a forward-only member can be sniffed and still be opened from the start.
+    """
+
+    def __init__(self, head: bytes, rest: IO[bytes]):
+        self.head = head
+        self.rest = rest
+
+    def read(self, size: int = -1) -> bytes:
+        if not self.head:
+            return self.rest.read(size)
+
+        if size < 0:
+            data, self.head = self.head + self.rest.read(), b""
+            return data
+
+        data, self.head = self.head[:size], self.head[size:]
+        if len(data) < size:
+            data += self.rest.read(size - len(data))
+        return data
+
+
+def archive_kind(name: str, head: bytes = b"") -> Optional[str]:
+    """
+    Returns "tar", "zip" or None, from the name or, failing that, the first
+    bytes (OCI image layers are stored under their digest, with no suffix).
+    """
+    lowered = name.lower()
+    if lowered.endswith(TAR_SUFFIXES):
+        return "tar"
+    if lowered.endswith(ZIP_SUFFIXES):
+        return "zip"
+
+    if head.startswith(ZIP_MAGIC):
+        return "zip"
+    if head.startswith((GZIP_MAGIC, BZIP2_MAGIC, XZ_MAGIC)):
+        return "tar"
+    if head[TAR_MAGIC_OFFSET:TAR_MAGIC_OFFSET + 5] == b"ustar":
+        return "tar"
+    return None
+
+
+def _wanted_member(name: str, size: int) -> bool:
+    path = PurePosixPath(name)
+    if path.suffix.lower() not in KEEP_EXTENSIONS or size > MAX_MEMBER_BYTES:
+        return False
+    if path.name.startswith(".wh."):
+        # Layer whiteout: marks a file deleted by this layer.
+        return False
+    return not any(part in IGNORE_FOLDERS for part in path.parts[:-1])
+
+
+def _iter_tar(stream: IO[bytes], prefix: str, depth: int, stats: Dict[str, int]) -> Iterator[tuple]:
+    # "r|*" reads the archive strictly forwards, transparently decompressed;
+    # members must be consumed in order, before the next one is requested.
+    with tarfile.open(fileobj=stream, mode="r|*") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+
+            stats["members"] += 1
+            name = prefix + (member.name[2:] if member.name.startswith("./") else member.name)
+
+            if _wanted_member(member.name, member.size):
+                yield name, tar.extractfile(member).read()
+                continue
+
+            if depth >= MAX_NESTING or member.size <= TAR_MAGIC_OFFSET + 5:
+                continue
+
+            fileobj = tar.extractfile(member)
+            head = fileobj.read(TAR_MAGIC_OFFSET + 5)
+            kind = archive_kind(member.name, head)
+            try:
+                if kind == "tar":
+                    stats["nested"] += 1
+                    yield from _iter_tar(_PrefixedStream(head, fileobj), name + MEMBER_SEPARATOR, depth + 1, stats)
+                elif kind == "zip" and member.size <= MAX_NESTED_ZIP_BYTES:
+                    stats["nested"] += 1
+                    buffered = io.BytesIO(head + fileobj.read())
+                    yield from _iter_zip(buffered, name + MEMBER_SEPARATOR, depth + 1, stats)
+            except (tarfile.TarError, zipfile.BadZipFile) as e:
+                # Compressed but not an archive (foo.js.gz), or corrupt.
+                print(f"Skipping unreadable nested archive {name}: {e}")
+
+
+def _iter_zip(stream: IO[bytes], prefix: str, depth: int, stats: Dict[str, int]) -> Iterator[tuple]:
+    with zipfile.ZipFile(stream) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+
+            stats["members"] += 1
+            name = f"{prefix}{info.filename}"
+
+            if _wanted_member(info.filename, info.file_size):
+                with archive.open(info) as member:
+                    yield name, member.read()
+                continue
+
+            if depth >= MAX_NESTING:
+                continue
+
+            kind = archive_kind(info.filename)
+            try:
+                if kind == "tar":
+                    stats["nested"] += 1
+                    with archive.open(info) as member:
+                        yield from _iter_tar(member, name + MEMBER_SEPARATOR, depth + 1, stats)
+                elif kind == "zip" and info.file_size <= MAX_NESTED_ZIP_BYTES:
+                    stats["nested"] += 1
+                    with archive.open(info) as member:
+                        yield from _iter_zip(io.BytesIO(member.read()), name + MEMBER_SEPARATOR, depth + 1, stats)
+            except (tarfile.TarError, zipfile.BadZipFile) as e:
+                print(f"Skipping unreadable nested archive {name}: {e}")
+
+
+def iter_archive_members(archive_path: str | Path, stats: Optional[Dict[str, int]] = None) -> Iterator[tuple]:
+    """
+    Yields (member_path, content_bytes) for every source file the scanner
+    keeps, straight from the archive: tarballs (npm .tgz, container image and
+    layer tars, any compression tarfile reads) and zips, following nested
+    archives. Nothing is extracted to disk, and only members within
+    MAX_MEMBER_BYTES are read.
+
+    member_path is "<archive>!/<path inside>", with one "!/" per nesting level.
+    """
+    archive_path = Path(archive_path)
+    stats = stats if stats is not None else {}
+    stats.setdefault("members", 0)
+    stats.setdefault("nested", 0)
+
+    with archive_path.open("rb") as f:
+        head = f.read(TAR_MAGIC_OFFSET + 5)
+        f.seek(0)
+        kind = archive_kind(archive_path.name, head)
+        prefix = archive_path.name + MEMBER_SEPARATOR
+
+        if kind == "zip":
+            yield from _iter_zip(f, prefix, 0, stats)
+        elif kind == "tar":
+            yield from _iter_tar(f, prefix, 0, stats)
+        else:
+            raise ValueError(f"Not a tar or zip archive: {archive_path}")
+
+
+def scan_archive(
+    archive_path: str | Path,
+    threshold: float = DEFAULT_THRESHOLD,
+    minified_policy: str = MINIFIED_POLICY,
+    parser_pool: Optional[JsParserPool] = None,
+    project_id: Optional[str] = None,
+) -> dict:
+    """
+    Scores every source member of an archive with the crypto rules and, when
+    a parser pool is given, parses admitted members from memory and stores
+    their ASTs under project_id (a new project named after the archive if
+    not given), ready for `prune` and `cbom --mode ast`.
+
+    Returns:
+        {
+            "project_id": <uuid>,
+            "kept_crypto_files": { member_path: { "categories": [...], "score": <float>, "fileId": <uuid> } },
+            "matches_by_category": { category: [member_paths...] },
+            "python_usages": [...],
+            "failures": [ { "file": member_path, "error": <str> } ],
+            "rule_report": { ... },
+            "generated_files": { ... },
+            "stats": { "members": <int>, "nested": <int>, "scored": <int>, "parsed": <int> }
+        }
+    """
+    archive_path = Path(archive_path)
+    project_id = project_id or insert_project(str(archive_path))
+
+    report = RuleReport(threshold)
+    generated = GeneratedFileReport(minified_policy)
+    kept_by_file: Dict[str, Dict[str, Any]] = {}
+    matches_by_category: Dict[str, List[str]] = {category: [] for category in CRYPTO_PATTERNS}
+    python_usages: List[Dict[str, Any]] = []
+    failures: List[Dict[str, str]] = []
+    stats: Dict[str, int] = {"members": 0, "nested": 0, "scored": 0, "parsed": 0}
+
+    for member_path, data in iter_archive_members(archive_path, stats):
+        content = data.decode("utf-8", errors="ignore")
+        suffix = PurePosixPath(member_path).suffix.lower()
+
+        inner_path = member_path.rsplit(MEMBER_SEPARATOR, 1)[-1]
+        reason = classify_source(inner_path, content) if minified_policy != "off" else None
+        if reason and minified_policy == "skip":
+            generated.add(member_path, reason)
+            continue
+
+        scored = score_source(content, suffix, threshold)
+        report.add(scored)
+        stats["scored"] += 1
+
+        if reason:
+            generated.add(member_path, reason, scored["categories"] if scored["admitted"] else [])
+            continue
+        if not scored["admitted"]:
+            continue
+
+        file_id = insert_file(project_id, member_path)
+        kept_by_file[member_path] = {
+            "categories": scored["categories"],
+            "score": scored["score"],
+            "fileId": file_id,
+        }
+        for category in scored["categories"]:
+            matches_by_category[category].append(member_path)
+
+        if parser_pool is None:
+            continue
+
+        try:
+            if suffix in PYTHON_EXTENSIONS:
+                _, ast_json, usages, error = parse_python_source(content, member_path)
+                if error:
+                    raise ValueError(error)
+                python_usages.extend(usages)
+            else:
+                ast_json = json.dumps(parser_pool.parse(member_path, code=content))
+            insert_ast(file_id, ast_json)
+            stats["parsed"] += 1
+        except (ParserWorkerError, ValueError) as e:
+            failures.append({"file": member_path, "error": str(e)})
+
+    print(
+        f"Archive scan: {stats['members']} members ({stats['nested']} nested archives), "
+        f"{stats['scored']} scored, {len(kept_by_file)} kept, {stats['parsed']} parsed"
+    )
+
+    return {
+        "project_id": project_id,
+        "kept_crypto_files": kept_by_file,
+        "matches_by_category": matches_by_category,
+        "python_usages": python_usages,
+        "failures": failures,
+        "rule_report": report.to_dict(),
+        "generated_files": generated.to_dict(),
+        "stats": stats,
+    }
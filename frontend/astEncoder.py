@@ -0,0 +1,419 @@
+import bisect
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from frontend.scheduler import estimate_tokens
+
+HEADER = "# Compact AST: one statement per line, L<n> is the source line, nesting by indent."
+
+MAX_STRING = 80
+MAX_ITEMS = 6
+MAX_DEPTH = 12
+IDENTIFIER_SAMPLE = 8
+
+FUNCTION_TYPES = {
+    "FunctionDeclaration", "FunctionExpression", "ArrowFunctionExpression",
+    "ClassMethod", "PrivateMethod", "Constructor", "MethodProperty",
+    "GetterProperty", "SetterProperty",
+    "FunctionDef", "AsyncFunctionDef", "Lambda",
+}
+CLASS_TYPES = {"ClassDeclaration", "ClassExpression", "ClassDef"}
+# Nodes that only wrap one expression.
+WRAPPER_FIELDS = {
+    "ParenthesisExpression": "expression",
+    "TsAsExpression": "expression",
+    "TsSatisfiesExpression": "expression",
+    "TsNonNullExpression": "expression",
+    "TsTypeAssertion": "expression",
+    "TsConstAssertion": "expression",
+    "OptionalChainingExpression": "base",
+    "ExprOrSpread": "expression",
+    "Param": "pat",
+    "Parameter": "pat",
+    "Expr": "value",
+    "keyword": "value",
+    "Starred": "value",
+}
+
+_tiktoken_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count with tiktoken when it is installed, else ~4 chars per token.
+    """
+    global _tiktoken_encoding
+
+    if _tiktoken_encoding is None:
+        try:
+            import tiktoken
+            _tiktoken_encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _tiktoken_encoding = False
+
+    if _tiktoken_encoding:
+        return len(_tiktoken_encoding.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+
+def _first_token_offset(source: bytes) -> int:
+    """
+    Byte offset of the first token: skips a BOM, a shebang line, whitespace
+    and comments.
+    """
+    i = 3 if source.startswith(b"\xef\xbb\xbf") else 0
+    if source.startswith(b"#!", i):
+        newline = source.find(b"\n", i)
+        i = len(source) if newline == -1 else newline + 1
+
+    while i < len(source):
+        if source[i:i + 1].isspace():
+            i += 1
+        elif source.startswith(b"//", i):
+            newline = source.find(b"\n", i)
+            i = len(source) if newline == -1 else newline + 1
+        elif source.startswith(b"/*", i):
+            end = source.find(b"*/", i + 2)
+            i = len(source) if end == -1 else end + 2
+        else:
+            break
+
+    return i
+
+
+def _iter_identifiers(node: Any) -> Iterator[Tuple[int, str]]:
+    if isinstance(node, list):
+        for child in node:
+            yield from _iter_identifiers(child)
+    elif isinstance(node, dict):
+        if node.get("type") == "Identifier" and isinstance(node.get("span"), dict) and node.get("value"):
+            yield node["span"]["start"], node["value"]
+        for key, value in node.items():
+            if key != "span":
+                yield from _iter_identifiers(value)
+
+
+class LineIndex:
+    """
+    Maps AST nodes to source line numbers.
+
+    Python ASTs carry "line". swc spans are byte offsets into a source map
+    shared by every file a parser process has seen, so they are rebased:
+    the Module span starts at the file's first token, which gives the base.
+    The base is checked against identifier names in the source and, if they
+    disagree, the other usual conventions (0- or 1-based) are tried.
+    """
+
+    def __init__(self, root: Any, source: Optional[str]):
+        self.base: Optional[int] = None
+        self.line_starts: List[int] = []
+
+        span = root.get("span") if isinstance(root, dict) else None
+        if not source or not isinstance(span, dict):
+            return
+
+        data = source.encode("utf-8")
+        self.line_starts = [0] + [m.end() for m in re.finditer(b"\n", data)]
+
+        start = span["start"]
+        candidates = [start - _first_token_offset(data), 1, 0]
+        sample = []
+        for identifier in _iter_identifiers(root):
+            sample.append(identifier)
+            if len(sample) >= IDENTIFIER_SAMPLE:
+                break
+
+        def hits(base: int) -> int:
+            return sum(
+                data[offset - base:offset - base + len(name.encode("utf-8"))] == name.encode("utf-8")
+                for offset, name in sample
+            )
+
+        best = max(candidates, key=hits)
+        self.base = best if not sample or hits(best) else candidates[0]
+
+    def line(self, node: Dict[str, Any]) -> Optional[int]:
+        if isinstance(node.get("line"), int):
+            return node["line"]
+
+        span = node.get("span")
+        if self.base is None or not isinstance(span, dict) or "start" not in span:
+            return None
+
+        offset = span["start"] - self.base
+        if offset < 0:
+            return None
+        return bisect.bisect_right(self.line_starts, offset)
+
+
+def _string(value: Any) -> str:
+    text = str(value)
+    if len(text) > MAX_STRING:
+        text = text[:MAX_STRING] + "…"
+    return json.dumps(text, ensure_ascii=False)
+
+
+def _join(items: List[Any], depth: int) -> str:
+    parts = [expr(item, depth) for item in items[:MAX_ITEMS]]
+    if len(items) > MAX_ITEMS:
+        parts.append("…")
+    return ", ".join(parts)
+
+
+def _params(node: Dict[str, Any]) -> str:
+    params = node.get("params")
+    if params is None and isinstance(node.get("function"), dict):
+        params = node["function"].get("params")
+    if params is None and isinstance(node.get("args"), dict):
+        params = node["args"].get("args")
+    return _join(params or [], MAX_DEPTH - 2)
+
+
+def _name(node: Dict[str, Any]) -> str:
+    for field in ("identifier", "key", "name", "id"):
+        value = node.get(field)
+        if isinstance(value, str):
+            return value
+        if isinstance(value, dict):
+            return expr(value)
+    return ""
+
+
+def expr(node: Any, depth: int = 0) -> str:
+    """
+    Prints an expression in a condensed, JS-like form. Parts removed by
+    pruning print as "?".
+    """
+    if node is None:
+        return "?"
+    if isinstance(node, list):
+        return _join(node, depth)
+    if not isinstance(node, dict):
+        return str(node)
+    if depth > MAX_DEPTH:
+        return "…"
+
+    depth += 1
+    t = node.get("type")
+
+    if t in WRAPPER_FIELDS or (t is None and "expression" in node):
+        inner = expr(node.get(WRAPPER_FIELDS.get(t, "expression")), depth)
+        if node.get("spread") or t == "Starred":
+            return "..." + inner
+        if t == "keyword" and node.get("arg"):
+            return f"{node['arg']}={inner}"
+        return inner
+
+    if t in ("Identifier", "PrivateName"):
+        return str(node.get("value", "?"))
+    if t == "Name":
+        return str(node.get("id", "?"))
+    if t == "StringLiteral":
+        return _string(node.get("value", ""))
+    if t in ("NumericLiteral", "BigIntLiteral", "BooleanLiteral"):
+        return str(node.get("value"))
+    if t == "NullLiteral":
+        return "null"
+    if t == "Constant":
+        value = node.get("value")
+        return _string(value) if isinstance(value, str) else str(value)
+    if t == "RegExpLiteral":
+        return f"/{node.get('pattern', '')}/{node.get('flags', '')}"
+    if t == "TemplateLiteral":
+        text = "".join(q.get("cooked") or q.get("raw") or "" for q in node.get("quasis", []) if isinstance(q, dict))
+        values = node.get("expressions") or []
+        return "`" + text[:MAX_STRING] + ("${" + _join(values, depth) + "}" if values else "") + "`"
+    if t in ("ThisExpression", "Super"):
+        return "this" if t == "ThisExpression" else "super"
+
+    if t == "MemberExpression":
+        prop = node.get("property")
+        if isinstance(prop, dict) and prop.get("type") == "Computed":
+            return f"{expr(node.get('object'), depth)}[{expr(prop.get('expression'), depth)}]"
+        return f"{expr(node.get('object'), depth)}.{expr(prop, depth)}"
+    if t == "Attribute":
+        return f"{expr(node.get('value'), depth)}.{node.get('attr', '?')}"
+    if t in ("Subscript",):
+        return f"{expr(node.get('value'), depth)}[{expr(node.get('slice'), depth)}]"
+    if t == "Computed":
+        return f"[{expr(node.get('expression'), depth)}]"
+
+    if t in ("CallExpression", "NewExpression", "Call"):
+        callee = node.get("callee", node.get("func"))
+        args = list(node.get("arguments") or node.get("args") or []) + list(node.get("keywords") or [])
+        prefix = "new " if t == "NewExpression" else ""
+        return f"{prefix}{expr(callee, depth)}({_join(args, depth)})"
+
+    if t in ("ObjectExpression", "ObjectPattern", "Dict"):
+        if t == "Dict":
+            pairs = [f"{expr(k, depth)}: {expr(v, depth)}" for k, v in zip(node.get("keys", []), node.get("values", []))]
+            return "{" + ", ".join(pairs[:MAX_ITEMS]) + ("…" if len(pairs) > MAX_ITEMS else "") + "}"
+        return "{" + _join(node.get("properties") or [], depth) + "}"
+    if t in ("KeyValueProperty", "KeyValuePatternProperty"):
+        return f"{expr(node.get('key'), depth)}: {expr(node.get('value'), depth)}"
+    if t == "AssignmentPatternProperty":
+        return expr(node.get("key"), depth)
+    if t in ("ArrayExpression", "ArrayPattern", "List", "Tuple"):
+        return "[" + _join(node.get("elements") or node.get("elts") or [], depth) + "]"
+    if t in ("SpreadElement", "RestElement"):
+        return "..." + expr(node.get("arguments", node.get("argument")), depth)
+
+    if t in ("AwaitExpression", "Await"):
+        return "await " + expr(node.get("argument", node.get("value")), depth)
+    if t in ("AssignmentExpression", "AssignmentPattern"):
+        return f"{expr(node.get('left'), depth)} {node.get('operator', '=')} {expr(node.get('right'), depth)}"
+    if t in ("BinaryExpression", "BinOp", "Compare", "BoolOp"):
+        return f"{expr(node.get('left', node.get('values')), depth)} {_operator(node)} {expr(node.get('right', node.get('comparators')), depth)}"
+    if t in ("UnaryExpression", "UnaryOp"):
+        return f"{_operator(node)}{expr(node.get('argument', node.get('operand')), depth)}"
+    if t in ("ConditionalExpression", "IfExp"):
+        return f"{expr(node.get('test'), depth)} ? {expr(node.get('consequent', node.get('body')), depth)} : {expr(node.get('alternate', node.get('orelse')), depth)}"
+
+    if t in FUNCTION_TYPES:
+        name = _name(node)
+        return f"fn {name}({_params(node)})".replace("fn (", "fn(")
+    if t == "arg":
+        return str(node.get("arg", "?"))
+    if t == "alias":
+        return node.get("name", "?") + (f" as {node['asname']}" if node.get("asname") else "")
+
+    # Anything else: the first child that prints, or the node type.
+    for key, value in node.items():
+        if key not in ("type", "span", "line", "ctxt") and isinstance(value, (dict, list)):
+            return expr(value, depth)
+    return t or "?"
+
+
+def _operator(node: Dict[str, Any]) -> str:
+    op = node.get("operator", node.get("op"))
+    if isinstance(op, dict):
+        return {"Add": "+", "Sub": "-", "Mult": "*", "Div": "/", "Mod": "%", "Not": "not ", "USub": "-",
+                "And": "and", "Or": "or", "BitOr": "|", "BitAnd": "&"}.get(op.get("type"), op.get("type", "?"))
+    if isinstance(node.get("ops"), list) and node["ops"]:
+        return _operator({"op": node["ops"][0]})
+    return str(op or "?")
+
+
+def _nested_functions(node: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Functions inside an expression (callbacks), without entering their bodies.
+    """
+    if isinstance(node, list):
+        for child in node:
+            yield from _nested_functions(child)
+    elif isinstance(node, dict):
+        if node.get("type") in FUNCTION_TYPES:
+            yield node
+            return
+        for key, value in node.items():
+            if key != "span":
+                yield from _nested_functions(value)
+
+
+def _function_body(node: Dict[str, Any]) -> Any:
+    body = node.get("body")
+    if body is None and isinstance(node.get("function"), dict):
+        body = node["function"].get("body")
+    if isinstance(body, dict) and "stmts" in body:
+        return body["stmts"]
+    return body
+
+
+class _Printer:
+    def __init__(self, index: LineIndex):
+        self.index = index
+        self.lines: List[str] = []
+
+    def emit(self, node: Dict[str, Any], depth: int, text: str):
+        line = self.index.line(node)
+        prefix = "  " * depth + (f"L{line} " if line else "")
+        self.lines.append(prefix + text)
+
+    def emit_expression(self, node: Dict[str, Any], value: Any, depth: int, text: str):
+        self.emit(node, depth, text)
+        for function in _nested_functions(value):
+            self.walk(_function_body(function), depth + 1)
+
+    def walk(self, node: Any, depth: int = 0):
+        if isinstance(node, list):
+            for child in node:
+                self.walk(child, depth)
+            return
+        if not isinstance(node, dict):
+            return
+
+        t = node.get("type")
+
+        if t in ("ExpressionStatement", "Expr"):
+            value = node.get("expression", node.get("value"))
+            self.emit_expression(node, value, depth, expr(value))
+        elif t == "VariableDeclaration":
+            for declarator in node.get("declarations") or []:
+                init = declarator.get("init")
+                self.emit_expression(declarator, init, depth, f"{node.get('kind', 'var')} {expr(declarator.get('id'))} = {expr(init)}")
+        elif t == "VariableDeclarator":
+            init = node.get("init")
+            self.emit_expression(node, init, depth, f"{expr(node.get('id'))} = {expr(init)}")
+        elif t in ("Assign", "AnnAssign", "AugAssign"):
+            targets = node.get("targets") or [node.get("target")]
+            value = node.get("value")
+            self.emit_expression(node, value, depth, f"{_join(targets, 0)} = {expr(value)}")
+        elif t == "ImportDeclaration":
+            source = (node.get("source") or {}).get("value", "?")
+            names = [expr(s.get("local")) for s in node.get("specifiers") or [] if isinstance(s, dict)]
+            self.emit(node, depth, f"import {{{', '.join(names)}}} from {_string(source)}")
+        elif t in ("Import", "ImportFrom"):
+            names = _join(node.get("names") or [], 0)
+            # Relative imports (`from . import x`) have no module key.
+            module = "." * (node.get("level") or 0) + (node.get("module") or "")
+            self.emit(node, depth, f"from {module} import {names}" if t == "ImportFrom" else f"import {names}")
+        elif t in ("ReturnStatement", "Return", "ThrowStatement", "Raise"):
+            value = node.get("argument", node.get("value", node.get("exc")))
+            keyword = "return" if t in ("ReturnStatement", "Return") else "throw"
+            self.emit_expression(node, value, depth, f"{keyword} {expr(value)}")
+        elif t in ("ExportDefaultExpression",):
+            self.emit_expression(node, node.get("expression"), depth, f"export default {expr(node.get('expression'))}")
+        elif t in FUNCTION_TYPES:
+            self.emit(node, depth, f"function {_name(node)}({_params(node)})")
+            self.walk(_function_body(node), depth + 1)
+        elif t in CLASS_TYPES:
+            self.emit(node, depth, f"class {_name(node)}")
+            self.walk(node.get("body"), depth + 1)
+        elif t in ("IfStatement", "If", "WhileStatement", "While"):
+            self.emit(node, depth, f"{'if' if t in ('IfStatement', 'If') else 'while'} ({expr(node.get('test'))})")
+            self.walk(node.get("consequent", node.get("body")), depth + 1)
+            self.walk(node.get("alternate", node.get("orelse")), depth + 1)
+        elif t in ("CallExpression", "NewExpression", "Call", "AwaitExpression", "AssignmentExpression"):
+            # A bare expression whose enclosing statement was pruned away.
+            self.emit_expression(node, node, depth, expr(node))
+        else:
+            for key, value in node.items():
+                if key not in ("span", "ctxt") and isinstance(value, (dict, list)):
+                    self.walk(value, depth)
+
+
+def encode_ast(ast_json: Any, source: Optional[str] = None) -> str:
+    """
+    Encodes a (pruned) swc or Python AST as compact text for an LLM prompt.
+
+    Spans become L<line> prefixes when source is given, wrapper nodes are
+    collapsed, and calls, member chains and literals print as code.
+    """
+    root = ast_json.get("ast", ast_json) if isinstance(ast_json, dict) and "ast" in ast_json else ast_json
+
+    printer = _Printer(LineIndex(root, source))
+    printer.walk(root)
+
+    return HEADER + "\n" + "\n".join(printer.lines)
+
+
+def encode_for_prompt(ast_json_str: str, source: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+    """
+    Returns (compact text, {"raw_tokens", "compact_tokens"}).
+    """
+    compact = encode_ast(json.loads(ast_json_str), source)
+    return compact, {
+        "raw_tokens": count_tokens(ast_json_str),
+        "compact_tokens": count_tokens(compact),
+    }
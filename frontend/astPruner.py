@@ -0,0 +1,44 @@
+import re
+from typing import Any, Optional
+from frontend.usageScanner import CRYPTO_PATTERNS
+
+ALL_PATTERNS = re.compile(
+    "|".join(pattern for patterns in CRYPTO_PATTERNS.values() for pattern in patterns),
+    re.IGNORECASE,
+)
+
+
+def prune_ast_node(node: Any) -> Optional[Any]:
+    """
+    Python port of pruneAstNode in pruneAST.js, used to prune one file at a
+    time as it streams through the pipeline.
+
+    Keeps a node when one of its own string values matches a crypto pattern
+    or any of its children survive; scalar fields of kept nodes are kept.
+    Works bottom-up, so it is linear in the size of the AST.
+    """
+    if isinstance(node, list):
+        pruned = [child for child in (prune_ast_node(c) for c in node) if child is not None]
+        return pruned or None
+
+    if not isinstance(node, dict):
+        return None
+
+    is_match = False
+    cloned = {}
+
+    for key, value in node.items():
+        if key == "span":
+            # Kept for line numbers (astEncoder), but never a reason to keep a node.
+            cloned[key] = value
+        elif isinstance(value, (dict, list)):
+            pruned = prune_ast_node(value)
+            if pruned is not None:
+                cloned[key] = pruned
+                is_match = True
+        else:
+            cloned[key] = value
+            if isinstance(value, str) and ALL_PATTERNS.search(value):
+                is_match = True
+
+    return cloned if is_match else None
@@ -0,0 +1,228 @@
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+DEFAULT_THRESHOLD = float(os.getenv("CRYPTO_SCORE_THRESHOLD", "3.0"))
+
+# Hits inside comments count for this fraction of the rule weight.
+COMMENT_DISCOUNT = 0.25
+# Hits inside identifiers known to be unrelated (signIn, hashCode, nextToken, ...).
+UNRELATED_DISCOUNT = 0.1
+# Repeating a keyword adds evidence, but only up to a point.
+MAX_HITS_PER_RULE = 3
+
+# Rules match against identifier-split, lowercased text: `RSAPublicKey`,
+# `rsa_public_key` and `rsa-public-key` all become "rsa public key", so the
+# \b anchors below are identifier boundaries (`folder` never matches `der`).
+SCORING_RULES: Dict[str, List[Tuple[str, float]]] = {
+    "aes": [
+        (r"\baes\b", 3.0),
+        (r"\brijndael\b", 3.0),
+    ],
+    "rsa": [
+        (r"\brsa\b", 3.0),
+    ],
+    "signing": [
+        (r"\bsign\b", 1.0),
+        (r"\bsigning\b", 1.0),
+        (r"\bverify\b", 0.5),
+        (r"\bsignature\b", 1.5),
+        (r"\bdigital signature\b", 2.0),
+    ],
+    "cert": [
+        (r"\bcertificate\b", 2.0),
+        (r"\bx 509\b", 3.0),
+        (r"\bpublic key\b", 2.0),
+        (r"\bprivate key\b", 2.5),
+        (r"\bpem\b", 1.5),
+        (r"\bder\b", 1.0),
+        (r"\basn 1\b", 1.5),
+        (r"\b(?:ssl|tls)\b", 1.5),
+    ],
+    "hash": [
+        (r"\bsha ?\d+\b", 3.0),
+        (r"\bmd ?5\b", 3.0),
+        (r"\bhash(?:es)?\b", 0.75),
+        (r"\bhashlib\b", 2.0),
+        (r"\bpbkdf ?2\b", 3.0),
+        (r"\bscrypt\b", 3.0),
+        (r"\bbcrypt(?: ?js)?\b", 3.0),
+        (r"\bhmac\b", 3.0),
+        (r"\bcmac\b", 3.0),
+        (r"\bdigest\b", 1.0),
+    ],
+    "keys": [
+        (r"\bapi key\b", 0.5),
+        (r"\bsecret\b", 1.0),
+        (r"\btoken\b", 0.5),
+        (r"\bgenerate key pair(?: sync)?\b", 3.0),
+    ],
+    "cipher": [
+        (r"\b(?:de)?cipher(?:iv|s)?\b", 3.0),
+        (r"\b(?:en|de)crypt(?:s|ed|ion|or)?\b", 3.0),
+        (r"\b(?:3 ?des|triple ?des|des (?:ede|cbc|ecb))\b", 3.0),
+        (r"\bx?chacha(?: ?20)?\b", 3.0),
+        (r"\bpoly ?1305\b", 3.0),
+        # require('crypto'), `from cryptography...`: a use still has to follow.
+        (r"\bcrypto(?:graphy)?\b", 1.5),
+    ],
+    "asymmetric": [
+        (r"\becdhe?\b", 3.0),
+        (r"\becdsa\b", 3.0),
+        (r"\b(?:ed|x) ?(?:25519|448)\b", 3.0),
+        (r"\bsecp ?\d+ ?[kr] ?1\b", 3.0),
+        (r"\bdsa\b", 3.0),
+        (r"\bdiffie ?hellman\b", 3.0),
+    ],
+    "jwt": [
+        (r"\bjwt\b", 3.0),
+        (r"\bjws\b", 3.0),
+        (r"\bjsonwebtoken\b", 3.0),
+        (r"\b(?:hs|rs|es|ps) (?:256|384|512)\b", 3.0),
+    ],
+}
+
+# Identifier contexts where a keyword does not mean cryptography.
+UNRELATED_CONTEXTS = [
+    r"\bsign (?:in|up|out|on)\b",
+    r"\b(?:hash|hashed) (?:code|map|table|set|router|history|change|link|key|bang|tag)\b",
+    r"\b(?:location|url|window) hash\b",
+    r"\b(?:next|page|cancel|cancellation|continuation|lexer|parse|parser|csrf|xsrf) token\b",
+    r"\btoken (?:type|kind|list|stream)\b",
+    r"\b(?:sign|signed) (?:bit|magnitude|int|integer|number)\b",
+    r"\bverify (?:email|password|form|input|schema)\b",
+]
+
+COMPILED_RULES = [
+    (category, pattern, re.compile(pattern), weight)
+    for category, rules in SCORING_RULES.items()
+    for pattern, weight in rules
+]
+UNRELATED_RE = re.compile("|".join(UNRELATED_CONTEXTS))
+
+SUBWORD_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+JS_COMMENT_RE = re.compile(r"/\*.*?\*/|(?<![:\\])//[^\n]*", re.DOTALL)
+PY_COMMENT_RE = re.compile(r"#[^\n]*")
+
+
+def rule_label(category: str, pattern: str) -> str:
+    return f"{category}:{pattern}"
+
+
+def normalize_identifiers(text: str) -> str:
+    """
+    Splits identifiers on case changes, digits and punctuation and lowercases them.
+    """
+    return " ".join(SUBWORD_RE.findall(text)).lower()
+
+
+def split_comments(content: str, suffix: str = ".js") -> Tuple[str, str]:
+    """
+    Returns (code, comments) for a source file.
+    """
+    comment_re = PY_COMMENT_RE if suffix == ".py" else JS_COMMENT_RE
+
+    comments = comment_re.findall(content)
+    code = comment_re.sub(" ", content)
+    return code, "\n".join(comments)
+
+
+def _rule_hits(text: str, regex: re.Pattern, unrelated_spans: List[Tuple[int, int]]) -> Tuple[int, int]:
+    """
+    Returns (related_hits, unrelated_hits) for one rule.
+    """
+    related = unrelated = 0
+    for match in regex.finditer(text):
+        start, end = match.span()
+        if any(s <= start and end <= e for s, e in unrelated_spans):
+            unrelated += 1
+        else:
+            related += 1
+    return related, unrelated
+
+
+def score_source(content: str, suffix: str = ".js", threshold: float = DEFAULT_THRESHOLD) -> dict:
+    """
+    Scores how likely a source file is to contain cryptography.
+
+    Returns:
+        {
+            "score": <float>,
+            "admitted": <bool>,
+            "categories": [...],
+            "rules": { rule_label: contribution }
+        }
+    """
+    code, comments = split_comments(content, suffix)
+
+    weighted_texts = [
+        (normalize_identifiers(code), 1.0),
+        (normalize_identifiers(comments), COMMENT_DISCOUNT),
+    ]
+    texts = [
+        (text, factor, [m.span() for m in UNRELATED_RE.finditer(text)])
+        for text, factor in weighted_texts
+        if text
+    ]
+
+    rules: Dict[str, float] = {}
+    category_scores: Dict[str, float] = {}
+
+    for category, pattern, regex, weight in COMPILED_RULES:
+        weighted_hits = 0.0
+        for text, factor, unrelated_spans in texts:
+            related, unrelated = _rule_hits(text, regex, unrelated_spans)
+            weighted_hits += factor * (related + unrelated * UNRELATED_DISCOUNT)
+
+        if not weighted_hits:
+            continue
+
+        contribution = weight * min(weighted_hits, MAX_HITS_PER_RULE)
+        rules[rule_label(category, pattern)] = contribution
+        category_scores[category] = category_scores.get(category, 0.0) + contribution
+
+    score = sum(rules.values())
+
+    return {
+        "score": round(score, 3),
+        "admitted": score >= threshold,
+        "categories": list(category_scores),
+        "rules": rules,
+    }
+
+
+class RuleReport:
+    """
+    Tracks how many files each rule admits.
+
+    "admitted" counts admitted files the rule contributed to; "decisive" counts
+    admitted files that would have fallen below the threshold without it.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.scored = 0
+        self.admitted_files = 0
+        self.admitted = Counter()
+        self.decisive = Counter()
+
+    def add(self, result: dict):
+        self.scored += 1
+        if not result["admitted"]:
+            return
+
+        self.admitted_files += 1
+        for label, contribution in result["rules"].items():
+            self.admitted[label] += 1
+            if result["score"] - contribution < self.threshold:
+                self.decisive[label] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            "files_scored": self.scored,
+            "files_admitted": self.admitted_files,
+            "admitted_by_rule": dict(self.admitted.most_common()),
+            "decisive_by_rule": dict(self.decisive.most_common()),
+        }
@@ -0,0 +1,333 @@
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from convert import clean_output_string
+
+NUM_PERMUTATIONS = 64
+NUM_BANDS = 16
+# Transpilers reorder and wrap code enough to break longer shingles, so
+# near-duplicates are judged on their identifier/literal vocabulary.
+SHINGLE_SIZE = 1
+MIN_DISTINCT_SHINGLES = 8
+SIMILARITY_THRESHOLD = 0.75
+
+# Words inside literals and identifiers that pin down which algorithm, curve,
+# mode or key size a file uses. Near-duplicates only merge when these match
+# exactly, so an AES-256-GCM module and its 3DES-CBC twin stay apart.
+CRYPTO_WORD_RE = re.compile(
+    r"(?:aes|3?des|rsa|dsa|ecdsa|ecdhe?|dhe?|eddsa|ed25519|ed448|x25519|x448|secp\d+[rk]1|prime\d+v"
+    r"|sha|hmac|cmac|pbkdf|hkdf|scrypt|bcrypt|argon2(?:id|i|d)?|x?chacha|poly1305|blowfish"
+    r"|kyber|mlkem|mldsa|slhdsa|gcm|cbc|ecb|ctr|cfb|ofb|ccm|xts|siv|oaep|pss|pkcs)\d*"
+    r"|(?:ede|p|md|rc|hs|rs|es|ps)\d+"
+    r"|40|56|64|112|128|160|168|192|224|256|384|512|521|1024|2048|3072|4096|8192"
+)
+WORD_SPLIT_RE = re.compile(r"[^a-z0-9]+")
+
+# Directories that usually hold built copies of the real sources.
+BUILD_DIRS = {"lib", "build", "dist", "out", "cjs", "esm", "umd", "es"}
+
+COMMENT_RE = re.compile(r"/\*.*?\*/|//[^\n]*", re.DOTALL)
+TOKEN_RE = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*|\d+|'[^'\n]*'|\"[^\"\n]*\"|`[^`]*`")
+
+# Keywords that transpilers rewrite freely (const -> var, class -> function, ...)
+# carry no signal about whether two files implement the same thing.
+IGNORED_TOKENS = {
+    "var", "let", "const", "function", "return", "class", "extends", "new",
+    "this", "self", "_this", "import", "export", "from", "require", "module",
+    "exports", "default", "use", "strict", "async", "await", "yield",
+    "prototype", "_classCallCheck", "_createClass", "_interopRequireDefault",
+    "_typeof", "__esModule", "Object", "defineProperty", "value",
+}
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (
+        int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME | 1,
+        int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _MERSENNE_PRIME,
+    )
+    for i in range(NUM_PERMUTATIONS)
+]
+
+
+def content_hash(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def normalize_tokens(source: str) -> List[str]:
+    """
+    Strips comments and reduces source to identifier, number and literal tokens.
+    Quote style is normalized so transpiled output lines up with its source.
+    """
+    source = COMMENT_RE.sub(" ", source)
+
+    tokens = []
+    for token in TOKEN_RE.findall(source):
+        if token[0] in "'\"`":
+            token = '"' + token[1:-1] + '"'
+        if token in IGNORED_TOKENS:
+            continue
+        tokens.append(token)
+
+    return tokens
+
+
+def crypto_fingerprint(tokens: List[str]) -> frozenset:
+    """
+    The crypto-relevant words in a file's tokens: algorithm, curve and mode
+    names and key sizes, e.g. {"aes", "256", "gcm"} for "aes-256-gcm".
+    """
+    words = set()
+    for token in tokens:
+        for word in WORD_SPLIT_RE.split(token.strip('"').lower()):
+            if CRYPTO_WORD_RE.fullmatch(word):
+                words.add(word)
+    return frozenset(words)
+
+
+def minhash_signature(tokens: List[str]) -> Optional[List[int]]:
+    """
+    MinHash over token shingles. Returns None for files too short to fingerprint.
+    """
+    shingles = {
+        int.from_bytes(
+            hashlib.blake2b(" ".join(tokens[i:i + SHINGLE_SIZE]).encode(), digest_size=8).digest(),
+            "big",
+        )
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+
+    if len(shingles) < MIN_DISTINCT_SHINGLES:
+        return None
+
+    return [
+        min((a * s + b) % _MERSENNE_PRIME for s in shingles)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def _representative_key(path: str) -> tuple:
+    """
+    Prefer hand-written sources over built copies, then shorter paths.
+    """
+    parts = set(Path(path).parts)
+    return (bool(parts & BUILD_DIRS), len(path), path)
+
+
+def group_duplicate_files(
+    file_paths: Iterable[str],
+    threshold: float = SIMILARITY_THRESHOLD,
+) -> List[List[str]]:
+    """
+    Groups exact duplicates by content hash and near-duplicates by MinHash,
+    using LSH banding so candidate pairs are found without comparing every pair.
+    Near-duplicates must also have the same crypto_fingerprint, since members
+    get a copy of the representative's CBOM.
+
+    Returns a list of groups; the first path in each group is its representative.
+    Files that cannot be read end up in a group of their own.
+    """
+    parent: Dict[str, str] = {}
+
+    def find(x: str) -> str:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(a: str, b: str):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    by_hash: Dict[str, str] = {}
+    signatures: Dict[str, List[int]] = {}
+    fingerprints: Dict[str, frozenset] = {}
+    buckets: Dict[tuple, List[str]] = {}
+    rows = NUM_PERMUTATIONS // NUM_BANDS
+
+    for path in file_paths:
+        parent[path] = path
+
+        try:
+            source = Path(path).read_text(encoding="utf-8", errors="ignore")
+        except Exception:
+            continue
+
+        digest = content_hash(source)
+        if digest in by_hash:
+            union(by_hash[digest], path)
+            continue
+        by_hash[digest] = path
+
+        tokens = normalize_tokens(source)
+        signature = minhash_signature(tokens)
+        if signature is None:
+            continue
+        signatures[path] = signature
+        fingerprints[path] = crypto_fingerprint(tokens)
+
+        for band in range(NUM_BANDS):
+            key = (band, tuple(signature[band * rows:(band + 1) * rows]))
+            for other in buckets.setdefault(key, []):
+                if (
+                    find(other) != find(path)
+                    and fingerprints[other] == fingerprints[path]
+                    and estimate_similarity(signatures[other], signature) >= threshold
+                ):
+                    union(other, path)
+            buckets[key].append(path)
+
+    groups: Dict[str, List[str]] = {}
+    for path in parent:
+        groups.setdefault(find(path), []).append(path)
+
+    return [sorted(members, key=_representative_key) for members in groups.values()]
+
+
+class StreamingDeduper:
+    """
+    Incremental form of group_duplicate_files for the streaming pipeline.
+
+    The first file of each group claims it and becomes the representative;
+    later members wait for the representative's result and copy it. Only
+    representatives ever produce results, so members cannot deadlock waiting
+    on each other.
+
+    Only the representative's output is kept, and once seal() says no more
+    files will be claimed, each result is dropped as soon as the last member
+    waiting on it has read it.
+    """
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._by_hash: Dict[str, str] = {}
+        self._signatures: Dict[str, List[int]] = {}
+        self._fingerprints: Dict[str, frozenset] = {}
+        self._buckets: Dict[tuple, List[str]] = {}
+        self._done: Dict[str, threading.Event] = {}
+        self._results: Dict[str, Any] = {}
+        self._waiting: Dict[str, int] = {}
+        self._sealed = False
+
+    def claim(self, path: str, source: str) -> Optional[str]:
+        """
+        Returns the representative path if path duplicates an earlier file,
+        otherwise registers path as a new representative and returns None.
+        Every non-None return must be followed by one wait() for it.
+        """
+        digest = content_hash(source)
+        tokens = normalize_tokens(source)
+        signature = minhash_signature(tokens)
+        fingerprint = crypto_fingerprint(tokens)
+        rows = NUM_PERMUTATIONS // NUM_BANDS
+
+        with self._lock:
+            representative = self._by_hash.get(digest)
+
+            if representative is None and signature is not None:
+                keys = [(band, tuple(signature[band * rows:(band + 1) * rows])) for band in range(NUM_BANDS)]
+                for key in keys:
+                    for other in self._buckets.get(key, []):
+                        if (
+                            self._fingerprints[other] == fingerprint
+                            and estimate_similarity(self._signatures[other], signature) >= self.threshold
+                        ):
+                            representative = other
+                            break
+                    if representative is not None:
+                        break
+
+                if representative is None:
+                    self._signatures[path] = signature
+                    self._fingerprints[path] = fingerprint
+                    for key in keys:
+                        self._buckets.setdefault(key, []).append(path)
+
+            if representative is not None:
+                self._waiting[representative] = self._waiting.get(representative, 0) + 1
+                return representative
+
+            self._by_hash[digest] = path
+            self._done[path] = threading.Event()
+            return None
+
+    def publish(self, path: str, cbom: Any):
+        """
+        Records a representative's result: a CBOM dict (only its output is
+        kept) or, if it was never analyzed, the reason as a string.
+        """
+        if isinstance(cbom, dict):
+            cbom = {"output": cbom.get("output")}
+
+        with self._lock:
+            done = self._done[path]
+            if self._sealed and not self._waiting.get(path):
+                del self._done[path]
+            else:
+                self._results[path] = cbom
+        done.set()
+
+    def wait(self, representative: str) -> Any:
+        self._done[representative].wait()
+
+        with self._lock:
+            cbom = self._results[representative]
+            self._waiting[representative] -= 1
+            if self._sealed and not self._waiting[representative]:
+                self._forget(representative)
+        return cbom
+
+    def seal(self):
+        """
+        Called once no more files will be claimed; drops every published
+        result no member is still waiting for.
+        """
+        with self._lock:
+            self._sealed = True
+            for path in list(self._results):
+                if not self._waiting.get(path):
+                    self._forget(path)
+
+    def _forget(self, path: str):
+        self._results.pop(path, None)
+        self._done.pop(path, None)
+        self._waiting.pop(path, None)
+
+
+def _rewrite_file_name(output: str, file_path: str) -> str:
+    """
+    Points a CBOM output string at file_path. Leaves unparseable output untouched.
+    """
+    try:
+        parsed = json.loads(clean_output_string(output))
+    except json.JSONDecodeError:
+        return output
+
+    entries = parsed if isinstance(parsed, list) else [parsed]
+    for entry in entries:
+        if isinstance(entry, dict):
+            entry["file_name"] = file_path
+
+    return json.dumps(parsed, indent=4)
+
+
+def copy_cbom_to_member(cbom: Any, file_path: str) -> Any:
+    """
+    Returns a copy of a representative's CBOM result with file_name set to file_path.
+    """
+    if not isinstance(cbom, dict):
+        return cbom
+
+    copied = dict(cbom)
+    if isinstance(copied.get("output"), str):
+        copied["output"] = _rewrite_file_name(copied["output"], file_path)
+
+    return copied
@@ -0,0 +1,320 @@
+import subprocess
+import time
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, Optional
+
+from cbomWriter import ALGORITHM_FAMILIES
+from frontend.cryptoScoring import COMPILED_RULES, DEFAULT_THRESHOLD, normalize_identifiers, rule_label, score_source
+from frontend.minifiedDetector import JS_EXTENSIONS, PREFIX_BYTES, classify_text
+from frontend.usageScanner import IGNORE_FOLDERS, KEEP_EXTENSIONS
+
+# Blobs larger than this are read off the pipe but not scored.
+MAX_BLOB_BYTES = 1024 * 1024
+
+EMPTY_BLOB = "0" * 40
+GITLINK_MODE = "160000"
+
+RULE_REGEXES = {rule_label(category, pattern): regex for category, pattern, regex, _ in COMPILED_RULES}
+
+
+class BlobReader:
+    """
+    One long-running `git cat-file --batch` process. Each blob is requested
+    and read back in turn, so nothing is ever buffered beyond one blob.
+    """
+
+    def __init__(self, repo_path: Path):
+        self.proc = subprocess.Popen(
+            ["git", "-C", str(repo_path), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def read(self, blob_id: str) -> Optional[bytes]:
+        """
+        Returns the blob's content, or None if it is missing or too large.
+        """
+        self.proc.stdin.write(blob_id.encode() + b"\n")
+        self.proc.stdin.flush()
+
+        header = self.proc.stdout.readline().split()
+        if len(header) != 3:
+            # "<id> missing"
+            return None
+
+        size = int(header[2])
+        data = self.proc.stdout.read(size)
+        self.proc.stdout.read(1)  # trailing newline
+
+        return data if size <= MAX_BLOB_BYTES else None
+
+    def close(self):
+        self.proc.stdin.close()
+        self.proc.wait()
+
+
+def _wanted_path(path: str) -> bool:
+    parts = PurePosixPath(path)
+    if parts.suffix.lower() not in KEEP_EXTENSIONS:
+        return False
+    return not any(part in IGNORE_FOLDERS for part in parts.parts[:-1])
+
+
+def iter_commit_changes(repo_path: Path, rev: str = "HEAD", max_commits: Optional[int] = None) -> Iterator[dict]:
+    """
+    Streams `git rev-list --reverse <rev>` into `git diff-tree --stdin` and
+    yields one entry per commit, oldest first:
+
+        {
+            "commit": <sha>, "timestamp": <int>, "author": <str>, "subject": <str>,
+            "changes": [ (path, old_blob, new_blob), ... ]
+        }
+
+    Only source files the scanner keeps are listed. Merge commits have no
+    changes of their own (their parents' commits carry them).
+    """
+    rev_list_cmd = ["git", "-C", str(repo_path), "rev-list", "--reverse", rev]
+    if max_commits:
+        # --reverse is applied after --max-count, so this keeps the newest commits.
+        rev_list_cmd.insert(4, f"--max-count={max_commits}")
+
+    rev_list = subprocess.Popen(rev_list_cmd, stdout=subprocess.PIPE)
+    diff_tree = subprocess.Popen(
+        [
+            "git", "-C", str(repo_path), "-c", "core.quotepath=off",
+            "diff-tree", "--stdin", "-r", "--raw", "--root", "--no-renames",
+            "--pretty=format:%H%x09%at%x09%an%x09%s",
+        ],
+        stdin=rev_list.stdout,
+        stdout=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+    rev_list.stdout.close()
+
+    commit = None
+    try:
+        for line in diff_tree.stdout:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+
+            if not line.startswith(":"):
+                if commit is not None:
+                    yield commit
+                sha, timestamp, author, subject = (line.split("\t", 3) + ["", "", ""])[:4]
+                commit = {
+                    "commit": sha,
+                    "timestamp": int(timestamp or 0),
+                    "author": author,
+                    "subject": subject,
+                    "changes": [],
+                }
+                continue
+
+            # :<old mode> <new mode> <old blob> <new blob> <status>\t<path>
+            meta, _, path = line.partition("\t")
+            old_mode, new_mode, old_blob, new_blob, _ = meta[1:].split(" ", 4)
+            if GITLINK_MODE in (old_mode, new_mode) or not _wanted_path(path):
+                continue
+            commit["changes"].append((path, old_blob, new_blob))
+
+        if commit is not None:
+            yield commit
+    finally:
+        diff_tree.stdout.close()
+        diff_tree.wait()
+        rev_list.wait()
+
+
+def _algorithm_family(text: str) -> Optional[str]:
+    # Rule matches are identifier-split ("md 5", "sha 256"), family names are not.
+    for candidate in (text, text.replace(" ", "")):
+        for family, regex, _ in ALGORITHM_FAMILIES:
+            if regex.search(candidate):
+                return family
+    return None
+
+
+def rule_usages(content: str, labels) -> frozenset:
+    """
+    Names what each matched rule found in content: the algorithm family when
+    the matched text names one ("md 5" -> MD5), otherwise the rule's category.
+
+    Returns a frozenset of (usage, rule_label) pairs.
+    """
+    text = normalize_identifiers(content)
+    usages = set()
+    for label in labels:
+        category = label.split(":", 1)[0]
+        families = {_algorithm_family(match.group()) for match in RULE_REGEXES[label].finditer(text)}
+        families.discard(None)
+        usages.update((usage, label) for usage in families or {category})
+    return frozenset(usages)
+
+
+class BlobScanner:
+    """
+    Scores each blob id at most once and remembers the crypto usages it
+    contains, as (usage, rule_label) pairs from rule_usages.
+    """
+
+    def __init__(self, reader: BlobReader, threshold: float = DEFAULT_THRESHOLD):
+        self.reader = reader
+        self.threshold = threshold
+        self.usages: Dict[str, frozenset] = {EMPTY_BLOB: frozenset()}
+        self.scanned = 0
+        self.reused = 0
+        self.skipped = 0
+
+    def usages_for(self, blob_id: str, path: str) -> frozenset:
+        if blob_id in self.usages:
+            self.reused += 1
+            return self.usages[blob_id]
+
+        usages = frozenset()
+        data = self.reader.read(blob_id)
+        if data is None:
+            self.skipped += 1
+        else:
+            self.scanned += 1
+            content = data.decode("utf-8", errors="ignore")
+            suffix = PurePosixPath(path).suffix.lower()
+
+            if suffix in JS_EXTENSIONS and classify_text(content[:PREFIX_BYTES]):
+                self.skipped += 1
+            else:
+                scored = score_source(content, suffix, self.threshold)
+                if scored["admitted"]:
+                    usages = rule_usages(content, scored["rules"])
+
+        self.usages[blob_id] = usages
+        return usages
+
+    def to_dict(self) -> dict:
+        return {
+            "unique_blobs": len(self.usages) - 1,
+            "blobs_scanned": self.scanned,
+            "blob_reuses": self.reused,
+            "blobs_skipped": self.skipped,
+        }
+
+
+def _head_files(repo_path: Path, rev: str) -> Iterator[tuple]:
+    """
+    Yields (path, blob) for every kept source file in rev's tree.
+    """
+    result = subprocess.run(
+        ["git", "-C", str(repo_path), "-c", "core.quotepath=off", "ls-tree", "-r", rev],
+        stdout=subprocess.PIPE,
+        text=True,
+        errors="replace",
+        check=True,
+    )
+    for line in result.stdout.splitlines():
+        meta, _, path = line.partition("\t")
+        mode, kind, blob = meta.split()
+        if kind == "blob" and _wanted_path(path):
+            yield path, blob
+
+
+def scan_history(
+    repo_path: str | Path,
+    rev: str = "HEAD",
+    max_commits: Optional[int] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> dict:
+    """
+    Finds when crypto usages were introduced and removed across history.
+
+    Every unique blob is scored once with the crypto rules, however many
+    commits and paths it appears under. Usages are named by algorithm (MD5,
+    AES, RSA, ...) or, where a rule names none, by its category; the rule
+    labels behind them are kept as detail. A commit introduces the usages its
+    new blob has that the old blob did not, and removes the reverse. A usage
+    counts as removed from the repository only once no path still has it, and
+    re-introducing it clears "last_removed".
+
+    Returns:
+        {
+            "timeline": [ { commit, timestamp, author, subject, path, introduced: [...], removed: [...], rules: [...] } ],
+            "usages": { usage: { "first_introduced": {...}, "last_removed": {...} | None, "files_at_head": <int>, "rules": [...] } },
+            "stats": { commits, changes, unique_blobs, blobs_scanned, blob_reuses, blobs_skipped, seconds }
+        }
+    """
+    repo_path = Path(repo_path).resolve()
+    started = time.time()
+
+    reader = BlobReader(repo_path)
+    scanner = BlobScanner(reader, threshold)
+
+    timeline: List[dict] = []
+    usages: Dict[str, dict] = {}
+    live_paths: Dict[str, set] = {}
+    commits = changes = 0
+
+    def summary_for(usage: str, where: Optional[dict]) -> dict:
+        return usages.setdefault(usage, {"first_introduced": where, "last_removed": None, "files_at_head": 0, "rules": set()})
+
+    try:
+        for commit in iter_commit_changes(repo_path, rev, max_commits):
+            commits += 1
+            for path, old_blob, new_blob in commit["changes"]:
+                changes += 1
+                old_pairs = scanner.usages_for(old_blob, path)
+                new_pairs = scanner.usages_for(new_blob, path)
+                old_usages = {usage for usage, _ in old_pairs}
+                new_usages = {usage for usage, _ in new_pairs}
+                if old_usages == new_usages:
+                    continue
+
+                introduced = new_usages - old_usages
+                removed = old_usages - new_usages
+                event = {
+                    "commit": commit["commit"],
+                    "timestamp": commit["timestamp"],
+                    "author": commit["author"],
+                    "subject": commit["subject"],
+                    "path": path,
+                    "introduced": sorted(introduced),
+                    "removed": sorted(removed),
+                    "rules": sorted(
+                        {label for usage, label in new_pairs if usage in introduced}
+                        | {label for usage, label in old_pairs if usage in removed}
+                    ),
+                }
+                timeline.append(event)
+
+                where = {k: event[k] for k in ("commit", "timestamp", "path")}
+                for usage, label in new_pairs:
+                    if usage in introduced:
+                        summary = summary_for(usage, where)
+                        summary["rules"].add(label)
+                        summary["last_removed"] = None
+                        live_paths.setdefault(usage, set()).add(path)
+                for usage in removed:
+                    paths = live_paths.get(usage, set())
+                    paths.discard(path)
+                    if not paths and usage in usages:
+                        usages[usage]["last_removed"] = where
+
+        for path, blob in _head_files(repo_path, rev):
+            pairs = scanner.usages_for(blob, path)
+            for usage, label in pairs:
+                summary_for(usage, None)["rules"].add(label)
+            for usage in {usage for usage, _ in pairs}:
+                usages[usage]["files_at_head"] += 1
+    finally:
+        reader.close()
+
+    for summary in usages.values():
+        summary["rules"] = sorted(summary["rules"])
+
+    stats = {"commits": commits, "changes": changes, **scanner.to_dict()}
+    stats["seconds"] = round(time.time() - started, 2)
+    print(
+        f"History scan: {commits} commits, {changes} file changes, "
+        f"{stats['blobs_scanned']} blobs scanned ({stats['blob_reuses']} reused) in {stats['seconds']}s"
+    )
+
+    return {"timeline": timeline, "usages": usages, "stats": stats}
@@ -1,10 +1,11 @@
 import * as swc from "@swc/core";
 import * as fs from "fs";
+import * as readline from "readline";
 
-async function parseFileToAst(path) {
-  const code = fs.readFileSync(path, "utf-8");
-
+async function parseFileToAst(path, code) {
   try {
+    code = code ?? fs.readFileSync(path, "utf-8");
+
     const ast = await swc.parse(code, {
       syntax: "typescript",
       tsx: path.endsWith(".tsx"),
@@ -20,7 +21,31 @@ async function parseFileToAst(path) {
   }
 }
 
+// --serve keeps one node process alive: one JSON request per stdin line
+// ({"path": ..., "code"?: ...}), one JSON result per stdout line.
+async function serve() {
+  const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+  for await (const line of lines) {
+    if (!line.trim()) continue;
+
+    let result;
+    try {
+      const request = JSON.parse(line);
+      result = await parseFileToAst(request.path, request.code);
+    } catch (err) {
+      result = { ok: false, error: err.message };
+    }
+    process.stdout.write(JSON.stringify(result) + "\n");
+  }
+}
+
 (async () => {
+  if (process.argv[2] === "--serve") {
+    await serve();
+    return;
+  }
+
   const file = process.argv[2];
   const result = await parseFileToAst(file);
   console.log(JSON.stringify(result));
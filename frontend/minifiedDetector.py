@@ -0,0 +1,191 @@
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path, PurePath
+from typing import Any, Dict, List, Optional
+
+# Only this much of the head (and a little of the tail) of a file is read,
+# so a 5 MB bundle costs the same to classify as a 5 KB module.
+PREFIX_BYTES = 64 * 1024
+SUFFIX_BYTES = 1024
+
+# Same set as usageScanner.JS_EXTENSIONS (which imports this module).
+JS_EXTENSIONS = {".js", ".jsx", ".ts", ".tsx"}
+
+# "skip": flagged files are dropped before scoring, parsing and the LLM.
+# "regex": flagged files are scored and their matches reported, but never
+#          parsed or sent to the LLM.
+# "off": no classification.
+MINIFIED_POLICY = os.getenv("MINIFIED_POLICY", "skip")
+
+GENERATED_SUFFIXES = (".min.js", "-min.js", ".bundle.js", ".chunk.js", ".umd.js", ".prod.js")
+GENERATED_DIRS = {"build", "vendor", "vendors", "bower_components", "out", ".next", "coverage"}
+
+SOURCE_MAP_RE = re.compile(r"^\s*//[#@]\s*sourceMappingURL=", re.MULTILINE)
+
+# Bundler runtimes (webpack, rollup/UMD, SystemJS, esbuild, parcel).
+PREAMBLE_RE = re.compile(
+    r"__webpack_require__|webpackBootstrap|webpackChunk|__webpack_modules__"
+    r"|/\*!\s*For license information please see"
+    r"|typeof exports\s*===?\s*['\"]object['\"]\s*&&\s*typeof module\s*!==?\s*['\"]undefined['\"]"
+    r"|\bSystem\.register\("
+    r"|\b__commonJS\(|\b__toESM\(|\bparcelRequire\b"
+)
+# Code generator banners; only looked for in comments at the top of the file.
+BANNER_BYTES = 1024
+BANNER_RE = re.compile(r"^\s*(?://|/?\*).*(?:@generated\b|\bDO NOT EDIT\b|\bGenerated by\b)", re.MULTILINE | re.IGNORECASE)
+
+# Minified code: very long lines, little whitespace, short identifiers.
+LONG_LINE = 1000
+MIN_LINE_SAMPLE = 512
+MEAN_LINE_LENGTH = 300
+MAX_WHITESPACE_RATIO = 0.08
+MAX_MEAN_IDENTIFIER = 3.0
+# Bits per character; source code sits around 4.5, base64/packed blobs near 6.
+HIGH_ENTROPY = 5.6
+
+IDENTIFIER_RE = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]*")
+
+
+def _path_reason(file_path: PurePath, repo_path: Optional[PurePath] = None) -> Optional[str]:
+    name = file_path.name.lower()
+    if name.endswith(GENERATED_SUFFIXES):
+        return "path"
+
+    # Only directories inside the repository count: a checkout that happens
+    # to live under /tmp/build/ is not generated code.
+    if repo_path is not None:
+        try:
+            file_path = file_path.relative_to(repo_path)
+        except ValueError:
+            pass
+    if any(part.lower() in GENERATED_DIRS for part in file_path.parts[:-1]):
+        return "path"
+    return None
+
+
+def _read_bounded(file_path: Path) -> tuple[str, str]:
+    """
+    Returns (prefix, suffix) of the file, each bounded in size.
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(PREFIX_BYTES)
+        tail = b""
+        if len(head) == PREFIX_BYTES:
+            size = f.seek(0, os.SEEK_END)
+            if size > PREFIX_BYTES:
+                f.seek(max(PREFIX_BYTES, size - SUFFIX_BYTES))
+                tail = f.read(SUFFIX_BYTES)
+
+    return head.decode("utf-8", errors="ignore"), tail.decode("utf-8", errors="ignore")
+
+
+def char_entropy(text: str) -> float:
+    if not text:
+        return 0.0
+    counts = Counter(text)
+    total = len(text)
+    return -sum((n / total) * math.log2(n / total) for n in counts.values())
+
+
+def text_stats(text: str) -> Dict[str, float]:
+    lines = text.splitlines() or [""]
+    identifiers = IDENTIFIER_RE.findall(text)
+    whitespace = sum(1 for c in text if c in " \t")
+
+    return {
+        "max_line": max(len(line) for line in lines),
+        "mean_line": len(text) / len(lines),
+        "whitespace_ratio": whitespace / len(text) if text else 0.0,
+        "mean_identifier": sum(map(len, identifiers)) / len(identifiers) if identifiers else 0.0,
+        "entropy": char_entropy(text),
+    }
+
+
+def classify_text(text: str, suffix: str = "") -> Optional[str]:
+    """
+    Returns why text looks minified, bundled or generated, or None.
+
+    Reasons: "source_map", "bundler_preamble", "generated_banner",
+    "long_lines", "low_whitespace", "high_entropy".
+    """
+    if SOURCE_MAP_RE.search(text) or SOURCE_MAP_RE.search(suffix):
+        return "source_map"
+
+    if PREAMBLE_RE.search(text):
+        return "bundler_preamble"
+
+    if BANNER_RE.search(text, 0, BANNER_BYTES):
+        return "generated_banner"
+
+    if len(text) < MIN_LINE_SAMPLE:
+        return None
+
+    stats = text_stats(text)
+    if stats["max_line"] >= LONG_LINE and stats["mean_line"] >= MEAN_LINE_LENGTH:
+        return "long_lines"
+    if stats["whitespace_ratio"] < MAX_WHITESPACE_RATIO and stats["mean_identifier"] < MAX_MEAN_IDENTIFIER:
+        return "low_whitespace"
+    if stats["entropy"] >= HIGH_ENTROPY:
+        return "high_entropy"
+
+    return None
+
+
+def classify_file(file_path: str | Path, repo_path: Optional[str | Path] = None) -> Optional[str]:
+    """
+    Returns the reason a JS/TS file should be treated as minified, bundled or
+    generated ("path" or one of the classify_text reasons), or None for
+    hand-written source. Other file types are never flagged.
+
+    Directory names are only checked below repo_path, when given.
+    """
+    file_path = Path(file_path)
+    if file_path.suffix.lower() not in JS_EXTENSIONS:
+        return None
+
+    reason = _path_reason(file_path, Path(repo_path) if repo_path is not None else None)
+    if reason:
+        return reason
+
+    try:
+        prefix, suffix = _read_bounded(file_path)
+    except OSError:
+        return None
+
+    return classify_text(prefix, suffix)
+
+
+def classify_source(file_path: str | PurePath, text: str) -> Optional[str]:
+    """
+    Same as classify_file for content already in memory (archive members).
+    """
+    file_path = PurePath(file_path)
+    if file_path.suffix.lower() not in JS_EXTENSIONS:
+        return None
+
+    return _path_reason(file_path) or classify_text(text[:PREFIX_BYTES], text[-SUFFIX_BYTES:])
+
+
+class GeneratedFileReport:
+    """
+    Counts of files flagged by classify_file in one run, by reason.
+    """
+
+    def __init__(self, policy: str = MINIFIED_POLICY):
+        self.policy = policy
+        self.by_reason: Counter = Counter()
+        self.files: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, file_path: str, reason: str, categories: Optional[List[str]] = None):
+        self.by_reason[reason] += 1
+        self.files[file_path] = {"reason": reason, "categories": categories or []}
+
+    def to_dict(self) -> dict:
+        return {
+            "policy": self.policy,
+            "total": len(self.files),
+            "by_reason": dict(self.by_reason),
+            "files": self.files,
+        }
@@ -0,0 +1,107 @@
+import json
+import os
+import queue
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional
+
+PARSER_SCRIPT = Path(__file__).resolve().parent / "jsParser.js"
+
+
+class ParserWorkerError(Exception):
+    """Raised when a parser worker dies or returns garbage."""
+    pass
+
+
+class JsParserWorker:
+    """
+    One long-lived `node jsParser.js --serve` process.
+
+    Requests and responses are JSON lines, so a parse costs one round trip
+    instead of a node startup plus swc load.
+    """
+
+    def __init__(self, script: Path = PARSER_SCRIPT):
+        self.script = script
+        self.process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self.process is not None and self.process.poll() is None:
+            return
+
+        self.process = subprocess.Popen(
+            ["node", str(self.script), "--serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+
+    def parse(self, file_path: str, code: Optional[str] = None) -> dict:
+        request = {"path": file_path}
+        if code is not None:
+            request["code"] = code
+
+        with self._lock:
+            self._ensure_started()
+            try:
+                self.process.stdin.write(json.dumps(request) + "\n")
+                self.process.stdin.flush()
+                line = self.process.stdout.readline()
+            except (BrokenPipeError, OSError) as e:
+                self.close()
+                raise ParserWorkerError(f"Parser worker failed on {file_path}: {e}")
+
+        if not line:
+            self.close()
+            raise ParserWorkerError(f"Parser worker exited while parsing {file_path}")
+
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ParserWorkerError(f"Invalid parser output for {file_path}: {e}")
+
+    def close(self):
+        if self.process is None:
+            return
+
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+        self.process = None
+
+
+class JsParserPool:
+    """
+    Fixed-size pool of JsParserWorker processes, safe to share between threads.
+    """
+
+    def __init__(self, size: Optional[int] = None):
+        self.size = size or min(4, os.cpu_count() or 1)
+        self._workers = [JsParserWorker() for _ in range(self.size)]
+        self._idle: queue.Queue[JsParserWorker] = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def parse(self, file_path: str, code: Optional[str] = None) -> dict:
+        worker = self._idle.get()
+        try:
+            return worker.parse(file_path, code)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        # Closed workers restart lazily, so a closed pool can still be used.
+        for worker in self._workers:
+            worker.close()
+
+    def __enter__(self) -> "JsParserPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
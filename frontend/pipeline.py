@@ -0,0 +1,331 @@
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Literal, Optional
+
+from backend.dependencyAnalyzer import write_dependency_cbom
+from backend.queries import clear_database, insert_ast, insert_file
+from frontend.astEncoder import encode_ast
+from frontend.astPruner import prune_ast_node
+from frontend.cryptoScoring import DEFAULT_THRESHOLD, RuleReport, score_source
+from frontend.fileDedup import StreamingDeduper, copy_cbom_to_member
+from frontend.minifiedDetector import MINIFIED_POLICY, GeneratedFileReport, classify_file
+from frontend.parserPool import JsParserPool
+from frontend.pyParser import parse_python_file
+from frontend.repoParser import clone_repo
+from frontend.scheduler import Budget, unanalyzed_entry
+from frontend.usageScanner import CRYPTO_PATTERNS, IGNORE_FOLDERS, KEEP_EXTENSIONS, PYTHON_EXTENSIONS
+
+TEMP_ROOT = Path(__file__).resolve().parent.parent / "results"
+
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_PARSE_WORKERS = 4
+DEFAULT_CBOM_WORKERS = 4
+
+_DONE = object()
+
+
+def _start_stage(
+    name: str,
+    func: Callable[[Dict[str, Any]], Iterable[Dict[str, Any]]],
+    inbox: queue.Queue,
+    outbox: queue.Queue,
+    workers: int,
+    failures: List[Dict[str, Any]],
+) -> List[threading.Thread]:
+    """
+    Runs func over items from inbox on `workers` threads, putting whatever it
+    yields on outbox. Both queues are bounded, so a slow stage blocks the
+    stages before it instead of letting work pile up in memory.
+
+    The last worker to finish forwards the end-of-stream marker.
+    """
+    remaining = [workers]
+    lock = threading.Lock()
+
+    def loop():
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                # Let sibling workers see the marker too.
+                inbox.put(_DONE)
+                break
+
+            try:
+                for result in func(item):
+                    outbox.put(result)
+            except Exception as e:
+                failures.append({"stage": name, "file_path": item.get("file_path"), "error": str(e)})
+
+        with lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                outbox.put(_DONE)
+
+    threads = [threading.Thread(target=loop, name=f"{name}-{i}", daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def iter_candidate_files(repo_path: Path) -> Iterable[Path]:
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d not in IGNORE_FOLDERS and d != ".git"]
+        for filename in files:
+            file_path = Path(root) / filename
+            if file_path.suffix.lower() in KEEP_EXTENSIONS:
+                yield file_path
+
+
+def run_streaming_pipeline(
+    github_url: str,
+    results_dir: Path = TEMP_ROOT,
+    mode: Literal["source", "ast"] = "source",
+    threshold: float = DEFAULT_THRESHOLD,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    parse_workers: int = DEFAULT_PARSE_WORKERS,
+    cbom_workers: int = DEFAULT_CBOM_WORKERS,
+    clear_db: bool = True,
+    dedupe: bool = True,
+    parser_pool: Optional[JsParserPool] = None,
+    model: str = "gpt-4.1",
+    minified_policy: str = MINIFIED_POLICY,
+    budget: Optional[Budget] = None,
+) -> Dict[str, Any]:
+    """
+    Clone -> scan -> parse -> prune -> CBOM with every stage running
+    concurrently over bounded queues, so files flow through one at a time.
+
+    CBOM results are appended to cbom_output.jsonl as they complete; the
+    JSON array in cbom_output.json is written from it at the end for
+    convert_cbom_output_to_iso. Nothing is deleted from the clone.
+
+    Files reach the CBOM stage in walk order, so budget (if any) only stops
+    LLM calls; files past it are written as unanalyzed entries.
+
+    Returns a summary with counts, failures and output paths.
+    """
+    from frontend.utils import cbom_error, generate_cbom_from_ast, read_source_file
+
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    if clear_db:
+        print("Clearing database...")
+        clear_database()
+
+    started = time.time()
+    repo_path, project_id = clone_repo(github_url)
+    print("Repo cloned at:", repo_path)
+
+    dependencies = write_dependency_cbom(repo_path, results_dir / "dependency_cbom.json")
+    print("Crypto dependency entries:", len(dependencies))
+
+    owns_pool = parser_pool is None
+    if owns_pool:
+        parser_pool = JsParserPool(parse_workers)
+
+    report = RuleReport(threshold)
+    generated = GeneratedFileReport(minified_policy)
+    matches_by_category: Dict[str, List[str]] = {category: [] for category in CRYPTO_PATTERNS}
+    python_usages: List[Dict[str, Any]] = []
+    failures: List[Dict[str, Any]] = []
+    deduper = StreamingDeduper() if dedupe else None
+    budget = budget or Budget()
+
+    scanned: queue.Queue = queue.Queue(maxsize=queue_size)
+    parsed: queue.Queue = queue.Queue(maxsize=queue_size)
+    pruned: queue.Queue = queue.Queue(maxsize=queue_size)
+    cboms: queue.Queue = queue.Queue(maxsize=queue_size)
+
+    def scan():
+        try:
+            for file_path in iter_candidate_files(repo_path):
+                reason = classify_file(file_path, repo_path) if minified_policy != "off" else None
+                if reason and minified_policy == "skip":
+                    generated.add(str(file_path), reason)
+                    continue
+
+                try:
+                    content = file_path.read_text(errors="ignore")
+                except Exception:
+                    continue
+
+                scored = score_source(content, file_path.suffix.lower(), threshold)
+                report.add(scored)
+                if reason:
+                    generated.add(str(file_path), reason, scored["categories"] if scored["admitted"] else [])
+                    continue
+                if not scored["admitted"]:
+                    continue
+
+                for category in scored["categories"]:
+                    matches_by_category[category].append(str(file_path))
+
+                scanned.put({
+                    "file_path": str(file_path),
+                    "categories": scored["categories"],
+                    "score": scored["score"],
+                    "fileId": insert_file(project_id, str(file_path)),
+                })
+        finally:
+            scanned.put(_DONE)
+
+    def parse(item):
+        if Path(item["file_path"]).suffix.lower() in PYTHON_EXTENSIONS:
+            _, ast_json, usages, error = parse_python_file(item["file_path"])
+            if error:
+                raise ValueError(error)
+            python_usages.extend(usages)
+            item["ast"] = json.loads(ast_json)
+        else:
+            item["ast"] = parser_pool.parse(item["file_path"])
+        yield item
+
+    def prune(item):
+        ast_json = item.pop("ast")
+        pruned_ast = prune_ast_node(ast_json) if ast_json.get("ok") else ast_json
+        if pruned_ast is None:
+            pruned_ast = ast_json
+
+        pruned_json = json.dumps(pruned_ast)
+        insert_ast(item["fileId"], pruned_json)
+        source = read_source_file(Path(item["file_path"]))
+        if mode == "ast":
+            item["pruned_ast"] = encode_ast(pruned_ast, source)
+        item["source"] = source
+
+        # Claimed here, in the single ordered prune worker, so a representative
+        # always reaches the CBOM stage before its members and the deduper can
+        # be sealed as soon as this stage ends.
+        if deduper and source:
+            item["duplicate_of"] = deduper.claim(item["file_path"], source)
+        yield item
+
+    def cbom(item):
+        path = item["file_path"]
+        source = item.pop("source")
+        if not source:
+            return
+
+        representative = item.get("duplicate_of")
+        if representative is not None:
+            copied = deduper.wait(representative)
+            if isinstance(copied, str):
+                # The representative was never analyzed; copied is the reason.
+                yield unanalyzed_entry(path, item["categories"], copied, item["score"])
+                return
+            yield {
+                "file_path": path,
+                "categories": item["categories"],
+                "cbom": copy_cbom_to_member(copied, path),
+                "duplicate_of": representative,
+            }
+            return
+
+        # Members are blocked on this file until it publishes, so publish on
+        # every way out, including budget exhaustion and LLM errors.
+        result, unanalyzed, published = None, None, "representative_failed"
+        try:
+            pruned_ast = item.pop("pruned_ast", None) if mode == "ast" else None
+            prompt = f"FILENAME: {path}\n AST:\n{pruned_ast}" if pruned_ast else f"FILENAME: {path}\n SOURCE: {source}"
+            if not budget.allows(prompt):
+                published = unanalyzed = budget.exhausted
+            else:
+                started = time.monotonic()
+                try:
+                    result = generate_cbom_from_ast(
+                        ast_json_str=prompt,
+                        model=model,
+                    )
+                finally:
+                    budget.record(prompt, result, time.monotonic() - started)
+                published = result
+                if cbom_error(result):
+                    failures.append({"stage": "cbom", "file_path": path, "error": cbom_error(result)})
+                    published = unanalyzed = "analysis_failed"
+        finally:
+            if deduper and "duplicate_of" in item:
+                deduper.publish(path, published)
+
+        if unanalyzed:
+            yield unanalyzed_entry(path, item["categories"], unanalyzed, item["score"])
+            return
+
+        yield {
+            "file_path": path,
+            "categories": item["categories"],
+            "cbom": result,
+        }
+
+    threads = [threading.Thread(target=scan, name="scan", daemon=True)]
+    threads += _start_stage("parse", parse, scanned, parsed, parse_workers, failures)
+    prune_threads = _start_stage("prune", prune, parsed, pruned, 1, failures)
+    threads += prune_threads
+    if deduper:
+        def seal():
+            for thread in prune_threads:
+                thread.join()
+            deduper.seal()
+
+        threads.append(threading.Thread(target=seal, name="seal", daemon=True))
+        threads[-1].start()
+    threads += _start_stage("cbom", cbom, pruned, cboms, cbom_workers, failures)
+    threads[0].start()
+
+    jsonl_path = results_dir / "cbom_output.jsonl"
+    written = 0
+    unanalyzed = 0
+    first_result_at = None
+
+    with jsonl_path.open("w", encoding="utf-8") as out:
+        while True:
+            result = cboms.get()
+            if result is _DONE:
+                break
+
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            if result.get("unanalyzed"):
+                unanalyzed += 1
+                continue
+            written += 1
+            if first_result_at is None:
+                first_result_at = time.time() - started
+                print(f"First CBOM result after {first_result_at:.1f}s: {result['file_path']}")
+
+    for thread in threads:
+        thread.join()
+    if owns_pool:
+        parser_pool.close()
+
+    # Build the JSON array convert_cbom_output_to_iso expects, line by line.
+    cbom_path = results_dir / "cbom_output.json"
+    with jsonl_path.open(encoding="utf-8") as src, cbom_path.open("w", encoding="utf-8") as dst:
+        dst.write("[")
+        for index, line in enumerate(src):
+            dst.write(("," if index else "") + "\n" + line.rstrip("\n"))
+        dst.write("\n]\n")
+
+    (results_dir / "matches.json").write_text(json.dumps(matches_by_category, indent=4), encoding="utf-8")
+    (results_dir / "python_cbom.json").write_text(json.dumps(python_usages, indent=4), encoding="utf-8")
+    (results_dir / "generated_files.json").write_text(json.dumps(generated.to_dict(), indent=4), encoding="utf-8")
+
+    summary = {
+        "project_id": project_id,
+        "repo_path": str(repo_path),
+        "files_analyzed": written,
+        "files_unanalyzed": unanalyzed,
+        "failures": failures,
+        "rule_report": report.to_dict(),
+        "generated_files": generated.to_dict()["by_reason"],
+        "budget": budget.to_dict(),
+        "first_result_seconds": first_result_at,
+        "total_seconds": time.time() - started,
+        "cbom_output": str(cbom_path),
+    }
+    print(f"Streaming pipeline complete: {written} CBOM results, {unanalyzed} unanalyzed, {len(failures)} failures in {summary['total_seconds']:.1f}s")
+    return summary
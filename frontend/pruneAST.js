@@ -1,13 +1,12 @@
 import { db } from "../db/client.js";
 
-const CRYPTO_PATTERNS = {
-  aes: ["\\baes\\b","aes-?\\d+","AESKey","AES\\.encrypt","AES\\.decrypt"],
-  rsa: ["\\brsa\\b","rsa-?\\d+","RSAPublicKey","RSAPrivateKey","RSAKey"],
-  signing: ["sign(ing)?","verify(ing)?","signature","digital[_ ]signature"],
-  cert: ["certificate","x\\.509","public[_ ]?key","private[_ ]?key","pem","der"],
-  hash: ["sha-?\\d+","hash","pbkdf2","scrypt","bcrypt","HMAC"],
-  keys: ["api[_ ]?key","secret","token"]
-};
+// Passed in by frontend/utils.py prune_ast from usageScanner.CRYPTO_PATTERNS,
+// so the batch pruner keeps the same categories as the Python scanner.
+if (!process.env.CRYPTO_PATTERNS) {
+  console.error("CRYPTO_PATTERNS is not set; run this through `python main.py prune`.");
+  process.exit(1);
+}
+const CRYPTO_PATTERNS = JSON.parse(process.env.CRYPTO_PATTERNS);
 
 const ALL_PATTERNS = new RegExp(
   Object.values(CRYPTO_PATTERNS).flat().join("|"),
@@ -24,6 +23,9 @@ function pruneAstNode(node) {
   const cloned = { ...node };
 
   for (const key in cloned) {
+    // Spans are kept for line numbers (astEncoder.py) but never decide a match.
+    if (key === "span") continue;
+
     if (Array.isArray(cloned[key])) {
       const prunedArray = cloned[key]
         .map(child => pruneAstNode(child))
@@ -52,10 +54,19 @@ function pruneAstNode(node) {
 function main() {
   console.log("Loading AST records from SQLite...");
 
-  const rows = db.prepare(`
-    SELECT astId, ast
-    FROM fileAST
-  `).all();
+  // Optional projectId argument restricts pruning to one project.
+  const projectId = process.argv[2];
+  const rows = projectId
+    ? db.prepare(`
+        SELECT fileAST.astId, fileAST.ast
+        FROM projectFile
+        JOIN fileAST ON fileAST.fileId = projectFile.fileId
+        WHERE projectFile.projectId = ?
+      `).all(projectId)
+    : db.prepare(`
+        SELECT astId, ast
+        FROM fileAST
+      `).all();
 
   let updated = 0;
   let skipped = 0;
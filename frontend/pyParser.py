@@ -0,0 +1,288 @@
+import ast
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+CRYPTO_MODULES = ("hashlib", "hmac", "ssl", "cryptography", "Crypto", "Cryptodome")
+
+# Dotted-path segments (lowercased) that name an algorithm.
+ALGORITHM_SEGMENTS = {
+    "md5": "MD5",
+    "sha1": "SHA-1",
+    "sha224": "SHA-224",
+    "sha256": "SHA-256",
+    "sha384": "SHA-384",
+    "sha512": "SHA-512",
+    "sha3_256": "SHA3-256",
+    "sha3_512": "SHA3-512",
+    "blake2b": "BLAKE2b",
+    "blake2s": "BLAKE2s",
+    "pbkdf2_hmac": "PBKDF2",
+    "pbkdf2hmac": "PBKDF2",
+    "scrypt": "scrypt",
+    "hmac": "HMAC",
+    "aes": "AES",
+    "aesgcm": "AES-GCM",
+    "chacha20poly1305": "ChaCha20-Poly1305",
+    "chacha20": "ChaCha20",
+    "des": "DES",
+    "des3": "3DES",
+    "tripledes": "3DES",
+    "arc4": "RC4",
+    "blowfish": "Blowfish",
+    "rsa": "RSA",
+    "dsa": "DSA",
+    # Which EC scheme a call uses comes from ec.ECDSA()/ec.ECDH() or the call (see _ec_scheme).
+    "ec": "EC",
+    "ecdsa": "ECDSA",
+    "ecdh": "ECDH",
+    "ecc": "ECC",
+    "ed25519": "Ed25519",
+    "ed448": "Ed448",
+    "x25519": "X25519",
+    "x448": "X448",
+    "dh": "DH",
+    "fernet": "Fernet (AES-128-CBC + HMAC-SHA256)",
+    "ssl": "TLS",
+    "x509": "X.509",
+}
+
+MODE_RE = re.compile(r"(?:MODE_|modes\.)(CBC|GCM|ECB|CTR|CFB|OFB|CCM|EAX|SIV|OCB|XTS)", re.IGNORECASE)
+HASH_NAME_RE = re.compile(r"^(md5|sha\d+|sha3_\d+|blake2[bs])$", re.IGNORECASE)
+
+FUNCTION_HINTS = [
+    ("keygen", ("generate", "generate_private_key", "generate_key", "generate_parameters")),
+    ("encrypt", ("encrypt", "encrypt_and_digest", "encryptor")),
+    ("decrypt", ("decrypt", "decrypt_and_verify", "decryptor")),
+    ("sign", ("sign", "signer")),
+    ("verify", ("verify", "verifier", "compare_digest")),
+    ("keyderive", ("pbkdf2_hmac", "scrypt", "derive", "exchange")),
+    ("digest", ("digest", "hexdigest", "update", "finalize") + tuple(
+        name for name in ALGORITHM_SEGMENTS if HASH_NAME_RE.match(name)
+    )),
+    ("tls", ("create_default_context", "SSLContext", "wrap_socket")),
+]
+
+
+def ast_to_json(node: Any) -> Any:
+    """
+    Converts a Python ast node into JSON-friendly dicts keyed like the swc
+    output ("type" per node). Only line numbers are kept from positions.
+    """
+    if isinstance(node, ast.AST):
+        result: Dict[str, Any] = {"type": type(node).__name__}
+        lineno = getattr(node, "lineno", None)
+        if lineno is not None:
+            result["line"] = lineno
+        for field, value in ast.iter_fields(node):
+            if value is None or value == []:
+                continue
+            result[field] = ast_to_json(value)
+        return result
+
+    if isinstance(node, list):
+        return [ast_to_json(item) for item in node]
+
+    if isinstance(node, (str, int, float, bool)) or node is None:
+        return node
+
+    return repr(node)
+
+
+def _dotted_name(node: ast.AST) -> Optional[str]:
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+class CryptoUsageVisitor(ast.NodeVisitor):
+    """
+    Collects calls into CRYPTO_MODULES, resolving import aliases.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.aliases: Dict[str, str] = {}
+        self.usages: List[Dict[str, Any]] = []
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            root = alias.name.split(".")[0]
+            if root not in CRYPTO_MODULES:
+                continue
+            if alias.asname:
+                self.aliases[alias.asname] = alias.name
+            else:
+                self.aliases[root] = root
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module and node.module.split(".")[0] in CRYPTO_MODULES:
+            for alias in node.names:
+                self.aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+
+    def resolve(self, dotted: str) -> Optional[str]:
+        head, _, rest = dotted.partition(".")
+        if head not in self.aliases:
+            return None
+        return f"{self.aliases[head]}.{rest}" if rest else self.aliases[head]
+
+    def visit_Call(self, node: ast.Call):
+        dotted = _dotted_name(node.func)
+        resolved = self.resolve(dotted) if dotted else None
+        if resolved:
+            self.usages.append(self._usage(node, resolved))
+        self.generic_visit(node)
+
+    def _usage(self, node: ast.Call, resolved: str) -> Dict[str, Any]:
+        segments = resolved.split(".")
+        call_text = ast.unparse(node)
+
+        algorithm = None
+        for segment in reversed(segments):
+            if segment.lower() in ALGORITHM_SEGMENTS:
+                algorithm = ALGORITHM_SEGMENTS[segment.lower()]
+                break
+
+        # hashlib.new("sha1"), pbkdf2_hmac("sha256", ...), hmac.new(key, msg, "sha256")
+        hash_names = [
+            arg.value for arg in list(node.args) + [kw.value for kw in node.keywords]
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str) and HASH_NAME_RE.match(arg.value)
+        ] + [
+            arg.attr for arg in list(node.args) + [kw.value for kw in node.keywords]
+            if isinstance(arg, ast.Attribute) and HASH_NAME_RE.match(arg.attr)
+        ]
+        if hash_names:
+            hash_algorithm = ALGORITHM_SEGMENTS.get(hash_names[0].lower(), hash_names[0].upper())
+            algorithm = f"{algorithm}-{hash_algorithm}" if algorithm in ("HMAC", "PBKDF2") else algorithm or hash_algorithm
+
+        if algorithm == "EC":
+            algorithm = _ec_scheme(node, segments[-1]) or algorithm
+
+        mode_match = MODE_RE.search(call_text)
+
+        key_size = None
+        for kw in node.keywords:
+            if kw.arg in ("key_size", "bits", "modulus_size") and isinstance(kw.value, ast.Constant):
+                key_size = kw.value.value
+        if key_size is None and algorithm in ("RSA", "DSA"):
+            # cryptography's rsa.generate_private_key(public_exponent, key_size);
+            # PyCryptodome's RSA/DSA.generate(bits, ...) and cryptography's
+            # dsa.generate_private_key(key_size) take the size first.
+            index = 1 if algorithm == "RSA" and segments[0] == "cryptography" else 0
+            if len(node.args) > index:
+                arg = node.args[index]
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, int):
+                    key_size = arg.value
+
+        function = None
+        for name, hints in FUNCTION_HINTS:
+            if segments[-1] in hints:
+                function = name
+                break
+        if function is None and segments[-1] == "new" and algorithm and HASH_NAME_RE.match(algorithm.replace("-", "")):
+            function = "digest"
+
+        return {
+            "file_name": self.file_path,
+            "line_number": node.lineno,
+            "api_call": call_text[:200],
+            "algorithm": algorithm,
+            "cryptographic_function": function,
+            "mode": mode_match.group(1).upper() if mode_match else None,
+            "key_size": key_size,
+            "purpose": None,
+            "multiple_uses": False,
+            "module": resolved,
+        }
+
+
+def _ec_scheme(node: ast.Call, method: str) -> Optional[str]:
+    """
+    ECDSA or ECDH for an `ec` call that says which: an ec.ECDSA(...) or
+    ec.ECDH() argument, or a sign/verify/exchange call. None otherwise
+    (key generation, curves), which stays the neutral "EC".
+    """
+    for arg in list(node.args) + [kw.value for kw in node.keywords]:
+        if isinstance(arg, ast.Call):
+            name = (_dotted_name(arg.func) or "").rpartition(".")[2]
+            if name in ("ECDSA", "ECDH"):
+                return name
+    if method in ("sign", "verify"):
+        return "ECDSA"
+    if method == "exchange":
+        return "ECDH"
+    return None
+
+
+def extract_crypto_usages(tree: ast.AST, file_path: str) -> List[Dict[str, Any]]:
+    visitor = CryptoUsageVisitor(file_path)
+    visitor.visit(tree)
+
+    for usage in visitor.usages:
+        usage["multiple_uses"] = len(visitor.usages) > 1
+
+    return visitor.usages
+
+
+def parse_python_file(file_path: str) -> Tuple[str, Optional[str], List[Dict[str, Any]], Optional[str]]:
+    """
+    Parses one file. Returns (file_path, ast_json_string, usages, error);
+    runs in worker processes so it only takes and returns picklable values.
+    """
+    try:
+        source = Path(file_path).read_text(encoding="utf-8", errors="ignore")
+    except OSError as e:
+        return file_path, None, [], str(e)
+
+    return parse_python_source(source, file_path)
+
+
+def parse_python_source(source: str, file_path: str) -> Tuple[str, Optional[str], List[Dict[str, Any]], Optional[str]]:
+    """
+    Same as parse_python_file for source that is not on disk (archive members).
+    """
+    try:
+        tree = ast.parse(source, filename=file_path)
+        ast_json = json.dumps({"ok": True, "language": "python", "ast": ast_to_json(tree)})
+        usages = extract_crypto_usages(tree, file_path)
+    except (SyntaxError, ValueError) as e:
+        return file_path, None, [], str(e)
+    except (RecursionError, MemoryError):
+        # Deeply nested (usually generated) code overflows the parser or the
+        # recursive walks; failing here would abort every other file in the
+        # same pool.map.
+        return file_path, None, [], "too deeply nested to parse"
+
+    return file_path, ast_json, usages, None
+
+
+def parse_python_files(
+    file_paths: Iterable[str],
+    max_workers: Optional[int] = None,
+) -> Iterator[Tuple[str, Optional[str], List[Dict[str, Any]], Optional[str]]]:
+    """
+    Parses files in a process pool, yielding parse_python_file results in
+    the order of file_paths.
+    """
+    file_paths = list(file_paths)
+    if not file_paths:
+        return
+
+    max_workers = max_workers or min(len(file_paths), os.cpu_count() or 1)
+    if max_workers <= 1:
+        for file_path in file_paths:
+            yield parse_python_file(file_path)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(file_paths) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        yield from pool.map(parse_python_file, file_paths, chunksize=chunksize)
@@ -36,12 +36,14 @@ def _build_temp_path(project_id: str):
     return path
 
 
-def clone_repo(repo_url: str) -> tuple[Path, str]:
+def clone_repo(repo_url: str, full_history: bool = False, timeout: int = 60) -> tuple[Path, str]:
     """
     Clones a public repository into a fresh UUID temp dir and returns its path.
 
     Parameters:
         repo_url (str): URL for cloning (https://..., http://..., or git@...)
+        full_history (bool): clone every commit instead of only HEAD
+        timeout (int): seconds before the clone is abandoned
 
     Returns:
         Path: location of the cloned repo
@@ -52,11 +54,12 @@ def clone_repo(repo_url: str) -> tuple[Path, str]:
     repo_path = working_dir / "repo"
 
     try:
+        depth = [] if full_history else ["--depth", "1"]
         result = subprocess.run(
-            ["git", "clone", "--depth", "1", repo_url, str(repo_path)],
+            ["git", "clone", *depth, repo_url, str(repo_path)],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            timeout=60,
+            timeout=timeout,
             text=True,
         )
 
@@ -71,6 +74,15 @@ def clone_repo(repo_url: str) -> tuple[Path, str]:
         raise RepoCloneError(str(e))
 
 
+def is_temp_clone(path: str | Path) -> bool:
+    """
+    True if path is inside a clone made by clone_repo, the only place the
+    destructive scan steps are allowed to delete files by default.
+    """
+    path, root = Path(path).resolve(), TEMP_ROOT.resolve()
+    return path != root and path.is_relative_to(root)
+
+
 def remove_repo_path(path: Path):
     if path.exists():
         shutil.rmtree(path, ignore_errors=True)
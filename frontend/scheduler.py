@@ -0,0 +1,200 @@
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from frontend.cryptoScoring import score_source
+
+# How much a category matters for post-quantum migration. Public-key
+# algorithms are broken outright by a quantum computer; symmetric ciphers and
+# hashes only lose margin.
+CATEGORY_SEVERITY = {
+    "rsa": 5.0,
+    "asymmetric": 5.0,
+    "signing": 4.0,
+    "cert": 4.0,
+    "jwt": 4.0,
+    "keys": 2.0,
+    "aes": 2.0,
+    "cipher": 2.0,
+    "hash": 1.5,
+}
+DEFAULT_SEVERITY = 1.0
+
+# Rough prompt size: about four characters per token for code.
+CHARS_PER_TOKEN = 4
+
+DEADLINE_SECONDS = float(os.getenv("CBOM_DEADLINE_SECONDS", "0")) or None
+MAX_TOKENS = int(os.getenv("CBOM_MAX_TOKENS", "0")) or None
+MAX_COST = float(os.getenv("CBOM_MAX_COST", "0")) or None
+COST_PER_1K_TOKENS = float(os.getenv("LLM_COST_PER_1K_TOKENS", "0"))
+
+
+def category_severity(categories: Iterable[str]) -> float:
+    """
+    The most severe category counts fully, each further one a quarter.
+    """
+    weights = sorted((CATEGORY_SEVERITY.get(c, DEFAULT_SEVERITY) for c in categories), reverse=True)
+    if not weights:
+        return 0.0
+    return weights[0] + 0.25 * sum(weights[1:])
+
+
+def file_priority(file_path: str | Path, categories: List[str]) -> float:
+    """
+    Crypto score density (score per log-size) times category severity, so a
+    small file dense with rsa/signing hits outranks a large one that only
+    mentions a token.
+    """
+    try:
+        content = Path(file_path).read_text(errors="ignore")
+    except Exception:
+        return 0.0
+
+    score = score_source(content, Path(file_path).suffix.lower())["score"]
+    density = score / math.log2(2 + len(content) / 1024)
+    return round(density * category_severity(categories), 3)
+
+
+def rank_groups(groups: List[List[str]], file_map: Dict[str, List[str]]) -> List[tuple]:
+    """
+    Returns (priority, group) pairs, highest priority first. A duplicate group
+    is as urgent as its most urgent member.
+    """
+    ranked = []
+    for group in groups:
+        priority = max(file_priority(member, file_map.get(member, [])) for member in group)
+        ranked.append((priority, group))
+
+    ranked.sort(key=lambda item: -item[0])
+    return ranked
+
+
+def estimate_tokens(prompt: str) -> int:
+    return len(prompt) // CHARS_PER_TOKEN + 1
+
+
+def _used_tokens(result: Any, prompt: str) -> int:
+    """
+    Tokens reported by the backend when it reports them, else an estimate.
+    """
+    if isinstance(result, dict):
+        usage = (result.get("raw") or {}).get("usage") or {}
+        if usage.get("total_tokens"):
+            return int(usage["total_tokens"])
+        return estimate_tokens(result.get("input") or prompt) + estimate_tokens(result.get("output") or "")
+    return estimate_tokens(prompt)
+
+
+class Budget:
+    """
+    Wall-clock deadline and token/cost limits for one CBOM run.
+
+    allows() is checked before each LLM call: it refuses a call that would
+    overrun the token or cost limit, or that would not finish before the
+    deadline given how long calls have taken so far. An allowed call reserves
+    its estimated tokens until record() settles it with the real count, so
+    concurrent workers cannot all pass the same check. Every allowed call
+    must be recorded. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        deadline_seconds: Optional[float] = DEADLINE_SECONDS,
+        max_tokens: Optional[int] = MAX_TOKENS,
+        max_cost: Optional[float] = MAX_COST,
+        cost_per_1k_tokens: float = COST_PER_1K_TOKENS,
+    ):
+        self.deadline_seconds = deadline_seconds
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+
+        self.started = time.monotonic()
+        self.tokens = 0
+        self.overhead_tokens = 0
+        self.reserved_tokens = 0
+        self.in_flight = 0
+        self.calls = 0
+        self.call_seconds = 0.0
+        self.exhausted: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def cost(self, tokens: Optional[int] = None) -> float:
+        return (self.tokens if tokens is None else tokens) / 1000 * self.cost_per_1k_tokens
+
+    def allows(self, prompt: str) -> bool:
+        """
+        Returns False (and records why in self.exhausted) if the call for
+        prompt should not be made.
+        """
+        with self._lock:
+            if self.exhausted:
+                return False
+
+            # Calls cost more than the file itself (instructions, output);
+            # add the average extra seen so far.
+            overhead = self.overhead_tokens / self.calls if self.calls else 0
+            expected = (
+                self.tokens
+                + self.reserved_tokens + self.in_flight * overhead
+                + estimate_tokens(prompt) + overhead
+            )
+
+            if self.max_tokens is not None and expected > self.max_tokens:
+                self.exhausted = "token_budget"
+            elif self.max_cost is not None and self.cost(expected) > self.max_cost:
+                self.exhausted = "cost_budget"
+            elif self.deadline_seconds is not None:
+                average_call = self.call_seconds / self.calls if self.calls else 0.0
+                if time.monotonic() - self.started + average_call > self.deadline_seconds:
+                    self.exhausted = "deadline"
+
+            if self.exhausted:
+                return False
+            self.reserved_tokens += estimate_tokens(prompt)
+            self.in_flight += 1
+            return True
+
+    def record(self, prompt: str, result: Any, seconds: float):
+        """
+        Settles the reservation allows() made for prompt with the tokens used.
+        """
+        with self._lock:
+            self.reserved_tokens -= estimate_tokens(prompt)
+            self.in_flight -= 1
+            used = _used_tokens(result, prompt)
+            self.tokens += used
+            self.overhead_tokens += max(0, used - estimate_tokens(prompt))
+            self.calls += 1
+            self.call_seconds += seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "deadline_seconds": self.deadline_seconds,
+            "max_tokens": self.max_tokens,
+            "max_cost": self.max_cost,
+            "elapsed_seconds": round(time.monotonic() - self.started, 2),
+            "calls": self.calls,
+            "tokens": self.tokens,
+            "cost": round(self.cost(), 4),
+            "exhausted": self.exhausted,
+        }
+
+
+def unanalyzed_entry(file_path: str, categories: List[str], reason: str, priority: Optional[float] = None) -> dict:
+    """
+    Output entry for a file the run did not analyze: no budget left, unreadable,
+    or a failed LLM call; reason says which.
+    """
+    entry = {
+        "file_path": file_path,
+        "categories": categories,
+        "cbom": None,
+        "unanalyzed": reason,
+    }
+    if priority is not None:
+        entry["priority"] = priority
+    return entry
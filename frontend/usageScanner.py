@@ -1,16 +1,24 @@
 import os
 import re
 from pathlib import Path
+from typing import Iterator
 import json
-import subprocess
 from backend.queries import insert_file, insert_ast
-
-KEEP_EXTENSIONS = {".js", ".jsx", ".ts", ".tsx"}
-IGNORE_FOLDERS = {"node_modules", "dist"}
+from frontend.cryptoScoring import DEFAULT_THRESHOLD, RuleReport, score_source
+from frontend.minifiedDetector import MINIFIED_POLICY, GeneratedFileReport, classify_file
+from frontend.pyParser import parse_python_files
+from frontend.parserPool import JsParserPool
+
+JS_EXTENSIONS = {".js", ".jsx", ".ts", ".tsx"}
+PYTHON_EXTENSIONS = {".py"}
+KEEP_EXTENSIONS = JS_EXTENSIONS | PYTHON_EXTENSIONS
+IGNORE_FOLDERS = {"node_modules", "dist", "__pycache__", ".venv", "venv", "site-packages"}
 IMPORT_RE = re.compile(
     r"""(?:import\s+(?:.+?\s+from\s+)?|require\()\s*['"](.+?)['"]""",
     re.MULTILINE
 )
+# Also handed to frontend/pruneAST.js (see utils.prune_ast), so keep the
+# patterns valid as JavaScript regexes.
 CRYPTO_PATTERNS = {
     "aes": [
         r"\baes\b",
@@ -47,16 +55,45 @@ CRYPTO_PATTERNS = {
         r"scrypt",
         r"bcrypt",
         r"HMAC",
+        r"CMAC",
     ],
     "keys": [
         r"api[_ ]?key",
         r"secret",
         r"token",
-    ]
+        r"generateKeyPair",
+    ],
+    # End-anchored so createCipheriv and publicEncrypt match but deciphered
+    # and encryptedFields do not.
+    "cipher": [
+        r"cipher(?:iv|s)?\b",
+        r"(?:en|de)crypt(?:ion)?\b",
+        r"3des|des-ede",
+        r"chacha(?:20)?\b",
+        r"poly1305",
+    ],
+    "asymmetric": [
+        r"ecdh",
+        r"ecdsa",
+        r"ed25519",
+        r"x25519",
+        r"secp\d+[kr]1",
+        r"\bdsa\b",
+        r"diffie-?hellman",
+    ],
+    "jwt": [
+        r"\bjwt\b",
+        r"\bjws\b",
+        r"jsonwebtoken",
+        r"\b[HREP]S(?:256|384|512)\b",
+    ],
 }
 
-def scan_and_filter_repo(repo_path: str | Path) -> dict:
+def scan_and_filter_repo(repo_path: str | Path, delete: bool = True) -> dict:
     """
+    Deletes every file the scanner does not keep. With delete=False nothing is
+    touched and "deleted" lists the files that would have been removed.
+
     Returns { kept: [...], deleted: [...] }
     """
     repo_path = Path(repo_path).resolve()
@@ -79,6 +116,8 @@ def scan_and_filter_repo(repo_path: str | Path) -> dict:
 
             if extension in KEEP_EXTENSIONS:
                 kept_files.append(str(file_path))
+            elif not delete:
+                deleted_files.append(str(file_path))
             else:
                 try:
                     file_path.unlink()
@@ -86,7 +125,8 @@ def scan_and_filter_repo(repo_path: str | Path) -> dict:
                 except Exception as e:
                     print(f"Warning: Failed to delete {file_path}: {e}")
 
-    delete_empty_dirs(repo_path, IGNORE_FOLDERS)
+    if delete:
+        delete_empty_dirs(repo_path, IGNORE_FOLDERS)
 
     return {
         "kept": kept_files,
@@ -116,15 +156,10 @@ def delete_empty_dirs(path: Path, ignore_folders: set[str]):
             except Exception as e:
                 print(f"Warning: Failed to remove empty directory {dir_path}: {e}")
 
-def resolve_imports_for_repo(repo_path: str | Path) -> dict:
+def iter_resolved_imports(repo_path: str | Path) -> Iterator[tuple[str, dict]]:
     """
-    Returns:
-    {
-        file_path: {
-            "merged_source": "<string>",
-            "dependencies": [file_paths...]
-        }
-    }
+    Yields (file_path, {"merged_source", "dependencies"}) one crypto file at
+    a time, so callers never hold every merged source in memory at once.
     """
     repo_path = Path(repo_path).resolve()
 
@@ -134,8 +169,6 @@ def resolve_imports_for_repo(repo_path: str | Path) -> dict:
         for pattern in patterns
     ]
 
-    augmented = {}
-
     for root, _, files in os.walk(repo_path):
         root_path = Path(root)
 
@@ -145,7 +178,7 @@ def resolve_imports_for_repo(repo_path: str | Path) -> dict:
         for filename in files:
             file_path = root_path / filename
 
-            if file_path.suffix.lower() not in KEEP_EXTENSIONS:
+            if file_path.suffix.lower() not in JS_EXTENSIONS:
                 continue
 
             if not file_matches_crypto(file_path, compiled_patterns):
@@ -175,12 +208,22 @@ def resolve_imports_for_repo(repo_path: str | Path) -> dict:
                 + original
             )
 
-            augmented[str(file_path)] = {
+            yield str(file_path), {
                 "merged_source": merged_source,
                 "dependencies": [str(p) for p in deps],
             }
 
-    return augmented
+def resolve_imports_for_repo(repo_path: str | Path) -> dict:
+    """
+    Returns:
+    {
+        file_path: {
+            "merged_source": "<string>",
+            "dependencies": [file_paths...]
+        }
+    }
+    """
+    return dict(iter_resolved_imports(repo_path))
 
 def resolve_local_dependency_closure(
     entry_file: Path,
@@ -241,16 +284,28 @@ def extract_local_imports(file_path: Path) -> list[Path]:
     return imports
 
 
-def trimmer(repo_path: str | Path, project_id: str) -> dict:
+def trimmer(
+    repo_path: str | Path,
+    project_id: str,
+    threshold: float = DEFAULT_THRESHOLD,
+    minified_policy: str = MINIFIED_POLICY,
+    delete: bool = True,
+) -> dict:
     """
-    Reads all .js/.jsx/.ts/.tsx files, matches against crypto regex patterns,
-    deletes non-matching files, and makes db record.
+    Reads all .js/.jsx/.ts/.tsx/.py files, scores them against weighted crypto rules,
+    deletes files scoring below threshold, and makes db record. With
+    delete=False the low scorers are only listed in removed_non_crypto_files.
+
+    Minified, bundled and generated JS is set aside according to
+    minified_policy (see minifiedDetector) and never kept for parsing.
 
     Returns:
         {
-            "kept_crypto_files": { file_path: { "categories": [...], "fileId": <uuid> } },
+            "kept_crypto_files": { file_path: { "categories": [...], "score": <float>, "fileId": <uuid> } },
             "removed_non_crypto_files": [...],
-            "matches_by_category": { category: [file_paths...] }
+            "matches_by_category": { category: [file_paths...] },
+            "rule_report": { ... see RuleReport.to_dict() ... },
+            "generated_files": { ... see GeneratedFileReport.to_dict() ... }
         }
     """
     repo_path = Path(repo_path).resolve()
@@ -259,15 +314,12 @@ def trimmer(repo_path: str | Path, project_id: str) -> dict:
     removed_files = []         # list of deleted files
     matches_by_category = {}   # category → [file_paths...]
 
+    report = RuleReport(threshold)
+    generated = GeneratedFileReport(minified_policy)
+
     for category in CRYPTO_PATTERNS.keys():
         matches_by_category[category] = []
 
-    compiled_patterns = [
-        (category, re.compile(pattern, flags=re.IGNORECASE))
-        for category, patterns in CRYPTO_PATTERNS.items()
-        for pattern in patterns
-    ]
-
     for root, _, files in os.walk(repo_path):
         root_path = Path(root)
 
@@ -280,26 +332,39 @@ def trimmer(repo_path: str | Path, project_id: str) -> dict:
             if file_path.suffix.lower() not in KEEP_EXTENSIONS:
                 continue
 
+            reason = classify_file(file_path, repo_path) if minified_policy != "off" else None
+            if reason and minified_policy == "skip":
+                generated.add(str(file_path), reason)
+                continue
+
             try:
                 content = file_path.read_text(errors="ignore")
             except Exception:
                 continue
 
-            matched_categories = [
-                category for category, regex in compiled_patterns if regex.search(content)
-            ]
+            scored = score_source(content, file_path.suffix.lower(), threshold)
+            report.add(scored)
+            matched_categories = scored["categories"]
 
-            if matched_categories:
+            if reason:
+                # Cheap path: regex evidence only, no AST or LLM.
+                generated.add(str(file_path), reason, matched_categories if scored["admitted"] else [])
+
+            elif scored["admitted"]:
                 file_id = insert_file(project_id, str(file_path))
 
                 kept_by_file[str(file_path)] = {
                     "categories": matched_categories,
+                    "score": scored["score"],
                     "fileId": file_id,
                 }
 
                 for category in matched_categories:
                     matches_by_category[category].append(str(file_path))
 
+            elif not delete:
+                removed_files.append(str(file_path))
+
             else:
                 try:
                     file_path.unlink()
@@ -307,18 +372,23 @@ def trimmer(repo_path: str | Path, project_id: str) -> dict:
                 except Exception as e:
                     print(f"Warning: Failed to delete {file_path}: {e}")
 
-    delete_empty_dirs(repo_path, IGNORE_FOLDERS)
+    if delete:
+        delete_empty_dirs(repo_path, IGNORE_FOLDERS)
 
     return {
         "kept_crypto_files": kept_by_file,
         "removed_non_crypto_files": removed_files,
         "matches_by_category": matches_by_category,
+        "rule_report": report.to_dict(),
+        "generated_files": generated.to_dict(),
     }
 
-def attach_asts_to_results(results_json_path: str | Path, kept_crypto_files: dict) -> dict:
+def attach_asts_to_results(results_json_path: str | Path, kept_crypto_files: dict, parser_pool: JsParserPool | None = None) -> dict:
     """
     Converts crypto file paths into ASTs and makes db record.
 
+    JS/TS files are parsed by parser_pool, or by a pool created for this call.
+
     kept_crypto_files format example:
     {
         "/path/to/file.ts": {
@@ -330,7 +400,8 @@ def attach_asts_to_results(results_json_path: str | Path, kept_crypto_files: dic
     Returns:
         {
             "files_annotated": <int>,
-            "failures": <list>
+            "failures": <list>,
+            "python_usages": <list of CBOM entries extracted from Python ASTs>
         }
     """
     results_path = Path(results_json_path).resolve()
@@ -343,10 +414,14 @@ def attach_asts_to_results(results_json_path: str | Path, kept_crypto_files: dic
             for fp in files:
                 file_paths.add(fp)
 
-    script = Path(__file__).resolve().parent / "jsParser.js"
+    owns_pool = parser_pool is None
+    if owns_pool:
+        parser_pool = JsParserPool()
 
     failures = []
     inserted_count = 0
+    js_files = []
+    python_files = []
 
     for file_path in file_paths:
         if file_path not in kept_crypto_files:
@@ -356,26 +431,50 @@ def attach_asts_to_results(results_json_path: str | Path, kept_crypto_files: dic
             })
             continue
 
-        fileId = kept_crypto_files[file_path]["fileId"]
+        if Path(file_path).suffix.lower() in PYTHON_EXTENSIONS:
+            python_files.append(file_path)
+        else:
+            js_files.append(file_path)
 
+    def parse_js(file_path: str):
         try:
-            output = subprocess.check_output(
-                ["node", str(script), file_path],
-                text=True
-            )
-            ast_json = json.loads(output)
+            return file_path, parser_pool.parse(file_path), None
+        except Exception as e:
+            return file_path, None, str(e)
 
-            insert_ast(fileId, json.dumps(ast_json))
+    from concurrent.futures import ThreadPoolExecutor
 
+    with ThreadPoolExecutor(max_workers=parser_pool.size) as executor:
+        for file_path, ast_json, error in executor.map(parse_js, js_files):
+            if error:
+                failures.append({
+                    "file_path": file_path,
+                    "error": error
+                })
+                continue
+
+            insert_ast(kept_crypto_files[file_path]["fileId"], json.dumps(ast_json))
             inserted_count += 1
 
-        except Exception as e:
+    if owns_pool:
+        parser_pool.close()
+
+    # Python files are parsed in-process (in a worker pool) instead of via node.
+    python_usages = []
+    for file_path, ast_json, usages, error in parse_python_files(python_files):
+        if error:
             failures.append({
                 "file_path": file_path,
-                "error": str(e)
+                "error": error
             })
+            continue
+
+        insert_ast(kept_crypto_files[file_path]["fileId"], ast_json)
+        python_usages.extend(usages)
+        inserted_count += 1
 
     return {
         "files_annotated": inserted_count,
         "failures": failures,
+        "python_usages": python_usages,
     }
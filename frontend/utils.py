@@ -2,90 +2,64 @@ import ast
 import json
 import gzip
 from pathlib import Path
-from backend.queries import get_project_asts, DB_PATH
+from backend.queries import iter_project_asts, DB_PATH
 from typing import List, Union, Optional, Literal, Dict, Any
-from openai import OpenAI
 import json
 import os
 import logging
 import time
-from dotenv import load_dotenv
 import os
 from backend.queries import clear_database
-from frontend.usageScanner import scan_and_filter_repo, trimmer, attach_asts_to_results, resolve_imports_for_repo
+from backend.dependencyAnalyzer import write_dependency_cbom
+from frontend.usageScanner import CRYPTO_PATTERNS, scan_and_filter_repo, trimmer, attach_asts_to_results
 from frontend.repoParser import clone_repo, remove_repo_path
+from frontend.llmBackend import get_backend
+from frontend.fileDedup import group_duplicate_files, copy_cbom_to_member
+from frontend.parserPool import JsParserPool
+from frontend.scheduler import Budget, rank_groups, unanalyzed_entry
+from frontend.astEncoder import encode_for_prompt
 import subprocess
 import re
 
-load_dotenv()
 
 DEFAULT_MODEL = "gpt-4.1-mini"
-
-SUPPORTED_MODELS = {
-    "gpt-4.1-mini": "chat.completions",
-    "gpt-4.1": "chat.completions",
-    "gpt-4.1-turbo": "chat.completions",
-    "o3-mini": "chat.completions",
-    "o3": "chat.completions",
-}
 TEMP_ROOT = Path(__file__).resolve().parent.parent / "results"
 
 def export_all_asts_to_json(project_id: str, output_path: str | Path) -> dict:
     """
-    Loads all fileAST rows from SQLite and writes a single JSON export file.
-
-    Also computes:
-      - total original size
-      - total pruned size
-      - % size saved
-      - gzipped size comparison
+    Streams all fileAST rows of a project from SQLite into a single JSON export
+    file, one row at a time, so memory does not grow with the project.
     """
-
-    rows = get_project_asts(project_id)
-
     output_path = Path(output_path).resolve()
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    export = {
-        "database": str(DB_PATH),
-        "total_files": len(rows),
-        "files": rows,
-    }
-
-    raw_json = json.dumps(export, indent=2)
-    output_path.write_text(raw_json, encoding="utf8")
+    total_files = 0
+    with output_path.open("w", encoding="utf8") as f:
+        f.write('{\n  "database": ' + json.dumps(str(DB_PATH)) + ',\n  "files": [')
+        for row in iter_project_asts(project_id):
+            f.write(("," if total_files else "") + "\n    " + json.dumps(list(row)))
+            total_files += 1
+        f.write('\n  ],\n  "total_files": ' + str(total_files) + "\n}\n")
 
     return {
-        "json_output": raw_json,
-        "total_files": len(rows),
+        "output_path": str(output_path),
+        "total_files": total_files,
     }
 
 # if __name__ == "__main__":
 #     export_all_asts_to_json("d487a961-e62e-4094-9caa-a4cb1a13a25d", "./results/pruned_project_asts.json")
 
-def _get_client() -> OpenAI:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("Missing OPENAI_API_KEY")
-    return OpenAI(api_key=api_key)
-
-
 def _run_chat_completion(
     model: str,
     prompt: str,
     response_mode: Literal["json", "text"],
 ) -> Union[str, Dict[str, Any]]:
-    client = _get_client()
+    backend = get_backend()
 
-    if model not in SUPPORTED_MODELS:
+    if not backend.supports(model):
         raise ValueError(f"Model {model} not supported")
 
-    completion = client.chat.completions.create(
-        model=model,
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    content = completion.choices[0].message.content or ""
+    content, raw = backend.complete(model, prompt)
 
     if response_mode == "text":
         return content
@@ -94,7 +68,7 @@ def _run_chat_completion(
         "model": model,
         "input": prompt,
         "output": content,
-        "raw": completion.to_dict()
+        "raw": raw
     }
 
 
@@ -110,15 +84,27 @@ def run_openai_query(
             response_mode=response_mode
         )
 
+# What the prompt tells the model it receives, by the marker callers put
+# after the FILENAME line: (description, what to call it afterwards).
+PROMPT_INPUTS = {
+    "AST": ("an AST in a compact text form (one statement per line, L<n> is the source line) of a source code file", "AST"),
+    "SOURCE": ("the source code of a file", "source code"),
+}
+PROMPT_MARKER_RE = re.compile(r"FILENAME: [^\n]*\n (AST|SOURCE):")
+
+
 def generate_cbom_from_ast(
     ast_json_str: str,
     model: str = DEFAULT_MODEL,
 ) -> Optional[Any]:
-    BASE_PROMPT = """
-    You will receive an AST in JSON format representing source code files with some type of cryptographic use.
-    Your task is to analyze the AST and generate a comprehensive Cryptographic Bill of Materials (CBOM) that details all cryptographic components found within the code.
+    marker = PROMPT_MARKER_RE.match(ast_json_str)
+    description, noun = PROMPT_INPUTS[marker.group(1) if marker else "AST"]
+
+    BASE_PROMPT = f"""
+    You will receive {description} with some type of cryptographic use.
+    Your task is to analyze the {noun} and generate a comprehensive Cryptographic Bill of Materials (CBOM) that details all cryptographic components found within the code.
     Please provide the CBOM in JSON format with the following structure:
-    {
+    {{
         file_name: <string> | null,
         line_number: <int> | null,
         api_call: <string> | null,
@@ -128,9 +114,9 @@ def generate_cbom_from_ast(
         key_size: <int> | null,
         purpose: <string> | null,
         multiple_uses: <boolean>
-    }
-    Ensure that each entry in the CBOM corresponds to a distinct cryptographic element identified in the AST.
-    Also note that there could be more than one use of cryptography in a single AST.
+    }}
+    Ensure that each entry in the CBOM corresponds to a distinct cryptographic element identified in the {noun}.
+    Also note that there could be more than one use of cryptography in a single file.
     If this is the case, simply pick the first one and set the flag "multiple_uses": true in the output.
     Here is a short description of each field:
     - file_name: The name of the source code file where the cryptographic element is located.
@@ -141,7 +127,7 @@ def generate_cbom_from_ast(
     - mode: The mode of operation for the algorithm (e.g., CBC, GCM, ECB, etc.), if applicable.
     - key_size: The size of the cryptographic key in bits (e.g., 128, 256), if applicable.
     - purpose: A brief description of the purpose of the cryptographic operation (e.g., data encryption, password hashing).
-    - multiple_uses: A boolean flag indicating whether multiple cryptographic uses were detected in the AST.
+    - multiple_uses: A boolean flag indicating whether multiple cryptographic uses were detected in the {noun}.
     Only provide the CBOM in json format.
     """
 
@@ -165,6 +151,17 @@ def generate_cbom_from_ast(
     # raise RuntimeError("Max retries exceeded")
     print("skipping after max retries")
 
+def cbom_error(result: Optional[Any]) -> Optional[str]:
+    """
+    Why a generate_cbom_from_ast result holds no CBOM: the error it returned,
+    or "retries exhausted" for None. None for a usable result.
+    """
+    if result is None:
+        return "retries exhausted"
+    if isinstance(result, dict) and result.get("error"):
+        return str(result["error"])
+    return None
+
 def read_json_file(file_path: str) -> Optional[Any]:
     """
     Reads a JSON file and returns the parsed data.
@@ -188,41 +185,65 @@ def read_json_file(file_path: str) -> Optional[Any]:
         logging.error(f"Unexpected error reading JSON file {file_path}: {e}")
     return None
 
-def parse_github_repo(github_url: str, out_path: str ) -> tuple[Dict[Any, Any], str, Path]:
-        print("Clearing database...")
-        clear_database()
+def parse_github_repo(
+    github_url: str,
+    out_path: str,
+    clear_db: bool = True,
+    results_dir: Path = TEMP_ROOT,
+    parser_pool: Optional[JsParserPool] = None,
+) -> tuple[Dict[Any, Any], str, Path]:
+        if clear_db:
+            print("Clearing database...")
+            clear_database()
         repo_path, project_id = clone_repo(github_url)
         print("Repo cloned at:", repo_path)
+
+        # Lockfiles are deleted by the scan below, so inventory dependencies first.
+        dependencies = write_dependency_cbom(repo_path, Path(results_dir) / "dependency_cbom.json")
+        print("Crypto dependency entries:", len(dependencies))
+
         result = scan_and_filter_repo(repo_path)
         print("Kept files after initial scan:", len(result["kept"]))
         print("Deleted files after initial scan:", result["deleted"])
 
-        print("Resolving imports...")
-        resolve_imports_for_repo(repo_path)
-
         print("Trimming non-crypto files...")
         trimRes = trimmer(repo_path, project_id)
         print("Kept files after trimming:", len(trimRes["kept_crypto_files"]))
         print("Deleted files after trimming:", len(trimRes["removed_non_crypto_files"]))
         print("Matches by category", trimRes["matches_by_category"])
+        print("Files admitted by rule", trimRes["rule_report"]["admitted_by_rule"])
+        print("Minified/generated files set aside:", trimRes["generated_files"]["by_reason"])
+
+        generated_path = Path(results_dir) / "generated_files.json"
+        generated_path.write_text(json.dumps(trimRes["generated_files"], indent=4), encoding="utf-8")
 
         with open(out_path, "w") as f:
             json.dump(trimRes["matches_by_category"], f, indent=4)
 
-        ast_output = attach_asts_to_results(out_path, trimRes["kept_crypto_files"])
+        ast_output = attach_asts_to_results(out_path, trimRes["kept_crypto_files"], parser_pool)
+
+        python_cbom_path = Path(results_dir) / "python_cbom.json"
+        python_cbom_path.write_text(json.dumps(ast_output["python_usages"], indent=4), encoding="utf-8")
+        print("Python crypto usages:", len(ast_output["python_usages"]))
+
         return (ast_output, project_id, repo_path)
 
-def prune_ast( project_id: str) -> Path:
-        pruner_script = Path(__file__).resolve().parent.parent / "frontend" / "pruneAst.js"
+def prune_ast( project_id: str, output_dir: Path = TEMP_ROOT) -> Path:
+        pruner_script = Path(__file__).resolve().parent.parent / "frontend" / "pruneAST.js"
 
         try:
-            pruned = subprocess.check_output(["node", str(pruner_script)], text=True)
+            pruned = subprocess.check_output(
+                ["node", str(pruner_script), project_id],
+                text=True,
+                env={**os.environ, "CRYPTO_PATTERNS": json.dumps(CRYPTO_PATTERNS)},
+            )
             print("Pruning complete:", pruned)
         except subprocess.CalledProcessError as e:
             print("Pruning failed:", e.stdout, e.stderr)
 
-        export_all_asts_to_json(project_id, f"{TEMP_ROOT}/pruned_project_asts.json")
-        return TEMP_ROOT / "pruned_project_asts.json"
+        output_path = Path(output_dir) / "pruned_project_asts.json"
+        export_all_asts_to_json(project_id, output_path)
+        return output_path
 
 def collect_unique_files(matches: Dict[str, List[str]]) -> Dict[str, List[str]]:
     """
@@ -246,91 +267,166 @@ def read_source_file(path: Path) -> str | None:
         return None
 
 
-def generate_cboms_from_matches(MATCHES_FILE: Path = TEMP_ROOT / "matches.json", OUTPUT_FILE: Path = TEMP_ROOT / "cbom_output.json"):
+def generate_cboms_from_matches(
+    MATCHES_FILE: Path = TEMP_ROOT / "matches.json",
+    OUTPUT_FILE: Path = TEMP_ROOT / "cbom_output.json",
+    dedupe: bool = True,
+    budget: Optional[Budget] = None,
+) -> dict:
+    """
+    Generates one CBOM per file (per duplicate group when dedupe is set),
+    most important files first (see scheduler.rank_groups).
+
+    When budget runs out, the remaining files are written as entries with
+    "cbom": null and "unanalyzed": <reason>, so the output is a partial CBOM
+    that says what it is missing. Files that cannot be read ("unreadable")
+    or whose LLM call fails ("analysis_failed") are recorded the same way.
+
+    Returns budget.to_dict() plus "analyzed" and "unanalyzed" counts.
+    """
     matches = read_json_file(str(MATCHES_FILE))
     if not matches:
         raise ValueError("matches.json is missing or empty")
 
     file_map = collect_unique_files(matches)
+    budget = budget or Budget()
 
     logging.info(f"Total unique files to process: {len(file_map)}")
 
-    results: List[Dict[str, Any]] = []
+    if dedupe:
+        groups = group_duplicate_files(file_map.keys())
+    else:
+        groups = [[file_path] for file_path in file_map]
 
-    for idx, (file_path, categories) in enumerate(file_map.items(), start=1):
-        path = Path(file_path)
+    logging.info(f"Duplicate grouping: {len(file_map)} files -> {len(groups)} LLM calls")
 
-        logging.info(f"[{idx}/{len(file_map)}] Processing {path}")
+    ranked = rank_groups(groups, file_map)
 
-        source = read_source_file(path)
-        if not source:
+    results: List[Dict[str, Any]] = []
+    unanalyzed = 0
+
+    for idx, (priority, group) in enumerate(ranked, start=1):
+        # The first readable member stands in for the group; unreadable
+        # members before it are reported rather than taking the group down.
+        source = None
+        while group:
+            source = read_source_file(Path(group[0]))
+            if source:
+                break
+            results.append(unanalyzed_entry(group[0], file_map[group[0]], "unreadable", priority))
+            unanalyzed += 1
+            group = group[1:]
+        if not group:
             continue
-        # print(source[:100000])
-        try:
-            cbom = generate_cbom_from_ast(
-                ast_json_str=f"FILENAME: {path}\n SOURCE: {source}",
-                model="gpt-4.1",
-            )
-        except Exception as e:
-            logging.error(f"CBOM generation failed for {path}: {e}")
+
+        path = Path(group[0])
+        prompt = f"FILENAME: {path}\n SOURCE: {source}"
+        if not budget.allows(prompt):
+            for member in group:
+                results.append(unanalyzed_entry(member, file_map[member], budget.exhausted, priority))
+            unanalyzed += len(group)
+            continue
+
+        logging.info(f"[{idx}/{len(ranked)}] Processing {path} (priority {priority}, {len(group) - 1} duplicates)")
+
+        started = time.monotonic()
+        cbom = generate_cbom_from_ast(
+            ast_json_str=prompt,
+            model="gpt-4.1",
+        )
+        budget.record(prompt, cbom, time.monotonic() - started)
+
+        error = cbom_error(cbom)
+        if error:
+            logging.error(f"CBOM generation failed for {path}: {error}")
+            for member in group:
+                results.append(unanalyzed_entry(member, file_map[member], "analysis_failed", priority))
+            unanalyzed += len(group)
             continue
 
         results.append({
             "file_path": str(path),
-            "categories": categories,
+            "categories": file_map[group[0]],
             "cbom": cbom,
         })
 
+        for member in group[1:]:
+            results.append({
+                "file_path": member,
+                "categories": file_map[member],
+                "cbom": copy_cbom_to_member(cbom, member),
+                "duplicate_of": str(path),
+            })
+
     OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
     OUTPUT_FILE.write_text(json.dumps(results, indent=2), encoding="utf-8")
 
+    summary = budget.to_dict()
+    summary.update(analyzed=len(results) - unanalyzed, unanalyzed=unanalyzed)
+    if budget.exhausted:
+        print(f"Budget exhausted ({budget.exhausted})")
+    if unanalyzed:
+        print(f"{unanalyzed} files left unanalyzed")
+
     logging.info(f"CBOM generation complete → {OUTPUT_FILE}")
+    return summary
+
+def generate_cboms_from_ast_files(out_ast_path: Path = TEMP_ROOT / "pruned_project_asts.json") -> dict:
+    """
+    Generates one CBOM per pruned AST in the export written by prune_ast.
 
-def generate_cboms_from_ast_files(out_ast_path: Path = TEMP_ROOT / "pruned_project_asts.json"):
+    ASTs are sent in the compact form from astEncoder (line numbers instead of
+    spans, no wrapper nodes) rather than as raw swc JSON.
+
+    Returns { "files": <int>, "raw_tokens": <int>, "compact_tokens": <int>,
+              "failures": [ { "file": <str>, "error": <str> } ] }
+    """
     print ("Generating CBOMs...")
     fileJson = read_json_file(str(out_ast_path))
     if fileJson is None:
         raise ValueError("Failed to read pruned AST JSON file.")
 
-    astJsonList = fileJson["files"]
-    flat = ["".join(sub) for sub in astJsonList]
     res = []
-    PATH_RE = re.compile(r"(/Users/abrahambrege/.*?\.js)")
-    for item in flat:
-        if not isinstance(item, str):
-            print("Skipping non-string AST item:", item)
+    totals = {"files": 0, "raw_tokens": 0, "compact_tokens": 0, "failures": []}
+
+    # Rows are [astId, ast, fileName] (see iter_project_asts).
+    for row in fileJson["files"]:
+        if not isinstance(row, list) or len(row) != 3:
+            print("Skipping malformed AST row:", str(row)[:80])
             continue
-        if isinstance(item, str):
-            if len(item) > 120000:
-                print("AST too large, using source code only...")
-                if not PATH_RE.search(item):
-                    print("Could not extract file path from AST, skipping...")
-                    continue
-                path_match = PATH_RE.search(item)
-                if path_match is None:
-                    print("Could not extract file path from AST, skipping...")
-                    continue
-                ast_json_str = read_source_file(Path(path_match.group(1)))
-                if ast_json_str is None:
-                    print("Could not read source file, skipping...")
-                    continue
-                cbom = generate_cbom_from_ast(
-                    ast_json_str=ast_json_str,
-                    model="gpt-4.1"
-                )
-                print("Generated CBOM from source file:", cbom)
-                res.append(cbom)
-                continue
-            cbom = generate_cbom_from_ast(
-                ast_json_str=item,
-                model="gpt-4.1"
-            )
-            print("Generated CBOM:", cbom)
-            res.append(cbom)
-    print("CBOM generation complete:", res)
+        _, ast_json_str, file_name = row
+
+        source = read_source_file(Path(file_name))
+        try:
+            compact, stats = encode_for_prompt(ast_json_str, source)
+        except Exception as e:
+            # One malformed AST must not abort the whole run.
+            print(f"Could not encode AST of {file_name}: {e!r}")
+            totals["failures"].append({"file": file_name, "error": repr(e)})
+            continue
+
+        totals["files"] += 1
+        totals["raw_tokens"] += stats["raw_tokens"]
+        totals["compact_tokens"] += stats["compact_tokens"]
+        print(f"{file_name}: {stats['raw_tokens']} -> {stats['compact_tokens']} tokens")
+
+        prompt = f"FILENAME: {file_name}\n AST:\n{compact}"
+        if len(compact) > 120000 and source is not None:
+            print("AST too large, using source code only...")
+            prompt = f"FILENAME: {file_name}\n SOURCE: {source}"
+
+        cbom = generate_cbom_from_ast(
+            ast_json_str=prompt,
+            model="gpt-4.1"
+        )
+        res.append(cbom)
+
+    print(f"CBOM generation complete: {totals['files']} files, AST tokens {totals['raw_tokens']} -> {totals['compact_tokens']}")
     with open(f"{TEMP_ROOT}/cbom_output.json", "w") as f:
         json.dump(res, f, indent=4)
 
+    return totals
+
 def remove_empty_entries(source_file_path: Path, output_file_path: Path):
     data = read_json_file(str(source_file_path))
     if data is None:
@@ -0,0 +1,562 @@
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import select
+import struct
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Literal, Optional, Set, Tuple
+
+from backend.filesystemAnalyzer import iter_filesystem
+from frontend.astEncoder import encode_ast
+from frontend.astPruner import prune_ast_node
+from frontend.cryptoScoring import DEFAULT_THRESHOLD, score_source
+from frontend.fileDedup import content_hash
+from frontend.minifiedDetector import MINIFIED_POLICY, classify_file
+from frontend.parserPool import JsParserPool, ParserWorkerError
+from frontend.pyParser import parse_python_file
+from frontend.usageScanner import IGNORE_FOLDERS, JS_EXTENSIONS, KEEP_EXTENSIONS, PYTHON_EXTENSIONS, extract_local_imports
+
+TEMP_ROOT = Path(__file__).resolve().parent.parent / "results"
+
+# A burst of saves (an editor writing a swap file, then the file; a branch
+# switch) is handled as one update once the tree has been quiet this long...
+DEBOUNCE_SECONDS = 0.1
+# ...or once the burst has lasted this long, so updates keep coming.
+MAX_BATCH_SECONDS = 0.5
+# Snapshot interval when inotify is unavailable.
+POLL_INTERVAL = 0.5
+
+WATCH_IGNORE = IGNORE_FOLDERS | {".git"}
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def snapshot(root: Path) -> Tuple[Dict[str, tuple], List[str]]:
+    """
+    Walks root with the filesystem inventory traversal.
+
+    Returns ({ file_path: (modified, size, inode) } for every source file the
+    scanner keeps, [directory paths]).
+    """
+    files: Dict[str, tuple] = {}
+    dirs: List[str] = []
+    for entry in iter_filesystem(str(root), ignore_dirs=WATCH_IGNORE):
+        if entry["type"] == "directory":
+            dirs.append(entry["path"])
+        elif entry["type"] == "file" and entry["extension"] in KEEP_EXTENSIONS:
+            files[entry["path"]] = (entry["timestamps"]["modified"], entry["size_bytes"], entry["filesystem"]["inode"])
+    return files, dirs
+
+
+def diff_snapshots(old: Dict[str, tuple], new: Dict[str, tuple]) -> Set[str]:
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+class PollingWatcher:
+    """
+    Finds changes by diffing stat snapshots, for filesystems and platforms
+    without inotify.
+    """
+
+    def __init__(self, root: Path, files: Dict[str, tuple], interval: float = POLL_INTERVAL):
+        self.root = root
+        self.files = files
+        self.interval = interval
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Returns the paths that changed, waiting up to timeout seconds (forever
+        if None) for the first change.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+
+            files, _ = snapshot(self.root)
+            changed = diff_snapshots(self.files, files)
+            self.files = files
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux inotify through libc, one watch per directory. New directories are
+    watched as they appear. If the kernel queue overflows, events were lost,
+    so the tree is diffed against a fresh snapshot instead. If the watch
+    limit is reached, it switches to a PollingWatcher.
+    """
+
+    def __init__(self, root: Path, files: Dict[str, tuple], dirs: Iterable[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.root = root
+        self.files = files
+        self.fallback: Optional[PollingWatcher] = None
+        self.dirs: Dict[int, str] = {}
+        for directory in dirs:
+            self._watch(directory)
+
+    def _watch(self, directory: str):
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.dirs[wd] = directory
+            return
+
+        error = ctypes.get_errno()
+        if error == errno.ENOSPC:
+            # fs.inotify.max_user_watches is exhausted; let the caller poll.
+            self.close()
+            raise OSError(error, "inotify watch limit reached")
+        # The directory went away before it could be watched.
+
+    def _read_events(self) -> Set[str]:
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+                offset += EVENT_HEADER.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    files, dirs = snapshot(self.root)
+                    changed |= diff_snapshots(self.files, files)
+                    self.files = files
+                    for directory in set(dirs) - set(self.dirs.values()):
+                        self._watch(directory)
+                    continue
+
+                directory = self.dirs.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO) and os.path.basename(path) not in WATCH_IGNORE:
+                        # Files can land in a new directory before it is
+                        # watched, so pick up whatever it already holds.
+                        files, dirs = snapshot(Path(path))
+                        changed |= files.keys()
+                        for new_dir in dirs:
+                            self._watch(new_dir)
+                    elif mask & (IN_DELETE | IN_MOVED_FROM):
+                        prefix = path + os.sep
+                        changed |= {f for f in self.files if f.startswith(prefix)}
+                    continue
+
+                if Path(path).suffix.lower() in KEEP_EXTENSIONS:
+                    changed.add(path)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """
+        Returns the paths that changed, waiting up to timeout seconds (forever
+        if None) for the first event.
+        """
+        if self.fallback is not None:
+            return self.fallback.wait(timeout)
+
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        try:
+            changed = self._read_events()
+        except OSError as e:
+            # A directory created mid-watch hit the watch limit: events for
+            # it would be lost, so poll from here on.
+            print(f"{e}; polling every {POLL_INTERVAL}s")
+            self.close()
+            files, _ = snapshot(self.root)
+            changed = diff_snapshots(self.files, files)
+            self.fallback = PollingWatcher(self.root, files)
+            return changed
+
+        for path in changed:
+            try:
+                st = os.stat(path)
+                self.files[path] = (st.st_mtime, st.st_size, st.st_ino)
+            except OSError:
+                self.files.pop(path, None)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_watcher(root: Path, files: Dict[str, tuple], dirs: List[str], poll: bool = False):
+    """
+    Returns an InotifyWatcher, or a PollingWatcher if poll is set or inotify
+    cannot be used here.
+    """
+    if not poll:
+        try:
+            return InotifyWatcher(root, dict(files), dirs)
+        except (OSError, AttributeError, TypeError) as e:
+            # No libc, or no inotify_* symbols in it (not Linux).
+            print(f"inotify unavailable ({e}); polling every {POLL_INTERVAL}s")
+    return PollingWatcher(root, dict(files))
+
+
+class ImportGraph:
+    """
+    Local JS/TS imports in both directions, so a change can be traced to
+    every file that imports the changed one, directly or not.
+    """
+
+    def __init__(self):
+        self.imports: Dict[str, Set[str]] = {}
+        self.importers: Dict[str, Set[str]] = {}
+
+    def update(self, path: str, imports: Iterable[str]):
+        self.remove(path)
+        self.imports[path] = set(imports)
+        for target in self.imports[path]:
+            self.importers.setdefault(target, set()).add(path)
+
+    def remove(self, path: str):
+        for target in self.imports.pop(path, ()):
+            importers = self.importers.get(target)
+            if importers:
+                importers.discard(path)
+
+    def importers_of(self, paths: Iterable[str]) -> Set[str]:
+        found: Set[str] = set()
+        pending = deque(paths)
+        while pending:
+            for importer in self.importers.get(pending.popleft(), ()):
+                if importer not in found:
+                    found.add(importer)
+                    pending.append(importer)
+        return found
+
+    def dependencies_of(self, path: str) -> Set[str]:
+        found: Set[str] = set()
+        pending = deque([path])
+        while pending:
+            for target in self.imports.get(pending.popleft(), ()):
+                if target not in found and target != path:
+                    found.add(target)
+                    pending.append(target)
+        return found
+
+
+class CbomCache:
+    """
+    LLM outputs keyed by a hash of the backend, model and prompt, appended to
+    a JSONL file so they survive restarts. Unchanged files, and importers
+    revisited only because a dependency changed, never reach the LLM twice.
+    Only the output text is kept, never the prompt.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, str] = {}
+        if path.exists():
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(entry.get("output"), str):
+                        self.entries[entry["key"]] = entry["output"]
+
+    @staticmethod
+    def key(backend: str, model: str, prompt: str) -> str:
+        # The backend is part of the key: offline "local" results must never
+        # be served to a run against a real model.
+        return content_hash(f"{backend}\n{model}\n{prompt}")
+
+    def get(self, key: str) -> Optional[str]:
+        return self.entries.get(key)
+
+    def put(self, key: str, output: str):
+        self.entries[key] = output
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "output": output}) + "\n")
+
+
+class WatchSession:
+    """
+    The current crypto findings for a working tree, updated one file at a
+    time. Nothing in the tree is modified or deleted.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        output_path: Path = TEMP_ROOT / "watch_findings.json",
+        mode: Literal["source", "ast"] = "source",
+        threshold: float = DEFAULT_THRESHOLD,
+        minified_policy: str = MINIFIED_POLICY,
+        model: str = "gpt-4.1",
+        cache_path: Path = TEMP_ROOT / "cbom_cache.jsonl",
+        parser_pool: Optional[JsParserPool] = None,
+    ):
+        self.root = Path(root).resolve()
+        self.output_path = Path(output_path)
+        self.mode = mode
+        self.threshold = threshold
+        self.minified_policy = minified_policy
+        self.model = model
+        self.cache = CbomCache(Path(cache_path))
+        self.graph = ImportGraph()
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.hashes: Dict[str, str] = {}
+        self.crypto_importers: Dict[str, List[str]] = {}
+        self.python_usages: Dict[str, List[Dict[str, Any]]] = {}
+        self.failures: Dict[str, str] = {}
+        self.stats = {"updates": 0, "files_analyzed": 0, "cbom_cache_hits": 0, "cbom_calls": 0}
+
+        self.owns_pool = parser_pool is None and mode == "ast"
+        self.parser_pool = JsParserPool() if self.owns_pool else parser_pool
+
+    def _prompt(self, path: str, source: str) -> str:
+        ast_json = None
+        if Path(path).suffix.lower() in PYTHON_EXTENSIONS:
+            _, ast_text, usages, error = parse_python_file(path)
+            if error:
+                raise ValueError(error)
+            self.python_usages[path] = usages
+            if self.mode == "ast":
+                ast_json = json.loads(ast_text)
+        elif self.mode == "ast":
+            ast_json = self.parser_pool.parse(path)
+
+        if ast_json is None:
+            return f"FILENAME: {path}\n SOURCE: {source}"
+
+        pruned = prune_ast_node(ast_json) if ast_json.get("ok") else ast_json
+        if pruned is None:
+            pruned = ast_json
+        return f"FILENAME: {path}\n AST:\n{encode_ast(pruned, source)}"
+
+    def _cbom(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns { "output": <LLM output> } (the part convert reads), or the
+        error dict generate_cbom_from_ast returned, or None.
+        """
+        from frontend.llmBackend import get_backend
+        from frontend.utils import generate_cbom_from_ast
+
+        key = CbomCache.key(get_backend().name, self.model, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats["cbom_cache_hits"] += 1
+            return {"output": cached}
+
+        self.stats["cbom_calls"] += 1
+        result = generate_cbom_from_ast(ast_json_str=prompt, model=self.model)
+        if not isinstance(result, dict) or not isinstance(result.get("output"), str):
+            return result
+        self.cache.put(key, result["output"])
+        return {"output": result["output"]}
+
+    def _forget(self, path: str):
+        self.records.pop(path, None)
+        self.crypto_importers.pop(path, None)
+        self.hashes.pop(path, None)
+        self.python_usages.pop(path, None)
+        self.failures.pop(path, None)
+
+    def analyze(self, path: str):
+        """
+        Re-runs matching, parsing and CBOM generation for one file, skipping
+        all of it if the content has not changed since the last run.
+        """
+        file_path = Path(path)
+        try:
+            source = file_path.read_text(encoding="utf-8", errors="ignore")
+        except OSError:
+            self.graph.remove(path)
+            self._forget(path)
+            return
+
+        digest = content_hash(source)
+        if self.hashes.get(path) == digest:
+            return
+        self._forget(path)
+        self.hashes[path] = digest
+        self.stats["files_analyzed"] += 1
+
+        suffix = file_path.suffix.lower()
+        if suffix in JS_EXTENSIONS:
+            self.graph.update(path, (str(p) for p in extract_local_imports(file_path)))
+
+        reason = classify_file(file_path, self.root) if self.minified_policy != "off" else None
+        if reason and self.minified_policy == "skip":
+            return
+
+        scored = score_source(source, suffix, self.threshold)
+        if not scored["admitted"]:
+            return
+
+        record = {
+            "file_path": path,
+            "categories": scored["categories"],
+            "score": scored["score"],
+            "crypto_dependencies": [],
+            "cbom": None,
+        }
+        self.records[path] = record
+        if reason:
+            # "regex" policy: reported from its rule matches, never sent to the LLM.
+            record["generated"] = reason
+            return
+        try:
+            record["cbom"] = self._cbom(self._prompt(path, source))
+        except (ParserWorkerError, ValueError) as e:
+            self.failures[path] = str(e)
+
+    def _link_dependencies(self, paths: Iterable[str]):
+        for path in paths:
+            dependencies = sorted(dep for dep in self.graph.dependencies_of(path) if dep in self.records)
+            record = self.records.get(path)
+            if record is not None:
+                record["crypto_dependencies"] = dependencies
+                self.crypto_importers.pop(path, None)
+            elif dependencies and path in self.hashes:
+                # No crypto of its own, but it reaches some through its imports.
+                self.crypto_importers[path] = dependencies
+            else:
+                self.crypto_importers.pop(path, None)
+
+    def scan(self, files: Iterable[str]):
+        """
+        Analyzes every file of the initial snapshot.
+        """
+        files = list(files)
+        for path in files:
+            self.analyze(path)
+        self._link_dependencies(files)
+
+    def update(self, changed: Set[str]) -> Set[str]:
+        """
+        Re-analyzes changed files, then refreshes the files that import them,
+        since their crypto dependencies may have changed with them.
+
+        Returns every file that was revisited.
+        """
+        for path in changed:
+            self.analyze(path)
+        affected = set(changed) | self.graph.importers_of(changed)
+        for path in affected - changed:
+            self.analyze(path)
+        self._link_dependencies(affected)
+        self.stats["updates"] += 1
+        return affected
+
+    def write_results(self):
+        """
+        Replaces output_path in one rename, so readers never see a partial file.
+        """
+        findings = {
+            "root": str(self.root),
+            "updated_at": time.time(),
+            "files": [self.records[path] for path in sorted(self.records)],
+            "crypto_importers": dict(sorted(self.crypto_importers.items())),
+            "python_usages": [usage for path in sorted(self.python_usages) for usage in self.python_usages[path]],
+            "failures": [{"file": path, "error": error} for path, error in sorted(self.failures.items())],
+            "stats": self.stats,
+        }
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.output_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(findings, indent=2), encoding="utf-8")
+        os.replace(temp_path, self.output_path)
+
+    def close(self):
+        if self.owns_pool:
+            self.parser_pool.close()
+
+
+def watch(
+    root: str | Path,
+    output_path: Path = TEMP_ROOT / "watch_findings.json",
+    mode: Literal["source", "ast"] = "source",
+    threshold: float = DEFAULT_THRESHOLD,
+    minified_policy: str = MINIFIED_POLICY,
+    once: bool = False,
+    poll: bool = False,
+) -> dict:
+    """
+    Scans a local working tree, then keeps output_path current as files are
+    saved: only the changed files and the files importing them are
+    re-analyzed, and CBOMs for unchanged prompts come from the cache. Runs
+    until interrupted, or returns after the initial scan if once is set.
+
+    Returns the session stats.
+    """
+    session = WatchSession(root, output_path, mode, threshold, minified_policy)
+    watcher = None
+    try:
+        started = time.monotonic()
+        files, dirs = snapshot(session.root)
+        session.scan(files)
+        session.write_results()
+        print(
+            f"Initial scan: {len(files)} files, {len(session.records)} with crypto "
+            f"in {time.monotonic() - started:.2f}s -> {session.output_path}"
+        )
+        if once:
+            return session.stats
+
+        watcher = open_watcher(session.root, files, dirs, poll)
+        print(f"Watching {session.root} (Ctrl-C to stop)")
+        while True:
+            changed = watcher.wait()
+            if not changed:
+                continue
+
+            burst_started = time.monotonic()
+            while time.monotonic() - burst_started < MAX_BATCH_SECONDS:
+                more = watcher.wait(DEBOUNCE_SECONDS)
+                if not more:
+                    break
+                changed |= more
+
+            started = time.monotonic()
+            affected = session.update(changed)
+            session.write_results()
+            print(
+                f"Updated {len(affected)} files ({len(changed)} changed), "
+                f"{len(session.records)} with crypto, in {time.monotonic() - started:.2f}s"
+            )
+    except KeyboardInterrupt:
+        print("Watch stopped")
+    finally:
+        if watcher is not None:
+            watcher.close()
+        session.close()
+
+    return session.stats
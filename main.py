@@ -1,26 +1,84 @@
+import argparse
 import json
-import subprocess
+import sys
+import time
 from pathlib import Path
-from frontend.utils import parse_github_repo, prune_ast, generate_cboms_from_ast_files, generate_cboms_from_matches, clone_repo, remove_empty_entries
-from convert import convert_cbom_output_to_iso
+
+# Stage modules are imported inside each command so that offline stages
+# (scan, fs-inventory) never load the LLM client or the rest of the pipeline.
+
 TEMP_ROOT = Path(__file__).resolve().parent / "results"
-print(TEMP_ROOT)
+STATE_PATH = TEMP_ROOT / "run_state.json"
 
 url = "https://github.com/juhoen/hybrid-crypto-js"
 url2 = "https://github.com/google/adk-js.git"
 out = f"{TEMP_ROOT}/matches.json"
 
-if __name__ == "__main__":
+
+def _budget(args):
+    from frontend.scheduler import Budget
+
+    # Unset flags fall back to the CBOM_* environment defaults.
+    defaults = Budget()
+    return Budget(
+        deadline_seconds=args.deadline or defaults.deadline_seconds,
+        max_tokens=args.max_tokens or defaults.max_tokens,
+        max_cost=args.max_cost or defaults.max_cost,
+    )
+
+
+def _add_budget_arguments(p):
+    p.add_argument("--deadline", type=float, help="stop LLM calls after this many seconds")
+    p.add_argument("--max-tokens", type=int, help="stop LLM calls before exceeding this many tokens")
+    p.add_argument("--max-cost", type=float, help="stop LLM calls before exceeding this cost (LLM_COST_PER_1K_TOKENS)")
+
+
+def load_state() -> dict:
+    """
+    Returns what earlier stages recorded (url, project_id, repo_path).
+    """
+    if not STATE_PATH.exists():
+        return {}
+    return json.loads(STATE_PATH.read_text())
+
+
+def save_state(**fields) -> dict:
+    state = load_state()
+    state.update({k: v for k, v in fields.items() if v is not None})
+
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    STATE_PATH.write_text(json.dumps(state, indent=2))
+    return state
+
+
+def _require(args, name: str) -> str:
+    value = getattr(args, name, None) or load_state().get(name)
+    if not value:
+        sys.exit(f"No {name} given and none recorded in {STATE_PATH}; run `clone` first or pass --{name.replace('_', '-')}")
+    return value
+
+
+def cmd_run(args):
+    if args.stream:
+        return cmd_stream(args)
+
+    from convert import convert_cbom_output_to_iso
+    from frontend.utils import parse_github_repo, prune_ast, generate_cboms_from_matches, remove_empty_entries
+
     repo_path = None
     try:
-        ast_output, project_id, repo_path = parse_github_repo(url, out)
+        ast_output, project_id, repo_path = parse_github_repo(args.url, out)
+        save_state(url=args.url, project_id=project_id, repo_path=str(repo_path))
         out_ast_path = prune_ast(project_id)
         # generate_cboms_from_ast_files(out_ast_path)
-        generate_cboms_from_matches()
+        generate_cboms_from_matches(budget=_budget(args))
 
         convert_cbom_output_to_iso(True)
         remove_empty_entries(Path(TEMP_ROOT) / "cbom_iso_output.json", Path(TEMP_ROOT) / "cbom_iso_output_cleaned.json")
 
+        from backend.findingsStore import record_scan_results
+        print("Findings recorded:", record_scan_results(args.url, TEMP_ROOT))
+
     except Exception as err:
         print("Error in main:", err)
 
@@ -28,3 +86,380 @@ if __name__ == "__main__":
         if not repo_path:
             exit()
         # remove_repo_path(repo_path.parent)
+
+
+def cmd_stream(args):
+    from backend.findingsStore import record_scan_results
+    from cbomWriter import write_cyclonedx_cbom
+    from convert import convert_cbom_output_to_iso
+    from frontend.pipeline import run_streaming_pipeline
+    from frontend.utils import remove_empty_entries
+
+    summary = run_streaming_pipeline(
+        args.url,
+        mode=args.mode,
+        queue_size=args.queue_size,
+        cbom_workers=args.cbom_workers,
+        budget=_budget(args),
+    )
+    save_state(url=args.url, project_id=summary["project_id"], repo_path=summary["repo_path"])
+
+    write_cyclonedx_cbom(TEMP_ROOT / "cbom_output.jsonl", project_name=args.url)
+    convert_cbom_output_to_iso(True)
+    remove_empty_entries(TEMP_ROOT / "cbom_iso_output.json", TEMP_ROOT / "cbom_iso_output_cleaned.json")
+    print("Findings recorded:", record_scan_results(args.url, TEMP_ROOT))
+
+
+def cmd_clone(args):
+    from frontend.repoParser import clone_repo
+
+    if args.clear_db:
+        from backend.queries import clear_database
+        clear_database()
+
+    repo_path, project_id = clone_repo(args.url)
+    save_state(url=args.url, project_id=project_id, repo_path=str(repo_path))
+    print("Repo cloned at:", repo_path)
+    print("Project:", project_id)
+
+
+def cmd_scan(args):
+    from backend.dependencyAnalyzer import write_dependency_cbom
+    from backend.queries import insert_project
+    from frontend.cryptoScoring import DEFAULT_THRESHOLD
+    from frontend.minifiedDetector import MINIFIED_POLICY
+    from frontend.repoParser import is_temp_clone
+    from frontend.usageScanner import scan_and_filter_repo, trimmer
+
+    repo_path = _require(args, "repo_path")
+    # Only clones made by `clone` are trimmed in place; anything else (a
+    # developer's checkout) is scanned without deleting files.
+    delete = not args.keep_files and (args.allow_delete or is_temp_clone(repo_path))
+    if not delete:
+        print("Scanning without deleting files (not a temporary clone; pass --allow-delete to trim it)")
+    project_id = args.project_id or load_state().get("project_id") or insert_project(repo_path)
+    save_state(repo_path=repo_path, project_id=project_id)
+
+    dependencies = write_dependency_cbom(repo_path, TEMP_ROOT / "dependency_cbom.json")
+    print("Crypto dependency entries:", len(dependencies))
+
+    result = scan_and_filter_repo(repo_path, delete)
+    print("Kept files after initial scan:", len(result["kept"]))
+
+    threshold = DEFAULT_THRESHOLD if args.threshold is None else args.threshold
+    trimRes = trimmer(repo_path, project_id, threshold, args.minified or MINIFIED_POLICY, delete)
+    print("Kept files after trimming:", len(trimRes["kept_crypto_files"]))
+    print("Deleted files after trimming:" if delete else "Non-crypto files (kept on disk):", len(trimRes["removed_non_crypto_files"]))
+    print("Files admitted by rule", trimRes["rule_report"]["admitted_by_rule"])
+    print("Minified/generated files set aside:", trimRes["generated_files"]["by_reason"])
+    (TEMP_ROOT / "generated_files.json").write_text(json.dumps(trimRes["generated_files"], indent=4), encoding="utf-8")
+
+    with open(args.matches, "w") as f:
+        json.dump(trimRes["matches_by_category"], f, indent=4)
+
+
+def cmd_parse(args):
+    from backend.queries import iter_project_files
+    from frontend.usageScanner import attach_asts_to_results
+
+    project_id = _require(args, "project_id")
+    kept = {file_name: {"fileId": file_id} for file_id, file_name in iter_project_files(project_id)}
+
+    ast_output = attach_asts_to_results(args.matches, kept)
+    print("ASTs stored:", ast_output["files_annotated"], "failures:", len(ast_output["failures"]))
+
+    (TEMP_ROOT / "python_cbom.json").write_text(json.dumps(ast_output["python_usages"], indent=4), encoding="utf-8")
+
+
+def cmd_prune(args):
+    from frontend.utils import prune_ast
+
+    print("Pruned ASTs exported to", prune_ast(_require(args, "project_id")))
+
+
+def cmd_cbom(args):
+    from frontend.utils import generate_cboms_from_ast_files, generate_cboms_from_matches
+
+    if args.mode == "ast":
+        totals = generate_cboms_from_ast_files()
+        if totals["failures"]:
+            print("AST encoding failures:", len(totals["failures"]))
+    else:
+        summary = generate_cboms_from_matches(Path(args.matches), dedupe=not args.no_dedupe, budget=_budget(args))
+        print("CBOM run:", summary)
+
+
+def cmd_convert(args):
+    if args.format == "cyclonedx":
+        from cbomWriter import write_cyclonedx_cbom
+
+        # `run --stream` writes .jsonl, the `cbom` stage writes .json; use the newer.
+        candidates = [p for p in (TEMP_ROOT / "cbom_output.jsonl", TEMP_ROOT / "cbom_output.json") if p.exists()]
+        if not candidates:
+            sys.exit("No CBOM output found; run `cbom` first")
+        source = max(candidates, key=lambda p: p.stat().st_mtime)
+        return write_cyclonedx_cbom(source, from_matches=args.mode == "source", project_name=load_state().get("url"))
+
+    from convert import convert_cbom_output_to_iso
+    from frontend.utils import remove_empty_entries
+
+    convert_cbom_output_to_iso(args.mode == "source")
+    if args.mode == "source":
+        remove_empty_entries(TEMP_ROOT / "cbom_iso_output.json", TEMP_ROOT / "cbom_iso_output_cleaned.json")
+
+
+def cmd_findings(args):
+    from backend import findingsStore
+
+    if args.action == "record":
+        project_key = args.project or _require(args, "url")
+        print("Findings recorded:", findingsStore.record_scan_results(project_key, Path(args.results_dir)))
+    elif args.action == "query":
+        if not args.algorithm:
+            sys.exit("query needs --algorithm")
+        for row in findingsStore.projects_using(args.algorithm, args.max_key_size):
+            print(*row, sep="\t")
+    elif args.action == "readiness":
+        for row in findingsStore.readiness_report():
+            print(*row[:3], sep="\t")
+    else:
+        for row in findingsStore.algorithm_summary():
+            print(*row, sep="\t")
+
+
+def cmd_archive(args):
+    from frontend.archiveScanner import scan_archive
+    from frontend.cryptoScoring import DEFAULT_THRESHOLD
+    from frontend.minifiedDetector import MINIFIED_POLICY
+    from frontend.parserPool import JsParserPool
+
+    threshold = DEFAULT_THRESHOLD if args.threshold is None else args.threshold
+    parser_pool = None if args.no_parse else JsParserPool()
+    try:
+        result = scan_archive(args.archive, threshold, args.minified or MINIFIED_POLICY, parser_pool)
+    finally:
+        if parser_pool:
+            parser_pool.close()
+    save_state(project_id=result["project_id"])
+
+    print("Project:", result["project_id"])
+    print("Files admitted by rule", result["rule_report"]["admitted_by_rule"])
+    if result["failures"]:
+        print("Parse failures:", len(result["failures"]))
+
+    # Member paths are not readable from disk, so these are kept apart from
+    # matches.json; run `prune` and `cbom --mode ast` on the stored ASTs.
+    with open(args.output, "w") as f:
+        json.dump(result["matches_by_category"], f, indent=4)
+    (TEMP_ROOT / "python_cbom.json").write_text(json.dumps(result["python_usages"], indent=4), encoding="utf-8")
+    (TEMP_ROOT / "generated_files.json").write_text(json.dumps(result["generated_files"], indent=4), encoding="utf-8")
+
+
+def cmd_history(args):
+    from frontend.historyScanner import scan_history
+
+    if args.repo_path:
+        repo_path = Path(args.repo_path)
+    else:
+        from frontend.repoParser import clone_repo
+
+        repo_path, project_id = clone_repo(args.url, full_history=True, timeout=args.timeout)
+        save_state(url=args.url, project_id=project_id, repo_path=str(repo_path))
+
+    history = scan_history(repo_path, rev=args.rev, max_commits=args.max_commits)
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(history, f, indent=2)
+    print(f"{len(history['timeline'])} changes in crypto usage written to {args.output}")
+
+
+def cmd_network(args):
+    from backend.findingsStore import record_result_file
+    from backend.networkAnalyzer import write_network_cbom
+
+    summary = write_network_cbom(args.captures, args.output, args.summary)
+    stats = summary["stats"]
+    print(
+        f"Network scan complete: {stats.get('packets', 0)} packets, {stats.get('client_hellos', 0)} ClientHellos, "
+        f"{stats.get('server_hellos', 0)} ServerHellos ({stats.get('server_hellos_pqc', 0)} post-quantum)"
+    )
+    print("Negotiated groups:", summary["negotiated"]["groups"])
+
+    project_key = args.project or "network:" + ",".join(str(Path(c).resolve()) for c in args.captures)
+    print("Findings recorded:", record_result_file(project_key, args.output, "network"), "under", project_key)
+
+
+def cmd_fs_inventory(args):
+    from backend.filesystemAnalyzer import write_inventory
+
+    summary = write_inventory(args.root, args.output, scan_binaries=args.binaries, max_workers=args.workers)
+    print(f"Scan complete: {summary['entries']} entries")
+    if args.binaries:
+        print(f"Binaries with crypto constants: {summary['binaries_with_crypto']}")
+
+
+def cmd_binaries(args):
+    from backend.binaryAnalyzer import write_binary_cbom
+    from backend.findingsStore import record_result_file
+
+    start = time.time()
+    counts = write_binary_cbom(args.roots, args.output, args.workers)
+    print(
+        f"Binary scan complete: {counts['files']} files, {counts['files_with_crypto']} with crypto constants "
+        f"in {time.time() - start:.1f}s"
+    )
+
+    project_key = args.project or "binaries:" + ",".join(str(Path(r).resolve()) for r in args.roots)
+    print("Findings recorded:", record_result_file(project_key, args.output, "binary"), "under", project_key)
+
+
+def cmd_watch(args):
+    from frontend.cryptoScoring import DEFAULT_THRESHOLD
+    from frontend.minifiedDetector import MINIFIED_POLICY
+    from frontend.watcher import watch
+
+    watch(
+        args.root,
+        Path(args.output),
+        mode=args.mode,
+        threshold=DEFAULT_THRESHOLD if args.threshold is None else args.threshold,
+        minified_policy=args.minified or MINIFIED_POLICY,
+        once=args.once,
+        poll=args.poll,
+    )
+
+
+def cmd_serve(args):
+    from daemon import serve
+
+    serve(host=args.host, port=args.port, socket_path=args.socket, concurrency=args.concurrency)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Cryptographic inventory of source repositories.")
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("run", help="run the whole pipeline on a repository")
+    p.add_argument("url", nargs="?", default=url)
+    p.add_argument("--stream", action="store_true", help="run the stages concurrently over bounded queues")
+    p.add_argument("--mode", choices=["source", "ast"], default="source", help="CBOM prompt input (with --stream)")
+    p.add_argument("--queue-size", type=int, default=32)
+    p.add_argument("--cbom-workers", type=int, default=4)
+    _add_budget_arguments(p)
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("clone", help="clone a repository and register the project")
+    p.add_argument("url")
+    p.add_argument("--clear-db", action="store_true", help="delete all earlier projects first")
+    p.set_defaults(func=cmd_clone)
+
+    p = sub.add_parser("scan", help="regex scan: delete non-crypto files and record matches (no LLM)")
+    p.add_argument("--repo-path")
+    p.add_argument("--project-id")
+    p.add_argument("--threshold", type=float, default=None, help="minimum crypto score to keep a file")
+    p.add_argument("--minified", choices=["skip", "regex", "off"], default=None, help="what to do with minified/bundled JS")
+    p.add_argument("--matches", default=out)
+    p.add_argument("--keep-files", action="store_true", help="never delete files, even in a temporary clone")
+    p.add_argument("--allow-delete", action="store_true", help="delete non-crypto files even outside a temporary clone")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("parse", help="parse matched files into ASTs stored in the database")
+    p.add_argument("--project-id")
+    p.add_argument("--matches", default=out)
+    p.set_defaults(func=cmd_parse)
+
+    p = sub.add_parser("prune", help="prune stored ASTs and export them")
+    p.add_argument("--project-id")
+    p.set_defaults(func=cmd_prune)
+
+    p = sub.add_parser("cbom", help="generate CBOMs with the LLM backend")
+    p.add_argument("--mode", choices=["source", "ast"], default="source")
+    p.add_argument("--matches", default=out)
+    p.add_argument("--no-dedupe", action="store_true")
+    _add_budget_arguments(p)
+    p.set_defaults(func=cmd_cbom)
+
+    p = sub.add_parser("convert", help="extract CBOM objects from LLM output")
+    p.add_argument("--mode", choices=["source", "ast"], default="source")
+    p.add_argument("--format", choices=["flat", "cyclonedx"], default="flat", help="flat list or a CycloneDX 1.6 CBOM")
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("findings", help="record or query findings kept across projects")
+    p.add_argument("action", choices=["record", "summary", "query", "readiness"], nargs="?", default="summary")
+    p.add_argument("--project", help="project key to record under (defaults to the cloned URL)")
+    p.add_argument("--results-dir", default=str(TEMP_ROOT))
+    p.add_argument("--algorithm", help="e.g. RSA, SHA-1")
+    p.add_argument("--max-key-size", type=int)
+    p.set_defaults(func=cmd_findings)
+
+    p = sub.add_parser("archive", help="scan an npm tarball, source zip or image tar without extracting it")
+    p.add_argument("archive")
+    p.add_argument("--threshold", type=float, default=None, help="minimum crypto score to keep a file")
+    p.add_argument("--minified", choices=["skip", "regex", "off"], default=None, help="what to do with minified/bundled JS")
+    p.add_argument("--no-parse", action="store_true", help="score members only, store no ASTs")
+    p.add_argument("--output", default=str(TEMP_ROOT / "archive_matches.json"))
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser("history", help="find when crypto usages were introduced and removed across git history")
+    p.add_argument("url", nargs="?", default=url)
+    p.add_argument("--repo-path", help="scan an existing clone instead of cloning url")
+    p.add_argument("--rev", default="HEAD")
+    p.add_argument("--max-commits", type=int, help="only the newest this many commits")
+    p.add_argument("--timeout", type=int, default=600, help="seconds allowed for the full clone")
+    p.add_argument("--output", default=str(TEMP_ROOT / "history_timeline.json"))
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("network", help="inventory TLS versions, cipher suites and groups in pcap/pcapng captures")
+    p.add_argument("captures", nargs="+")
+    p.add_argument("--output", default=str(TEMP_ROOT / "network_cbom.json"))
+    p.add_argument("--summary", default=str(TEMP_ROOT / "network_summary.json"))
+    p.add_argument("--project", help="project key to record findings under (default: the capture paths)")
+    p.set_defaults(func=cmd_network)
+
+    p = sub.add_parser("binaries", help="find crypto constant tables in native binaries and wasm")
+    p.add_argument("roots", nargs="*", default=["."])
+    p.add_argument("--output", default=str(TEMP_ROOT / "binary_cbom.json"))
+    p.add_argument("--workers", type=int, help="scanner processes (default: one per CPU)")
+    p.add_argument("--project", help="project key to record findings under (default: the scanned roots)")
+    p.set_defaults(func=cmd_binaries)
+
+    p = sub.add_parser("fs-inventory", help="inventory file metadata under a directory")
+    p.add_argument("root", nargs="?", default=".")
+    p.add_argument("--output", default=str(TEMP_ROOT / "filesystem_inventory.json"))
+    p.add_argument("--binaries", action="store_true", help="also scan binaries for crypto constant tables")
+    p.add_argument("--workers", type=int, help="scanner processes for --binaries (default: one per CPU)")
+    p.set_defaults(func=cmd_fs_inventory)
+
+    p = sub.add_parser("watch", help="keep crypto findings for a local working tree current as files change")
+    p.add_argument("root", nargs="?", default=".")
+    p.add_argument("--mode", choices=["source", "ast"], default="source", help="CBOM prompt input")
+    p.add_argument("--threshold", type=float, default=None, help="minimum crypto score to keep a file")
+    p.add_argument("--minified", choices=["skip", "regex", "off"], default=None, help="what to do with minified/bundled JS")
+    p.add_argument("--once", action="store_true", help="scan once and exit (pre-commit hooks)")
+    p.add_argument("--poll", action="store_true", help="diff stat snapshots instead of using inotify")
+    p.add_argument("--output", default=str(TEMP_ROOT / "watch_findings.json"))
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("serve", help="run the scan daemon")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--socket", help="listen on a Unix socket instead of TCP")
+    p.add_argument("--concurrency", type=int, default=2)
+    p.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # No subcommand keeps the old behaviour of running the full pipeline.
+    if args.command is None:
+        args = build_parser().parse_args(["run"])
+
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import pytest
+
+from cbomWriter import QUANTUM_VULNERABLE, normalize_algorithm
+
+
+@pytest.mark.parametrize("algorithm", ["PBKDF2-HMAC-SHA256", "PBKDF2WithHmacSHA256"])
+def test_pbkdf2_with_hmac_is_a_kdf(algorithm):
+    normalized = normalize_algorithm({"algorithm": algorithm})
+
+    assert (normalized["family"], normalized["primitive"]) == ("PBKDF2", "kdf")
+
+
+def test_hmac_alone_is_a_mac():
+    assert normalize_algorithm({"algorithm": "HMAC-SHA256"})["primitive"] == "mac"
+
+
+def test_eddsa_is_a_quantum_vulnerable_signature():
+    normalized = normalize_algorithm({"algorithm": "EdDSA"})
+
+    assert normalized["primitive"] == "signature"
+    assert normalized["family"] in QUANTUM_VULNERABLE
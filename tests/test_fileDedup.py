@@ -0,0 +1,37 @@
+from frontend.fileDedup import StreamingDeduper, group_duplicate_files
+
+ENCRYPT_PAYLOAD = """const crypto = require('crypto');
+
+function encryptPayload(payload, key) {
+  const iv = crypto.randomBytes(12);
+  const cipher = crypto.createCipheriv("ALGORITHM", key, iv);
+  const encrypted = Buffer.concat([cipher.update(JSON.stringify(payload), 'utf8'), cipher.final()]);
+  return { iv: iv.toString('base64'), data: encrypted.toString('base64') };
+}
+
+module.exports = { encryptPayload };
+"""
+
+
+def write_module(directory, name, algorithm, header=""):
+    path = directory / name
+    path.write_text(header + ENCRYPT_PAYLOAD.replace("ALGORITHM", algorithm))
+    return str(path)
+
+
+def test_modules_differing_only_in_algorithm_are_not_grouped(tmp_path):
+    aes = write_module(tmp_path, "a.js", "aes-256-gcm")
+    des = write_module(tmp_path, "b.js", "des-ede3-cbc")
+
+    assert sorted(group_duplicate_files([aes, des])) == [[aes], [des]]
+
+    deduper = StreamingDeduper()
+    assert deduper.claim(aes, ENCRYPT_PAYLOAD.replace("ALGORITHM", "aes-256-gcm")) is None
+    assert deduper.claim(des, ENCRYPT_PAYLOAD.replace("ALGORITHM", "des-ede3-cbc")) is None
+
+
+def test_near_duplicates_with_the_same_algorithm_are_grouped(tmp_path):
+    source = write_module(tmp_path, "a.js", "aes-256-gcm")
+    built = write_module(tmp_path, "b.js", "aes-256-gcm", header='"use strict";\n// built copy\n')
+
+    assert group_duplicate_files([source, built]) == [[source, built]]
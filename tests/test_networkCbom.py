@@ -0,0 +1,98 @@
+import struct
+
+from backend.networkAnalyzer import TlsInventory, cbom_rows
+from cbomWriter import QUANTUM_VULNERABLE, normalize_algorithm
+
+CLIENT = bytes([10, 0, 0, 2])
+TLS12_SERVER = bytes([192, 0, 2, 10])
+TLS13_SERVER = bytes([192, 0, 2, 13])
+
+X448 = 30
+ED448 = 0x0808
+ECDHE_ECDSA_AES_256_GCM = 0xC02C
+AES_256_GCM_SHA384 = 0x1302
+
+
+def u16(value):
+    return struct.pack(">H", value)
+
+
+def extension(ext_type, data):
+    return u16(ext_type) + u16(len(data)) + data
+
+
+def handshake(msg_type, body):
+    return bytes([msg_type]) + len(body).to_bytes(3, "big") + body
+
+
+def tls_record(*messages):
+    payload = b"".join(messages)
+    return bytes([22, 3, 3]) + u16(len(payload)) + payload
+
+
+def client_hello():
+    extensions = extension(10, u16(2) + u16(X448)) + extension(13, u16(2) + u16(ED448))
+    body = u16(0x0303) + bytes(32) + b"\x00" + u16(2) + u16(ECDHE_ECDSA_AES_256_GCM) + b"\x01\x00"
+    return handshake(1, body + u16(len(extensions)) + extensions)
+
+
+def server_hello(suite, extensions=b""):
+    body = u16(0x0303) + bytes(32) + b"\x00" + u16(suite) + b"\x00"
+    return handshake(2, body + u16(len(extensions)) + extensions)
+
+
+def server_key_exchange(group, signature):
+    public_key = bytes(56)
+    body = b"\x03" + u16(group) + bytes([len(public_key)]) + public_key + u16(signature) + u16(4) + bytes(4)
+    return handshake(12, body)
+
+
+def ethernet_frame(src, sport, dst, dport, payload):
+    tcp = struct.pack(">HHIIBBHHH", sport, dport, 1000, 0, 0x50, 0x18, 65535, 0, 0)
+    total = 20 + len(tcp) + len(payload)
+    ip = struct.pack(">BBHHHBBH4s4s", 0x45, 0, total, 0, 0, 64, 6, 0, src, dst)
+    return bytes(6) + bytes(6) + u16(0x0800) + ip + tcp + payload
+
+
+def write_pcap(path, frames):
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+        for frame in frames:
+            f.write(struct.pack("<IIII", 0, 0, len(frame), len(frame)))
+            f.write(frame)
+
+
+def test_x448_and_ed448_from_a_capture_are_quantum_vulnerable(tmp_path):
+    capture = tmp_path / "handshakes.pcap"
+    key_share = extension(43, u16(0x0304)) + extension(51, u16(X448) + u16(56) + bytes(56))
+    write_pcap(capture, [
+        ethernet_frame(CLIENT, 50000, TLS12_SERVER, 443, tls_record(client_hello())),
+        ethernet_frame(TLS12_SERVER, 443, CLIENT, 50000, tls_record(
+            server_hello(ECDHE_ECDSA_AES_256_GCM),
+            server_key_exchange(X448, ED448),
+        )),
+        ethernet_frame(TLS13_SERVER, 443, CLIENT, 50001, tls_record(server_hello(AES_256_GCM_SHA384, key_share))),
+    ])
+
+    inventory = TlsInventory()
+    inventory.add_capture(capture)
+
+    assert inventory.offered["groups"]["x448"] == 1
+    assert inventory.offered["signature_algorithms"]["ed448"] == 1
+
+    rows = {
+        (row["network"]["service"], row["cryptographic_function"]): normalize_algorithm(row)
+        for row in cbom_rows(inventory, str(capture))
+    }
+
+    tls12 = "192.0.2.10:443"
+    assert rows[(tls12, "key exchange")]["family"] == "X448"
+    assert rows[(tls12, "key exchange")]["primitive"] == "key-agree"
+    assert rows[(tls12, "sign")]["family"] == "Ed448"
+    assert rows[(tls12, "sign")]["primitive"] == "signature"
+    assert rows[(tls12, "encrypt")]["name"] == "AES-256-GCM"
+    assert rows[("192.0.2.13:443", "key exchange")]["family"] == "X448"
+
+    for key in [(tls12, "key exchange"), (tls12, "sign"), ("192.0.2.13:443", "key exchange")]:
+        assert rows[key]["key_size"] is None
+        assert rows[key]["family"] in QUANTUM_VULNERABLE
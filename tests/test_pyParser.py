@@ -0,0 +1,31 @@
+from frontend.pyParser import parse_python_source
+
+SOURCE = """
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+private_key = ec.generate_private_key(ec.SECP256R1())
+signature = private_key.sign(data, ec.ECDSA(hashes.SHA256()))
+shared = private_key.exchange(ec.ECDH(), peer_public_key)
+rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=3072)
+"""
+
+
+def usages_by_call():
+    _, _, usages, error = parse_python_source(SOURCE, "keys.py")
+    assert error is None
+    return {usage["api_call"]: usage for usage in usages}
+
+
+def test_ec_calls_are_labelled_by_scheme():
+    usages = usages_by_call()
+
+    assert usages["ec.generate_private_key(ec.SECP256R1())"]["algorithm"] == "EC"
+    assert usages["ec.ECDSA(hashes.SHA256())"]["algorithm"] == "ECDSA"
+    assert usages["ec.ECDH()"]["algorithm"] == "ECDH"
+
+
+def test_rsa_key_size_comes_from_the_key_size_argument():
+    usages = usages_by_call()
+
+    assert usages["rsa.generate_private_key(public_exponent=65537, key_size=3072)"]["key_size"] == 3072
@@ -0,0 +1,49 @@
+from frontend.scheduler import CATEGORY_SEVERITY, DEFAULT_SEVERITY, Budget, rank_groups
+from frontend.usageScanner import CRYPTO_PATTERNS
+
+
+def test_every_crypto_category_has_a_severity():
+    assert set(CRYPTO_PATTERNS) <= set(CATEGORY_SEVERITY)
+    assert all(severity > DEFAULT_SEVERITY for severity in CATEGORY_SEVERITY.values())
+
+
+def test_public_key_files_rank_before_token_and_hash_files(tmp_path):
+    ecdh = tmp_path / "exchange.js"
+    ecdh.write_text(
+        "const crypto = require('crypto');\n"
+        "const ecdh = crypto.createECDH('prime256v1');\n"
+        "const shared = ecdh.computeSecret(peerKey);\n"
+    )
+    token = tmp_path / "session.js"
+    token.write_text(
+        "const secret = process.env.SESSION_SECRET;\n"
+        "function issueToken(user) { return sign(user.id, secret); }\n"
+        "function readToken(header) { return header.split(' ')[1]; }\n"
+    )
+    digest = tmp_path / "etag.js"
+    digest.write_text(
+        "const crypto = require('crypto');\n"
+        "const etag = crypto.createHash('sha256').update(body).digest('hex');\n"
+    )
+    file_map = {
+        str(ecdh): ["asymmetric", "cipher"],
+        str(token): ["keys", "signing"],
+        str(digest): ["hash", "cipher"],
+    }
+
+    ranked = rank_groups([[path] for path in file_map], file_map)
+
+    assert ranked[0][1] == [str(ecdh)]
+
+
+def test_budget_reserves_tokens_for_calls_still_in_flight():
+    budget = Budget(deadline_seconds=None, max_tokens=1000, max_cost=None)
+    prompt = "x" * 1200
+
+    allowed = [budget.allows(prompt) for _ in range(4)]
+
+    assert allowed == [True, True, True, False]
+    assert budget.exhausted == "token_budget"
+    for _ in range(3):
+        budget.record(prompt, None, 0.0)
+    assert budget.reserved_tokens == 0